@@ -0,0 +1,91 @@
+"""
+Benchmark for the frame encoding stage.
+
+Compares the old encoder (full-resolution PIL JPEG at default quality, every frame
+at detail=high) with encode_frames at several token budgets and formats: bytes per
+frame, image tokens per request and encode time (single thread vs pool). The
+end-to-end figure is frame extraction + encoding + upload at --uplink-mbps for the
+same frames; model time is not included.
+
+    python bench_frame_encoding.py --video clip.mp4 --uplink-mbps 10
+"""
+import io
+import os
+import time
+import base64
+import argparse
+import tempfile
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from frame_encoding import encode_frames, encoding_summary, vision_tokens
+from bench_frame_sampler import seek_extract
+
+
+def old_encode(frame):
+    buffer = io.BytesIO()
+    Image.fromarray(frame).save(buffer, format="JPEG")
+    return base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+
+def write_synthetic(path, seconds=20, fps=30, size=(1920, 1080)):
+    """Five 1080p 'scenes' with texture, gradients and text, so JPEG/WebP sizes are realistic."""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    rng = np.random.default_rng(0)
+    per_scene = int(seconds * fps / 5)
+    for scene in range(5):
+        noise = cv2.GaussianBlur(rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8), (0, 0), 3)
+        gradient = np.linspace(0, 255, size[0], dtype=np.uint8)[None, :, None]
+        base = cv2.addWeighted(noise, 0.6, np.broadcast_to(gradient, noise.shape).copy(), 0.4, scene * 30)
+        for i in range(per_scene):
+            frame = np.roll(base, i * 3, axis=1)
+            cv2.putText(frame, f"scene {scene} frame {i}", (80, 160), cv2.FONT_HERSHEY_SIMPLEX, 3, (255, 255, 255), 6)
+            writer.write(frame)
+    writer.release()
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--video", help="Video file (default: synthetic 1080p clip)")
+    parser.add_argument("--frames", type=int, default=5)
+    parser.add_argument("--budgets", type=int, nargs="+", default=[1500, 3000, 6000])
+    parser.add_argument("--uplink-mbps", type=float, default=10.0)
+    args = parser.parse_args()
+    upload = lambda n_bytes: n_bytes * 8 / (args.uplink_mbps * 1e6)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        video = args.video
+        if not video:
+            video = os.path.join(tmp, "clip.mp4")
+            write_synthetic(video)
+
+        extract_old, frames = timed(seek_extract, video, args.frames)
+        encode_old, payload = timed(lambda: [old_encode(f) for f in frames])
+        height, width = frames[0].shape[:2]
+        old_bytes = sum(len(p) * 3 // 4 for p in payload)
+        old_tokens = vision_tokens(width, height, "high") * len(frames)
+        print(f"{video}: {len(frames)} frames at {width}x{height}, uplink {args.uplink_mbps:g} Mbit/s")
+        print(f"{'encoder':<22} {'KB/frame':>9} {'tokens':>7} {'encode':>8} {'pool':>8} {'end-to-end':>11}")
+        print(f"{'old (PIL JPEG, high)':<22} {old_bytes / len(frames) / 1024:9.0f} {old_tokens:7d} {encode_old:7.3f}s "
+              f"{'-':>8} {extract_old + encode_old + upload(old_bytes):10.2f}s")
+
+        for image_format in ("webp", "jpeg"):
+            for budget in args.budgets:
+                serial, _ = timed(encode_frames, frames, budget, image_format=image_format, workers=1)
+                pooled, encoded = timed(encode_frames, frames, budget, image_format=image_format)
+                cost = encoding_summary(encoded)
+                end_to_end = extract_old + pooled + upload(cost["bytes"])
+                print(f"{image_format + ' @ ' + str(budget):<22} {cost['bytes'] / cost['frames'] / 1024:9.0f} "
+                      f"{cost['tokens']:7d} {serial:7.3f}s {pooled:7.3f}s {end_to_end:10.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark for frame sampling.
+
+Compares the old seek-per-sample extractor (cap.set(CAP_PROP_POS_FRAMES) + read)
+with the sequential grab()/retrieve() sampler and the "auto" strategy, for one file
+and for several files on a thread pool. Without --video a synthetic clip is written
+with OpenCV (mp4v, short GOP, so seeking is cheap); use a long-GOP H.264 file to
+see the sequential pass win as the sample count grows. Also times scene keyframe
+selection, which always needs one full decode pass.
+
+    python bench_frame_sampler.py --seconds 120 --num-frames 5 10 30
+    python bench_frame_sampler.py --video my_clip.mp4 --files 4
+"""
+import os
+import time
+import argparse
+import tempfile
+
+import cv2
+import numpy as np
+
+from frame_sampler import choose_strategy, sample_frames, sample_many, select_keyframes
+
+
+def seek_extract(video_path, num_frames=5):
+    """The previous extract_frames_from_video, kept as the baseline."""
+    cap = cv2.VideoCapture(video_path)
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    frames = []
+    for idx in [int(i * total_frames / num_frames) for i in range(num_frames)]:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
+        ret, frame = cap.read()
+        if ret:
+            frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    cap.release()
+    return frames
+
+
+def write_synthetic(path, seconds, fps=30, size=(640, 360)):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    rng = np.random.default_rng(0)
+    background = rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8)
+    for i in range(int(seconds * fps)):
+        frame = np.roll(background, i * 4, axis=1)
+        cv2.putText(frame, str(i), (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3)
+        writer.write(frame)
+    writer.release()
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--video", help="Video file to sample (default: synthetic mp4v clip)")
+    parser.add_argument("--seconds", type=float, default=60)
+    parser.add_argument("--num-frames", type=int, nargs="+", default=[5, 10, 30])
+    parser.add_argument("--files", type=int, default=4, help="Copies of the video for the thread-pool run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        video = args.video
+        if not video:
+            video = os.path.join(tmp, "clip.mp4")
+            write_synthetic(video, args.seconds)
+        cap = cv2.VideoCapture(video)
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        print(f"{video}: {frame_count} frames @ {cap.get(cv2.CAP_PROP_FPS):.1f} fps, {os.cpu_count()} CPUs")
+        cap.release()
+
+        print(f"{'frames':>7} {'seek':>8} {'grab':>8} {'grab (time)':>12} {'auto':>16}")
+        for n in args.num_frames:
+            seek, a = timed(seek_extract, video, n)
+            grab, b = timed(sample_frames, video, n, False, "sequential")
+            by_time, _ = timed(sample_frames, video, n, True, "sequential")
+            auto, _ = timed(sample_frames, video, n)
+            same = len(a) == len(b) and all(np.array_equal(x, y) for x, y in zip(a, b))
+            print(f"{n:7d} {seek:7.3f}s {grab:7.3f}s {by_time:11.3f}s {auto:7.3f}s ({choose_strategy(frame_count, n)})"
+                  f"  identical frames: {same}")
+
+        keyframe_time, keyframes = timed(select_keyframes, video, args.num_frames[0])
+        print(f"scene keyframes (max {args.num_frames[0]}): {keyframe_time:.3f}s, {len(keyframes)} selected at "
+              + ", ".join(f"{k['time']:.1f}s" for k in keyframes))
+
+        paths = [video] * args.files
+        n = args.num_frames[0]
+        serial, _ = timed(lambda: [sample_frames(p, n, True, "sequential") for p in paths])
+        pooled, _ = timed(sample_many, paths, n, True, "sequential")
+        print(f"{args.files} files x {n} frames: serial {serial:.3f}s, thread pool {pooled:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import math
+import base64
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+# Aturan biaya gambar GPT-4o: detail low = 85 token; detail high = 85 + 170 per tile 512px
+# setelah gambar diperkecil agar muat 2048x2048 dan sisi terpendek maksimal 768.
+BASE_TOKENS = 85
+TILE_TOKENS = 170
+TILE_SIZE = 512
+LOW_DETAIL_SIZE = 512
+
+DEFAULT_TOKEN_BUDGET = 3000
+DEFAULT_BYTE_BUDGET = 2 * 1024 * 1024
+QUALITY_STEPS = (85, 75, 65, 50, 40)
+# WebP ~2x lebih kecil dari JPEG tetapi encode-nya beberapa kali lebih lambat;
+# JPEG jadi default karena upload jarang menjadi bottleneck (lihat bench_frame_encoding.py)
+FORMATS = {
+    "webp": (".webp", cv2.IMWRITE_WEBP_QUALITY, "image/webp"),
+    "jpeg": (".jpg", cv2.IMWRITE_JPEG_QUALITY, "image/jpeg"),
+}
+
+
+def api_resolution(width: int, height: int) -> Tuple[int, int]:
+    """The size the API scales a detail=high image to before tiling."""
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, 768 / min(width, height))
+    return int(width * scale), int(height * scale)
+
+
+def vision_tokens(width: int, height: int, detail: str = "high") -> int:
+    if detail == "low":
+        return BASE_TOKENS
+    width, height = api_resolution(width, height)
+    return BASE_TOKENS + TILE_TOKENS * math.ceil(width / TILE_SIZE) * math.ceil(height / TILE_SIZE)
+
+
+def target_size(width: int, height: int, token_budget: float) -> Tuple[int, int, str]:
+    """
+    Largest size (never above what the API would keep) whose tile count fits the
+    per-frame token budget; below one tile's worth it falls back to detail=low.
+    Candidate sizes sit exactly on tile boundaries, so no tile is paid for half-empty.
+    """
+    max_tiles = int((token_budget - BASE_TOKENS) // TILE_TOKENS)
+    if max_tiles < 1:
+        scale = min(1.0, LOW_DETAIL_SIZE / max(width, height))
+        return max(1, int(width * scale)), max(1, int(height * scale)), "low"
+
+    api_width, api_height = api_resolution(width, height)
+    scales = {api_width / width}
+    for k in range(1, math.ceil(api_width / TILE_SIZE) + 1):
+        scales.add(TILE_SIZE * k / width)
+    for k in range(1, math.ceil(api_height / TILE_SIZE) + 1):
+        scales.add(TILE_SIZE * k / height)
+
+    for scale in sorted((s for s in scales if s <= api_width / width), reverse=True):
+        w, h = max(1, int(width * scale)), max(1, int(height * scale))
+        if math.ceil(w / TILE_SIZE) * math.ceil(h / TILE_SIZE) <= max_tiles:
+            return w, h, "high"
+    scale = min(1.0, LOW_DETAIL_SIZE / max(width, height))
+    return max(1, int(width * scale)), max(1, int(height * scale)), "low"
+
+
+def encode_frame(frame: np.ndarray, token_budget: float, byte_budget: float, image_format: str = "jpeg") -> Dict:
+    """Resize an RGB frame for its token budget and encode it at the highest quality within its byte budget."""
+    extension, quality_flag, mime = FORMATS[image_format]
+    height, width = frame.shape[:2]
+    target_width, target_height, detail = target_size(width, height, token_budget)
+    image = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+
+    while True:
+        resized = image if (target_width, target_height) == (width, height) else \
+            cv2.resize(image, (target_width, target_height), interpolation=cv2.INTER_AREA)
+        for quality in QUALITY_STEPS:
+            ok, buffer = cv2.imencode(extension, resized, [quality_flag, quality])
+            if ok and len(buffer) <= byte_budget:
+                break
+        # Masih terlalu besar pada kualitas terendah: perkecil lagi
+        if len(buffer) <= byte_budget or min(target_width, target_height) <= 64:
+            break
+        target_width, target_height = int(target_width * 0.75), int(target_height * 0.75)
+
+    return {
+        "data": base64.b64encode(buffer.tobytes()).decode("utf-8"),
+        "mime": mime,
+        "detail": detail,
+        "width": target_width,
+        "height": target_height,
+        "quality": quality,
+        "bytes": len(buffer),
+        "tokens": vision_tokens(target_width, target_height, detail),
+    }
+
+
+def encode_frames(frames: List[np.ndarray], token_budget: float = DEFAULT_TOKEN_BUDGET,
+                  byte_budget: float = DEFAULT_BYTE_BUDGET, image_format: str = "jpeg",
+                  workers: int = 4) -> List[Dict]:
+    """Encode frames on a thread pool, splitting the request's token and byte budgets evenly across them."""
+    if not frames:
+        return []
+    per_frame_tokens = token_budget / len(frames)
+    per_frame_bytes = byte_budget / len(frames)
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(frames)))) as executor:
+        return list(executor.map(lambda f: encode_frame(f, per_frame_tokens, per_frame_bytes, image_format), frames))
+
+
+def encoding_summary(encoded: List[Dict]) -> Dict[str, int]:
+    return {
+        "frames": len(encoded),
+        "tokens": sum(e["tokens"] for e in encoded),
+        "bytes": sum(e["bytes"] for e in encoded),
+    }
@@ -0,0 +1,221 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+def video_info(video_path: str) -> Dict[str, float]:
+    cap = cv2.VideoCapture(video_path)
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        return {
+            "fps": fps,
+            "frame_count": frame_count,
+            "duration": frame_count / fps if fps else 0.0,
+            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        }
+    finally:
+        cap.release()
+
+
+def iter_grabbed(cap: cv2.VideoCapture) -> Iterator[Tuple[int, float]]:
+    """
+    Advance through the stream with grab() only (no colour conversion or copy) and
+    yield (frame index, timestamp in seconds) for each frame. Call cap.retrieve()
+    inside the loop for the frames you actually need.
+    """
+    index = 0
+    while cap.grab():
+        yield index, cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        index += 1
+
+
+def _retrieve_rgb(cap: cv2.VideoCapture) -> Optional[np.ndarray]:
+    ok, frame = cap.retrieve()
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) if ok else None
+
+
+# Jarak keyframe yang diasumsikan (default keyint x264/ffmpeg). Satu seek mendekode
+# sampai ~1 GOP, jadi seek lebih mahal dari satu pass berurutan begitu
+# num_frames * GOP melebihi jumlah frame.
+ASSUMED_GOP = 250
+STRATEGIES = ("auto", "sequential", "seek")
+
+
+def choose_strategy(frame_count: int, num_frames: int) -> str:
+    return "sequential" if num_frames * ASSUMED_GOP >= frame_count else "seek"
+
+
+def _sample_sequential(cap: cv2.VideoCapture, targets: List[float], by_time: bool) -> List[np.ndarray]:
+    frames: List[np.ndarray] = []
+    next_target = 0
+    for index, timestamp in iter_grabbed(cap):
+        position = timestamp if by_time else index
+        if position + 1e-6 < targets[next_target]:
+            continue
+        frame = _retrieve_rgb(cap)
+        if frame is not None:
+            frames.append(frame)
+        # Satu frame bisa memenuhi beberapa target jika ada celah besar (VFR)
+        while next_target < len(targets) and position + 1e-6 >= targets[next_target]:
+            next_target += 1
+        if next_target == len(targets):
+            break
+    return frames
+
+
+def _sample_seek(cap: cv2.VideoCapture, targets: List[float], by_time: bool) -> List[np.ndarray]:
+    frames: List[np.ndarray] = []
+    for target in targets:
+        if by_time:
+            cap.set(cv2.CAP_PROP_POS_MSEC, target * 1000.0)
+        else:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+        ok, frame = cap.read()
+        if ok:
+            frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    return frames
+
+
+def sample_frames(video_path: str, num_frames: int = 5, by_time: bool = True, strategy: str = "auto") -> List[np.ndarray]:
+    """
+    Evenly spaced RGB frames.
+
+    by_time=True targets timestamps (i * duration / num_frames) and takes the first
+    frame at or after each one, which stays evenly spaced on variable frame rate
+    files; by_time=False targets frame indices like the old extractor.
+
+    strategy="sequential" decodes once from the start with grab() and only
+    retrieve()s the target frames (exact timestamps, no seeking); "seek" jumps to
+    each target; "auto" picks sequential when samples are dense enough that the
+    per-seek GOP decode would cost more than one pass over the file.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy {strategy!r}, expected one of {STRATEGIES}")
+    info = video_info(video_path)
+    if info["frame_count"] <= 0 or num_frames <= 0:
+        return []
+
+    if by_time and info["duration"] > 0:
+        targets = [i * info["duration"] / num_frames for i in range(num_frames)]
+    else:
+        by_time = False
+        targets = sorted({int(i * info["frame_count"] / num_frames) for i in range(num_frames)})
+    if strategy == "auto":
+        strategy = choose_strategy(info["frame_count"], len(targets))
+
+    cap = cv2.VideoCapture(video_path)
+    try:
+        if strategy == "sequential":
+            return _sample_sequential(cap, targets, by_time)
+        return _sample_seek(cap, targets, by_time)
+    finally:
+        cap.release()
+
+
+def sample_many(video_paths: List[str], num_frames: int = 5, by_time: bool = True, strategy: str = "auto",
+                workers: int = 4) -> Dict[str, List[np.ndarray]]:
+    """sample_frames for several files on a thread pool; OpenCV releases the GIL while decoding."""
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(video_paths)))) as executor:
+        results = executor.map(lambda path: sample_frames(path, num_frames, by_time, strategy), video_paths)
+        return dict(zip(video_paths, results))
+
+
+# Ambang jarak signature (0..1) untuk pergantian adegan dan frame yang nyaris sama
+CUT_THRESHOLD = 0.25
+DUPLICATE_THRESHOLD = 0.08
+ANALYSIS_SAMPLES_PER_SECOND = 4
+
+
+def frame_signature(frame_bgr: np.ndarray) -> np.ndarray:
+    """Cheap signature: 15x4 hue/saturation histogram plus a 16x16 grayscale thumbnail, both normalised."""
+    small = cv2.resize(frame_bgr, (16, 16), interpolation=cv2.INTER_AREA)
+    hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+    bins = (hsv[..., 0].astype(np.int32) // 12) * 4 + hsv[..., 1] // 64
+    hist = np.bincount(bins.ravel(), minlength=60).astype(np.float32) / bins.size
+    thumb = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.float32).ravel() / 255.0
+    return np.concatenate([hist, thumb])
+
+
+def signature_distances(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise distances in [0, 1] between signature rows of a (n, d) and b (m, d): mean of colour and structure change."""
+    colour = 0.5 * np.abs(a[:, None, :60] - b[None, :, :60]).sum(axis=2)
+    structure = np.abs(a[:, None, 60:] - b[None, :, 60:]).mean(axis=2)
+    return 0.5 * (colour + structure)
+
+
+def select_keyframes(video_path: str, max_frames: int = 5, samples_per_second: float = ANALYSIS_SAMPLES_PER_SECOND,
+                     cut_threshold: float = CUT_THRESHOLD,
+                     duplicate_threshold: float = DUPLICATE_THRESHOLD) -> List[Dict]:
+    """
+    Up to max_frames scene keyframes from one sequential decode pass.
+
+    A few frames per second get a signature; a jump above cut_threshold from the previous
+    one starts a new scene, represented by its second analysed frame (past any transition).
+    From the scene representatives the most distinct ones are picked by farthest-point
+    selection, stopping early once the rest are near-duplicates of a picked frame, so a
+    static video costs fewer images. Returns [{"time": seconds, "frame": RGB array}] in
+    playback order.
+    """
+    info = video_info(video_path)
+    if info["frame_count"] <= 0 or max_frames <= 0:
+        return []
+    stride = max(1, int(round((info["fps"] or 30.0) / samples_per_second)))
+    # Kandidat dibatasi agar memori tetap kecil pada video dengan banyak potongan
+    max_candidates = max(4 * max_frames, 16)
+
+    times: List[float] = []
+    frames: List[np.ndarray] = []
+    signatures: List[np.ndarray] = []
+    previous = None
+    scene_length = 0
+
+    cap = cv2.VideoCapture(video_path)
+    try:
+        for index, timestamp in iter_grabbed(cap):
+            if index % stride:
+                continue
+            ok, frame = cap.retrieve()
+            if not ok:
+                continue
+            signature = frame_signature(frame)
+            is_cut = previous is None or signature_distances(signature[None], previous[None])[0, 0] > cut_threshold
+            previous = signature
+            scene_length = 1 if is_cut else scene_length + 1
+            if is_cut:
+                times.append(timestamp)
+                frames.append(frame)
+                signatures.append(signature)
+            elif scene_length == 2:
+                times[-1], frames[-1], signatures[-1] = timestamp, frame, signature
+
+            if len(frames) > max_candidates:
+                # Buang kandidat yang paling mirip dengan tetangga sebelumnya
+                stacked = np.stack(signatures)
+                gaps = np.abs(stacked[1:] - stacked[:-1]).sum(axis=1)
+                drop = int(np.argmin(gaps[:-1])) + 1 if len(gaps) > 1 else 1
+                del times[drop], frames[drop], signatures[drop]
+    finally:
+        cap.release()
+
+    if not frames:
+        return []
+    stacked = np.stack(signatures)
+    distances = signature_distances(stacked, stacked)
+    # Mulai dari adegan yang paling berbeda dari rata-rata, lalu farthest-point
+    chosen = [int(np.argmax(distances.mean(axis=1)))]
+    nearest = distances[chosen[0]].copy()
+    while len(chosen) < min(max_frames, len(frames)):
+        candidate = int(np.argmax(nearest))
+        if nearest[candidate] <= duplicate_threshold:
+            break
+        chosen.append(candidate)
+        nearest = np.minimum(nearest, distances[candidate])
+
+    return [
+        {"time": times[i], "frame": cv2.cvtColor(frames[i], cv2.COLOR_BGR2RGB)}
+        for i in sorted(chosen)
+    ]
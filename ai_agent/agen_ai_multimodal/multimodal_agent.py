@@ -2,12 +2,13 @@ import streamlit as st
 import openai
 import time
 from pathlib import Path
-import tempfile
-import base64
-import cv2
 import os
 import inspect
 
+from frame_encoding import DEFAULT_TOKEN_BUDGET, encode_frames, encoding_summary
+from frame_sampler import select_keyframes
+from video_cache import VideoCache, prune_videos, save_upload, touch_video
+
 # Fix for getargspec deprecation warning
 if not hasattr(inspect, 'getargspec'):
     inspect.getargspec = inspect.getfullargspec
@@ -45,6 +46,14 @@ with st.sidebar:
     else:
         st.warning("⚠️ Please enter your OpenAI API key to continue")
     
+    st.markdown("---")
+    st.header("🖼️ Image Budget")
+    token_budget = st.slider(
+        "Image tokens per request",
+        min_value=500, max_value=8000, value=DEFAULT_TOKEN_BUDGET, step=250,
+        help="Frames are resized to fit this budget; below ~255 tokens per frame they are sent at low detail"
+    )
+    
     st.markdown("---")
     st.markdown("**Installation Requirements:**")
     st.code("""
@@ -62,44 +71,37 @@ pip uninstall phidata
 pip install phidata==2.7.2
     """, language="bash")
 
-def extract_frames_from_video(video_path, num_frames=5):
-    """Extract frames from video for analysis"""
-    cap = cv2.VideoCapture(video_path)
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    
-    frames = []
-    frame_indices = [int(i * total_frames / num_frames) for i in range(num_frames)]
-    
-    for idx in frame_indices:
-        cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
-        ret, frame = cap.read()
-        if ret:
-            # Convert BGR to RGB
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frames.append(frame)
-    
-    cap.release()
-    return frames
+def extract_keyframes_from_video(video_path, max_frames=5):
+    """Pick up to max_frames distinct scene keyframes; returns (RGB frames, timestamps in seconds)"""
+    keyframes = select_keyframes(video_path, max_frames=max_frames)
+    return [k["frame"] for k in keyframes], [k["time"] for k in keyframes]
 
-def encode_frame_to_base64(frame):
-    """Convert frame to base64 for OpenAI API"""
-    import io
-    from PIL import Image
-    
-    # Convert numpy array to PIL Image
-    pil_image = Image.fromarray(frame)
-    
-    # Save to bytes
-    buffer = io.BytesIO()
-    pil_image.save(buffer, format='JPEG')
-    buffer.seek(0)
-    
-    # Encode to base64
-    return base64.b64encode(buffer.getvalue()).decode('utf-8')
+@st.cache_resource(show_spinner=False)
+def get_video_cache() -> VideoCache:
+    return VideoCache()
+
+def prepare_frames(video_hash, video_path, params):
+    """Encoded keyframes and timestamps for a video, decoded only once per (video, settings)"""
+    cache = get_video_cache()
+    touch_video(video_path)  # Video yang sedang dipakai tidak ikut terhapus oleh prune_videos
+    cached = cache.get_frames(video_hash, params)
+    if cached:
+        return cached["frames"], cached["timestamps"], True
+    frames, timestamps = extract_keyframes_from_video(video_path, max_frames=params["max_frames"])
+    if not frames:
+        return [], [], False
+    encoded_frames = encode_frames(frames, token_budget=params["token_budget"])
+    cache.put_frames(video_hash, params, {"frames": encoded_frames, "timestamps": timestamps})
+    return encoded_frames, timestamps, False
 
-def analyze_video_with_openai(frames, user_prompt, api_key):
-    """Analyze video frames using OpenAI Vision API"""
+def analyze_video_with_openai(encoded_frames, user_prompt, api_key, timestamps=None):
+    """Analyze video frames (already encoded by encode_frames) using OpenAI Vision API"""
     try:
+        frame_times = ""
+        if timestamps:
+            frame_times = "The frames are scene keyframes taken at " + ", ".join(
+                f"{int(t // 60)}:{int(t % 60):02d}" for t in timestamps
+            ) + " (mm:ss)."
         # Prepare messages with frames
         messages = [
             {
@@ -108,6 +110,7 @@ def analyze_video_with_openai(frames, user_prompt, api_key):
                     {
                         "type": "text",
                         "text": f"""Analyze these frames from a video and answer the following question: {user_prompt}
+                        {frame_times}
                         
                         Please provide detailed analysis based on what you can see in these video frames.
                         Focus on practical, actionable information."""
@@ -117,13 +120,12 @@ def analyze_video_with_openai(frames, user_prompt, api_key):
         ]
         
         # Add frames to the message
-        for i, frame in enumerate(frames):
-            base64_frame = encode_frame_to_base64(frame)
+        for encoded in encoded_frames:
             messages[0]["content"].append({
                 "type": "image_url",
                 "image_url": {
-                    "url": f"data:image/jpeg;base64,{base64_frame}",
-                    "detail": "high"
+                    "url": f"data:{encoded['mime']};base64,{encoded['data']}",
+                    "detail": encoded["detail"]
                 }
             })
         
@@ -183,9 +185,13 @@ if agent is None:
 uploaded_file = st.file_uploader("Upload a video file", type=['mp4', 'mov', 'avi'])
 
 if uploaded_file:
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.mp4') as tmp_file:
-        tmp_file.write(uploaded_file.read())
-        video_path = tmp_file.name
+    # Disalin ke disk per chunk sekali per upload; isi yang sama disimpan satu kali (hash SHA-256)
+    upload = st.session_state.get("upload")
+    if upload is None or upload["file_id"] != uploaded_file.file_id or not os.path.exists(upload["path"]):
+        video_hash, video_path = save_upload(uploaded_file, suffix=Path(uploaded_file.name).suffix or ".mp4")
+        st.session_state.upload = {"file_id": uploaded_file.file_id, "hash": video_hash, "path": video_path}
+        prune_videos(keep=[video_path])
+    video_hash, video_path = st.session_state.upload["hash"], st.session_state.upload["path"]
     
     st.video(video_path)
     
@@ -202,15 +208,27 @@ if uploaded_file:
             try:
                 with st.spinner("Processing video and researching..."):
                     # Extract frames from video
-                    st.info("Extracting frames from video...")
-                    frames = extract_frames_from_video(video_path, num_frames=5)
+                    st.info("Selecting keyframes from video...")
+                    params = {"max_frames": 5, "token_budget": token_budget}
+                    encoded_frames, timestamps, frames_cached = prepare_frames(video_hash, video_path, params)
                     
-                    if not frames:
+                    if not encoded_frames:
                         st.error("Could not extract frames from the video.")
                     else:
                         # Analyze video with OpenAI Vision
                         st.info("Analyzing video content...")
-                        video_analysis = analyze_video_with_openai(frames, user_prompt, openai_api_key)
+                        cost = encoding_summary(encoded_frames)
+                        video_analysis = get_video_cache().get_analysis(video_hash, params, user_prompt)
+                        st.caption(
+                            f"{cost['frames']} distinct keyframes, ~{cost['tokens']:,} image tokens, "
+                            f"{cost['bytes'] / 1024:,.0f} KB"
+                            + (" · keyframes from cache" if frames_cached else "")
+                            + (" · analysis from cache, no vision call" if video_analysis else "")
+                        )
+                        if video_analysis is None:
+                            video_analysis = analyze_video_with_openai(encoded_frames, user_prompt, openai_api_key, timestamps)
+                            if video_analysis:
+                                get_video_cache().put_analysis(video_hash, params, user_prompt, video_analysis)
                         
                         if video_analysis:
                             # Use the agent for web research based on video analysis
@@ -247,10 +265,6 @@ if uploaded_file:
             except Exception as e:
                 st.error(f"An error occurred: {str(e)}")
                 st.info("Make sure you have installed all required packages: opencv-python, Pillow")
-            finally:
-                # Clean up temporary file
-                if 'video_path' in locals():
-                    Path(video_path).unlink(missing_ok=True)
 else:
     st.info("Please upload a video to begin analysis.")
 
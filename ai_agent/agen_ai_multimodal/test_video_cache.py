@@ -0,0 +1,48 @@
+import io
+import os
+
+from video_cache import VideoCache, prune_videos, save_upload, touch_video
+
+
+def test_save_upload_deduplicates_by_content(tmp_path):
+    data = os.urandom(3 * 1024 * 1024 + 17)
+    first_hash, first_path = save_upload(io.BytesIO(data), str(tmp_path), ".MP4")
+    second_hash, second_path = save_upload(io.BytesIO(data), str(tmp_path), ".mp4")
+
+    assert (first_hash, first_path) == (second_hash, second_path)
+    assert first_path.endswith(".mp4")
+    assert os.listdir(tmp_path) == [os.path.basename(first_path)]
+    with open(first_path, "rb") as stored:
+        assert stored.read() == data
+
+
+def test_prune_removes_least_recently_used(tmp_path):
+    old = save_upload(io.BytesIO(b"a" * 1000), str(tmp_path))[1]
+    used = save_upload(io.BytesIO(b"b" * 1000), str(tmp_path))[1]
+    os.utime(old, (1, 1))
+    os.utime(used, (2, 2))
+    touch_video(used)
+    newest = save_upload(io.BytesIO(b"c" * 1000), str(tmp_path))[1]
+
+    assert prune_videos(str(tmp_path), max_bytes=2500) == 1
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(p) for p in (used, newest))
+
+
+def test_prune_never_removes_kept_video(tmp_path):
+    current = save_upload(io.BytesIO(b"x" * 5000), str(tmp_path))[1]
+    other = save_upload(io.BytesIO(b"y" * 100), str(tmp_path))[1]
+
+    assert prune_videos(str(tmp_path), max_bytes=1000, keep=[current]) == 1
+    assert os.path.exists(current) and not os.path.exists(other)
+
+
+def test_cache_keys_on_settings_and_normalised_question(tmp_path):
+    cache = VideoCache(str(tmp_path / "videos.sqlite3"))
+    params = {"max_frames": 5, "token_budget": 3000}
+    cache.put_frames("abc", params, {"frames": [{"data": "x"}], "timestamps": [1.5]})
+    cache.put_analysis("abc", params, "What is  shown?", "A cat")
+
+    assert cache.get_frames("abc", params) == {"frames": [{"data": "x"}], "timestamps": [1.5]}
+    assert cache.get_frames("abc", {**params, "token_budget": 2000}) is None
+    assert cache.get_analysis("abc", params, "what is shown?") == "A cat"
+    assert cache.get_analysis("abc", params, "Who is shown?") is None
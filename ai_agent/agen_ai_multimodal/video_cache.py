@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Optional, Tuple
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+VIDEO_DIR = os.path.join(CACHE_DIR, "videos")
+VIDEO_CACHE_PATH = os.path.join(CACHE_DIR, "videos.sqlite3")
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def save_upload(upload: BinaryIO, directory: str = VIDEO_DIR, suffix: str = ".mp4") -> Tuple[str, str]:
+    """
+    Copy an uploaded file to disk in 1 MB chunks while hashing it, so the video is never
+    duplicated in memory. Identical content is stored once as <sha256><suffix>.
+    Returns (video hash, path).
+    """
+    os.makedirs(directory, exist_ok=True)
+    digest = hashlib.sha256()
+    upload.seek(0)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in iter(lambda: upload.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                out.write(chunk)
+        video_hash = digest.hexdigest()
+        path = os.path.join(directory, f"{video_hash}{suffix.lower()}")
+        if os.path.exists(path):
+            os.remove(tmp)
+            os.utime(path)
+        else:
+            os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return video_hash, path
+
+
+def touch_video(path: str) -> None:
+    """Mark a stored video as used, so prune_videos() keeps it over idle ones."""
+    if os.path.exists(path):
+        os.utime(path)
+
+
+def prune_videos(directory: str = VIDEO_DIR, max_bytes: int = 2 * 1024 ** 3, keep: Iterable[str] = ()) -> int:
+    """
+    Delete the least recently used stored videos (by mtime, refreshed by save_upload and
+    touch_video) beyond max_bytes; returns how many were removed. Paths in keep, e.g. the
+    video currently open, are never removed but still count towards the limit.
+    """
+    if not os.path.isdir(directory):
+        return 0
+    keep = {os.path.abspath(path) for path in keep}
+    entries = [e for e in os.scandir(directory) if e.is_file() and not e.name.endswith(".part")]
+    entries.sort(key=lambda e: (os.path.abspath(e.path) not in keep, -e.stat().st_mtime))
+    total, removed = 0, 0
+    for entry in entries:
+        total += entry.stat().st_size
+        if total > max_bytes and os.path.abspath(entry.path) not in keep:
+            os.remove(entry.path)
+            removed += 1
+    return removed
+
+
+def question_key(question: str) -> str:
+    return " ".join(question.lower().split())
+
+
+class VideoCache:
+    """
+    Per-video (content hash) cache in SQLite: encoded keyframes per extraction settings,
+    and vision answers per (settings, question). A repeated question skips decoding and
+    the vision call; a new question about the same video only skips decoding.
+    """
+
+    def __init__(self, path: str = VIDEO_CACHE_PATH, ttl_days: float = 7):
+        self.path = path
+        self.ttl = ttl_days * 86400
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._db() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS frames (
+                    video_hash TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (video_hash, params)
+                )
+            """)
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS analyses (
+                    video_hash TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    question TEXT NOT NULL,
+                    answer TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (video_hash, params, question)
+                )
+            """)
+
+    @contextmanager
+    def _db(self) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            yield db
+            db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _params(params: Dict[str, Any]) -> str:
+        return json.dumps(params, sort_keys=True)
+
+    def get_frames(self, video_hash: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._db() as db:
+            row = db.execute(
+                "SELECT payload FROM frames WHERE video_hash = ? AND params = ? AND created_at > ?",
+                (video_hash, self._params(params), time.time() - self.ttl)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_frames(self, video_hash: str, params: Dict[str, Any], payload: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._db() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO frames (video_hash, params, payload, created_at) VALUES (?, ?, ?, ?)",
+                (video_hash, self._params(params), json.dumps(payload), now)
+            )
+            db.execute("DELETE FROM frames WHERE created_at <= ?", (now - self.ttl,))
+
+    def get_analysis(self, video_hash: str, params: Dict[str, Any], question: str) -> Optional[str]:
+        with self._db() as db:
+            row = db.execute(
+                "SELECT answer FROM analyses WHERE video_hash = ? AND params = ? AND question = ? AND created_at > ?",
+                (video_hash, self._params(params), question_key(question), time.time() - self.ttl)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put_analysis(self, video_hash: str, params: Dict[str, Any], question: str, answer: str) -> None:
+        now = time.time()
+        with self._db() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO analyses (video_hash, params, question, answer, created_at) VALUES (?, ?, ?, ?, ?)",
+                (video_hash, self._params(params), question_key(question), answer, now)
+            )
+            db.execute("DELETE FROM analyses WHERE created_at <= ?", (now - self.ttl,))
@@ -0,0 +1,183 @@
+import re
+import base64
+from io import BytesIO
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+# Template lokal untuk pertanyaan standar: dijalankan langsung pada DataFrame
+# tanpa LLM maupun sandbox E2B. Setiap template mengembalikan (penjelasan, plots, tabel)
+# dengan plots berupa list PNG base64, format yang sama dengan extract_matplotlib_plots.
+TemplateResult = Tuple[str, List[str], Optional[pd.DataFrame]]
+
+MAX_CATEGORIES = 20
+
+
+def figure_to_base64(fig) -> str:
+    """Render a matplotlib figure to a base64 encoded PNG"""
+    buf = BytesIO()
+    fig.savefig(buf, format='png', dpi=110, bbox_inches='tight')
+    plt.close(fig)
+    return base64.b64encode(buf.getvalue()).decode()
+
+
+def numeric_columns(df: pd.DataFrame) -> List[str]:
+    """Numeric columns excluding running index columns like NO/ID"""
+    cols = df.select_dtypes(include='number').columns
+    return [c for c in cols if not (df[c].is_monotonic_increasing and df[c].is_unique)]
+
+
+def find_mentioned_column(df: pd.DataFrame, query: str, candidates: List[str]) -> Optional[str]:
+    """Return the longest column name that appears in the query"""
+    q = query.lower()
+    mentioned = [c for c in candidates if re.search(rf"\b{re.escape(str(c).lower())}\b", q)]
+    return max(mentioned, key=lambda c: len(str(c))) if mentioned else None
+
+
+def category_column(df: pd.DataFrame, query: str) -> Optional[str]:
+    """Pick the grouping column: mentioned in the query, else the lowest-cardinality candidate"""
+    nunique = df.nunique()
+    candidates = [c for c in df.columns if 1 < nunique[c] <= MAX_CATEGORIES]
+    mentioned = find_mentioned_column(df, query, candidates)
+    if mentioned:
+        return mentioned
+    # Prioritaskan kolom teks, lalu kolom numerik diskrit (mis. jumlah kamar)
+    text_cols = [
+        c for c in candidates
+        if pd.api.types.is_string_dtype(df[c]) or isinstance(df[c].dtype, pd.CategoricalDtype)
+    ]
+    pool = text_cols or candidates
+    return min(pool, key=lambda c: nunique[c]) if pool else None
+
+
+def template_distribution(df: pd.DataFrame, query: str) -> TemplateResult:
+    cols = numeric_columns(df)
+    if not cols:
+        return "Dataset tidak memiliki kolom numerik.", [], None
+
+    n = len(cols)
+    ncols = min(3, n)
+    nrows = int(np.ceil(n / ncols))
+    fig, axes = plt.subplots(nrows, ncols, figsize=(5 * ncols, 3.5 * nrows), squeeze=False)
+    for ax, col in zip(axes.flat, cols):
+        values = df[col].dropna().to_numpy()
+        counts, edges = np.histogram(values, bins='auto')
+        ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', edgecolor='white')
+        ax.set_title(col)
+    for ax in axes.flat[n:]:
+        ax.set_visible(False)
+    fig.suptitle('Distribusi Kolom Numerik')
+    fig.tight_layout()
+
+    desc = df[cols].describe().T[['mean', '50%', 'std', 'min', 'max']]
+    table = desc.assign(skew=df[cols].skew()).round(2)
+    summary = f"Distribusi {n} kolom numerik beserta statistik deskriptifnya."
+    return summary, [figure_to_base64(fig)], table
+
+
+def template_correlation(df: pd.DataFrame, query: str) -> TemplateResult:
+    cols = numeric_columns(df)
+    if len(cols) < 2:
+        return "Minimal dua kolom numerik diperlukan untuk korelasi.", [], None
+
+    corr = df[cols].corr()
+    values = corr.to_numpy()
+    fig, ax = plt.subplots(figsize=(1.0 * len(cols) + 3, 0.8 * len(cols) + 2))
+    im = ax.imshow(values, cmap='coolwarm', vmin=-1, vmax=1)
+    ax.set_xticks(range(len(cols)), labels=cols, rotation=45, ha='right')
+    ax.set_yticks(range(len(cols)), labels=cols)
+    for (i, j), v in np.ndenumerate(values):
+        ax.text(j, i, f"{v:.2f}", ha='center', va='center', fontsize=8)
+    fig.colorbar(im, ax=ax)
+    ax.set_title('Heatmap Korelasi')
+    fig.tight_layout()
+
+    # Pasangan dengan korelasi absolut tertinggi (segitiga atas saja)
+    iu = np.triu_indices(len(cols), k=1)
+    order = np.argsort(-np.abs(values[iu]))[:5]
+    pairs = "\n".join(
+        f"- **{cols[iu[0][k]]}** vs **{cols[iu[1][k]]}**: {values[iu][k]:.2f}" for k in order
+    )
+    summary = "Korelasi Pearson antar kolom numerik. Pasangan terkuat:\n\n" + pairs
+    return summary, [figure_to_base64(fig)], corr.round(2)
+
+
+def template_category_means(df: pd.DataFrame, query: str) -> TemplateResult:
+    group_col = category_column(df, query)
+    if group_col is None:
+        return "Tidak ditemukan kolom kategori yang cocok untuk dikelompokkan.", [], None
+
+    value_cols = [c for c in numeric_columns(df) if c != group_col]
+    mentioned = find_mentioned_column(df, query, value_cols)
+    if mentioned:
+        value_cols = [mentioned]
+    if not value_cols:
+        return f"Tidak ada kolom numerik untuk dirata-ratakan per {group_col}.", [], None
+
+    means = df.groupby(group_col)[value_cols].mean()
+    fig, axes = plt.subplots(len(value_cols), 1, figsize=(9, 3 * len(value_cols)), squeeze=False)
+    for ax, col in zip(axes.flat, value_cols):
+        ax.bar(means.index.astype(str), means[col].to_numpy())
+        ax.set_title(f"Rata-rata {col} per {group_col}")
+        ax.tick_params(axis='x', rotation=45)
+    fig.tight_layout()
+
+    summary = f"Rata-rata {', '.join(value_cols)} per kategori **{group_col}**."
+    return summary, [figure_to_base64(fig)], means.round(2)
+
+
+def template_histogram(df: pd.DataFrame, query: str) -> TemplateResult:
+    cols = numeric_columns(df)
+    if not cols:
+        return "Dataset tidak memiliki kolom numerik.", [], None
+
+    col = find_mentioned_column(df, query, cols)
+    if col is None:
+        # "Paling menarik" = koefisien variasi terbesar
+        stats = df[cols].agg(['mean', 'std'])
+        cv = (stats.loc['std'] / stats.loc['mean'].abs().replace(0, np.nan)).fillna(0)
+        col = cv.idxmax()
+
+    values = df[col].dropna().to_numpy()
+    fig, ax = plt.subplots(figsize=(9, 5))
+    ax.hist(values, bins='auto', edgecolor='white')
+    ax.axvline(np.mean(values), color='red', linestyle='--', label=f"mean = {np.mean(values):,.2f}")
+    ax.axvline(np.median(values), color='green', linestyle=':', label=f"median = {np.median(values):,.2f}")
+    ax.set_title(f"Histogram {col}")
+    ax.set_xlabel(col)
+    ax.set_ylabel('Frekuensi')
+    ax.legend()
+    fig.tight_layout()
+
+    summary = (
+        f"Histogram kolom **{col}** ({len(values)} nilai). "
+        f"Mean {np.mean(values):,.2f}, median {np.median(values):,.2f}, std {np.std(values):,.2f}."
+    )
+    return summary, [figure_to_base64(fig)], None
+
+
+# Urutan penting: pola yang lebih spesifik dicek lebih dulu
+ANALYSIS_TEMPLATES: List[Tuple[str, re.Pattern, Callable[[pd.DataFrame, str], TemplateResult]]] = [
+    ("correlation", re.compile(r"korelasi|correlation|heatmap"), template_correlation),
+    ("category_means", re.compile(r"(rata-rata|rata2|mean|average).*(kategori|category|per\s)"), template_category_means),
+    ("histogram", re.compile(r"histogram"), template_histogram),
+    ("distribution", re.compile(r"distribusi|distribution"), template_distribution),
+]
+
+
+def match_template(query: str) -> Optional[str]:
+    """Return the name of the template matching the query, or None to fall back to the LLM"""
+    q = query.lower()
+    for name, regex, _ in ANALYSIS_TEMPLATES:
+        if regex.search(q):
+            return name
+    return None
+
+
+def run_template(name: str, df: pd.DataFrame, query: str) -> TemplateResult:
+    templates: Dict[str, Callable] = {n: fn for n, _, fn in ANALYSIS_TEMPLATES}
+    return templates[name](df, query)
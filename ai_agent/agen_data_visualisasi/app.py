@@ -4,6 +4,7 @@ import re
 import sys
 import io
 import contextlib
+import time
 import warnings
 from typing import Optional, List, Any, Tuple
 from PIL import Image
@@ -16,12 +17,22 @@ from e2b_code_interpreter import Sandbox
 import matplotlib.pyplot as plt
 import plotly.graph_objects as go
 import plotly.express as px
+from analysis_templates import match_template, run_template
 
 warnings.filterwarnings("ignore", category=UserWarning, module="pydantic")
 
 pattern = re.compile(r"```python\n(.*?)\n```", re.DOTALL)
 
-def code_interpret(e2b_code_interpreter: Sandbox, code: str) -> Optional[List[Any]]:
+# Batas self-repair ketika kode hasil LLM gagal dieksekusi di sandbox
+MAX_REPAIR_ATTEMPTS = 2
+REPAIR_TIME_BUDGET = 60.0  # detik, total untuk seluruh percobaan perbaikan
+
+def format_execution_error(error) -> str:
+    """Render an E2B execution error as a traceback string for the model"""
+    traceback = getattr(error, 'traceback', '') or ''
+    return f"{getattr(error, 'name', 'Error')}: {getattr(error, 'value', error)}\n{traceback}".strip()
+
+def code_interpret(e2b_code_interpreter: Sandbox, code: str) -> Tuple[Optional[List[Any]], str, Optional[str]]:
     with st.spinner('Executing code in E2B sandbox...'):
         # Enhanced code to ensure proper visualization output
         enhanced_code = f"""
@@ -75,9 +86,9 @@ if plt.get_fignums():
 
         if exec.error:
             print(f"[Code Interpreter ERROR] {exec.error}", file=sys.stderr)
-            return None, stdout_output
+            return None, stdout_output, format_execution_error(exec.error)
         
-        return exec.results, stdout_output
+        return exec.results, stdout_output, None
 
 def match_code_blocks(llm_response: str) -> str:
     match = pattern.search(llm_response)
@@ -92,7 +103,47 @@ def extract_matplotlib_plots(stdout_output: str) -> List[str]:
     matches = re.findall(plot_pattern, stdout_output)
     return matches
 
-def chat_with_llm(e2b_code_interpreter: Sandbox, user_message: str, dataset_path: str) -> Tuple[Optional[List[Any]], str, List[str]]:
+def request_completion(client: Together, messages: List[dict]) -> Tuple[str, float]:
+    """Call the chat model and return (content, latency in seconds)"""
+    start = time.perf_counter()
+    response = client.chat.completions.create(
+        model=st.session_state.model_name,
+        messages=messages,
+    )
+    return response.choices[0].message.content, time.perf_counter() - start
+
+def build_dataset_profile(df: pd.DataFrame) -> str:
+    """Compact description of the dataset given to the model when repairing code"""
+    dtypes = "\n".join(f"- {col}: {dtype}" for col, dtype in df.dtypes.astype(str).items())
+    return (
+        f"Shape: {df.shape[0]} baris, {df.shape[1]} kolom\n"
+        f"Kolom dan tipe data:\n{dtypes}\n"
+        f"Contoh 3 baris pertama:\n{df.head(3).to_string()}"
+    )
+
+def build_repair_prompt(error: str, dataset_profile: str) -> str:
+    return f"""Kode Python sebelumnya gagal dieksekusi dengan error berikut:
+
+```
+{error}
+```
+
+Profil dataset:
+{dataset_profile or '(tidak tersedia)'}
+
+Perbaiki kode tersebut. Berikan kembali kode lengkap yang sudah diperbaiki dalam satu blok ```python```."""
+
+def record_attempt_metric(attempt: int, llm_latency: float, exec_latency: float, success: bool) -> None:
+    """Store per-attempt latency and outcome in the session for the metrics export"""
+    st.session_state.repair_metrics.append({
+        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'attempt': attempt,
+        'llm_latency_s': round(llm_latency, 3),
+        'exec_latency_s': round(exec_latency, 3),
+        'success': success,
+    })
+
+def chat_with_llm(e2b_code_interpreter: Sandbox, user_message: str, dataset_path: str, dataset_profile: str = "") -> Tuple[Optional[List[Any]], str, List[str]]:
     # Enhanced system prompt for better visualization
     system_prompt = f"""Kamu adalah ilmuwan data Python dan pakar visualisasi data. Kamu diberi kumpulan data di jalur '{dataset_path}' dan juga kueri pengguna.
 
@@ -133,23 +184,49 @@ plt.show()
         {"role": "user", "content": user_message},
     ]
 
+    client = Together(api_key=st.session_state.together_api_key)
     with st.spinner('Mendapatkan respons dari model Together AI LLM...'):
-        client = Together(api_key=st.session_state.together_api_key)
-        response = client.chat.completions.create(
-            model=st.session_state.model_name,
-            messages=messages,
-        )
+        response_content, llm_latency = request_completion(client, messages)
 
-        response_message = response.choices[0].message
-        python_code = match_code_blocks(response_message.content)
-        
-        if python_code:
-            code_interpreter_results, stdout_output = code_interpret(e2b_code_interpreter, python_code)
-            matplotlib_plots = extract_matplotlib_plots(stdout_output)
-            return code_interpreter_results, response_message.content, matplotlib_plots
-        else:
-            st.warning("Gagal mencocokkan kode Python dalam respons model")
-            return None, response_message.content, []
+    python_code = match_code_blocks(response_content)
+    if not python_code:
+        st.warning("Gagal mencocokkan kode Python dalam respons model")
+        return None, response_content, []
+
+    start = time.perf_counter()
+    code_interpreter_results, stdout_output, error = code_interpret(e2b_code_interpreter, python_code)
+    record_attempt_metric(0, llm_latency, time.perf_counter() - start, error is None)
+
+    # Self-repair: kirim traceback + profil dataset ke model, eksekusi ulang di sandbox yang sama
+    repair_deadline = time.perf_counter() + REPAIR_TIME_BUDGET
+    attempt = 0
+    while error and attempt < MAX_REPAIR_ATTEMPTS and time.perf_counter() < repair_deadline:
+        attempt += 1
+        messages += [
+            {"role": "assistant", "content": response_content},
+            {"role": "user", "content": build_repair_prompt(error, dataset_profile)},
+        ]
+        with st.spinner(f'Kode gagal dieksekusi, memperbaiki otomatis (percobaan {attempt}/{MAX_REPAIR_ATTEMPTS})...'):
+            response_content, llm_latency = request_completion(client, messages)
+
+        repaired_code = match_code_blocks(response_content)
+        if not repaired_code:
+            record_attempt_metric(attempt, llm_latency, 0.0, False)
+            break
+
+        start = time.perf_counter()
+        code_interpreter_results, stdout_output, error = code_interpret(e2b_code_interpreter, repaired_code)
+        record_attempt_metric(attempt, llm_latency, time.perf_counter() - start, error is None)
+
+    if error:
+        st.warning(f"Kode masih gagal setelah {attempt} percobaan perbaikan.")
+        with st.expander("Traceback terakhir"):
+            st.code(error)
+    elif attempt:
+        st.info(f"🔧 Kode berhasil diperbaiki otomatis setelah {attempt} percobaan.")
+
+    matplotlib_plots = extract_matplotlib_plots(stdout_output)
+    return code_interpreter_results, response_content, matplotlib_plots
 
 def upload_dataset(code_interpreter: Sandbox, uploaded_file) -> str:
     dataset_path = f"./{uploaded_file.name}"
@@ -163,6 +240,24 @@ def upload_dataset(code_interpreter: Sandbox, uploaded_file) -> str:
         st.error(f"Error during file upload: {error}")
         raise error
 
+@st.cache_data(show_spinner=False)
+def load_dataset(file_bytes: bytes) -> pd.DataFrame:
+    """Parse the uploaded CSV once per file content, reused across reruns"""
+    return pd.read_csv(BytesIO(file_bytes))
+
+def run_local_analysis(df: pd.DataFrame, template_name: str, query: str) -> None:
+    """Run a pre-vetted analysis template in-process and display its output"""
+    with st.spinner('Menjalankan template analisis lokal...'):
+        start = time.perf_counter()
+        summary, plots, table = run_template(template_name, df, query)
+        elapsed = time.perf_counter() - start
+
+    st.markdown("---")
+    st.subheader("⚡ Analisis Lokal:")
+    st.markdown(summary)
+    st.caption(f"Template '{template_name}' selesai dalam {elapsed:.2f} detik tanpa LLM maupun sandbox")
+    display_results([table] if table is not None else None, plots)
+
 def display_results(code_results, matplotlib_plots):
     """Display various types of results including visualizations"""
     
@@ -231,6 +326,10 @@ def main():
         st.session_state.e2b_api_key = ''
     if 'model_name' not in st.session_state:
         st.session_state.model_name = ''
+    if 'use_local_templates' not in st.session_state:
+        st.session_state.use_local_templates = True
+    if 'repair_metrics' not in st.session_state:
+        st.session_state.repair_metrics = []
 
     with st.sidebar:
         st.header("⚙️ API Key dan Konfigurasi")
@@ -264,6 +363,31 @@ def main():
             index=0
         )
         st.session_state.model_name = model_options[selected_model]
+
+        st.session_state.use_local_templates = st.checkbox(
+            "⚡ Gunakan template analisis lokal",
+            value=st.session_state.use_local_templates,
+            help="Pertanyaan standar (distribusi, korelasi, rata-rata per kategori, histogram) dijawab langsung tanpa LLM"
+        )
+        
+        if st.session_state.repair_metrics:
+            with st.expander("📈 Metrik Eksekusi & Self-Repair"):
+                metrics_df = pd.DataFrame(st.session_state.repair_metrics)
+                first = metrics_df[metrics_df['attempt'] == 0]
+                repairs = metrics_df[metrics_df['attempt'] > 0]
+                st.metric("Sukses percobaan pertama", f"{first['success'].mean():.0%}")
+                if not repairs.empty:
+                    st.metric("Sukses perbaikan", f"{repairs['success'].mean():.0%}")
+                st.dataframe(
+                    metrics_df.groupby('attempt')[['llm_latency_s', 'exec_latency_s', 'success']].mean().round(3),
+                    use_container_width=True
+                )
+                st.download_button(
+                    "📥 Export metrik (CSV)",
+                    data=metrics_df.to_csv(index=False),
+                    file_name="repair_metrics.csv",
+                    mime="text/csv"
+                )
         
         st.markdown("---")
         st.markdown("### 📝 Tips Penggunaan:")
@@ -288,7 +412,7 @@ def main():
     if uploaded_file is not None:
         with col2:
             st.subheader("👀 Preview Dataset")
-            df = pd.read_csv(uploaded_file)
+            df = load_dataset(uploaded_file.getvalue())
             
             # Dataset info
             st.write(f"**Shape:** {df.shape[0]} baris, {df.shape[1]} kolom")
@@ -336,10 +460,18 @@ def main():
         
         # Analysis button
         if st.button("🚀 Analisis Data", type="primary", use_container_width=True):
-            if not st.session_state.together_api_key or not st.session_state.e2b_api_key:
-                st.error("❌ Silakan masukkan kedua API key di sidebar kiri.")
-            elif not query.strip():
+            template_name = match_template(query) if st.session_state.use_local_templates else None
+
+            if not query.strip():
                 st.error("❌ Silakan masukkan pertanyaan tentang data Anda.")
+            elif template_name:
+                try:
+                    run_local_analysis(df, template_name, query)
+                except Exception as e:
+                    st.error(f"❌ Error saat menjalankan template lokal: {str(e)}")
+                    st.info("💡 Nonaktifkan template lokal di sidebar untuk memakai LLM.")
+            elif not st.session_state.together_api_key or not st.session_state.e2b_api_key:
+                st.error("❌ Silakan masukkan kedua API key di sidebar kiri.")
             else:
                 try:
                     with Sandbox(api_key=st.session_state.e2b_api_key) as code_interpreter:
@@ -348,7 +480,7 @@ def main():
                         
                         # Get analysis and visualizations
                         code_results, llm_response, matplotlib_plots = chat_with_llm(
-                            code_interpreter, query, dataset_path
+                            code_interpreter, query, dataset_path, build_dataset_profile(df)
                         )
                         
                         # Display results
@@ -2,9 +2,11 @@
 import streamlit as st
 from phi.assistant import Assistant
 from phi.llm.openai import OpenAIChat
-from phi.tools.yfinance import YFinanceTools
 import time
 
+from market_data import get_market_data, start_prefetcher
+from market_tools import InstrumentedYFinanceTools
+
 # Set up the Streamlit app
 st.set_page_config(
     page_title="Agen Investasi AI",
@@ -123,6 +125,13 @@ with st.sidebar:
     
     st.markdown("---")
     
+    # Cache data pasar dipakai bersama oleh semua sesi
+    st.subheader("⚡ Cache Data Pasar")
+    market_stats = get_market_data().stats
+    st.caption(f"{market_stats['hits']} dari cache, {market_stats['coalesced']} digabung, {market_stats['misses']} ke Yahoo Finance")
+    
+    st.markdown("---")
+    
     # Help section
     st.subheader("❓ Bantuan")
     with st.expander("Cara Menggunakan"):
@@ -206,6 +215,9 @@ if openai_api_key:
         if stock2:
             st.success(f"✅ Saham terpilih: {stock2}")
     
+    # Saham populer dijaga tetap hangat di cache oleh thread latar belakang
+    start_prefetcher(popular_stocks_1 + popular_stocks_2)
+    
     # Analysis section
     if stock1 and stock2:
         st.markdown("---")
@@ -233,39 +245,38 @@ if openai_api_key:
         
         if analyze_button:
             try:
-                # Create an instance of the Assistant
-                with st.spinner("🤖 Menginisialisasi AI Assistant..."):
-                    assistant = Assistant(
-                        llm=OpenAIChat(model="gpt-4o", api_key=openai_api_key),
-                        tools=[YFinanceTools(
-                            stock_price=True, 
-                            analyst_recommendations=True, 
-                            company_info=True, 
-                            company_news=True
-                        )],
-                        show_tool_calls=True,
-                    )
-                
-                # Progress bar
+                # Progress digerakkan oleh tool call YFinance yang benar-benar selesai
                 progress_bar = st.progress(0)
                 status_text = st.empty()
+                tool_log = st.empty()
+                expected_calls = 4 * 2  # 4 jenis data x 2 saham
                 
-                # Simulate analysis steps
-                steps = [
-                    "Mengambil data harga saham...",
-                    "Menganalisis rekomendasi analis...",
-                    "Mengumpulkan informasi perusahaan...",
-                    "Mencari berita terkini...",
-                    "Menyusun laporan perbandingan..."
-                ]
+                def on_tool_call(event):
+                    calls = yfinance_tools.calls
+                    progress_bar.progress(min(len(calls) / expected_calls, 0.95))
+                    status_text.text(f"{'✅' if event['ok'] else '⚠️'} {event['label']} {event['symbol']} ({event['latency']:.2f}s)")
+                    tool_log.dataframe(
+                        [{"Data": c["label"], "Saham": c["symbol"], "Latensi (s)": round(c["latency"], 2)} for c in calls],
+                        use_container_width=True
+                    )
                 
-                for i, step in enumerate(steps):
-                    status_text.text(step)
-                    progress_bar.progress((i + 1) / len(steps))
-                    time.sleep(1)
+                yfinance_tools = InstrumentedYFinanceTools(
+                    on_call=on_tool_call,
+                    market_data=get_market_data(),
+                    stock_price=True, 
+                    analyst_recommendations=True, 
+                    company_info=True, 
+                    company_news=True
+                )
+                assistant = Assistant(
+                    llm=OpenAIChat(model="gpt-4o", api_key=openai_api_key),
+                    tools=[yfinance_tools],
+                    show_tool_calls=True,
+                )
                 
                 # Get the response from the assistant
                 status_text.text("🔍 Menghasilkan analisis mendalam...")
+                run_started = time.perf_counter()
                 query = f"""
                 Bandingkan saham {stock1} dengan {stock2}. 
                 Berikan analisis komprehensif yang mencakup:
@@ -279,10 +290,13 @@ if openai_api_key:
                 """
                 
                 response = assistant.run(query, stream=False)
+                run_seconds = time.perf_counter() - run_started
+                tool_seconds = sum(c["latency"] for c in yfinance_tools.calls)
                 
                 # Clear progress indicators
                 progress_bar.empty()
                 status_text.empty()
+                tool_log.empty()
                 
                 # Display results
                 st.success("✅ Analisis selesai!")
@@ -299,15 +313,18 @@ if openai_api_key:
                 
                 with tab2:
                     st.markdown("### 🛠️ Tools yang Digunakan")
-                    st.info("Analisis ini menggunakan:")
-                    tools_used = [
-                        "📈 YFinance - Data harga real-time",
-                        "📊 Rekomendasi analis profesional", 
-                        "🏢 Informasi fundamental perusahaan",
-                        "📰 Berita dan update terkini"
-                    ]
-                    for tool in tools_used:
-                        st.write(f"• {tool}")
+                    col_a, col_b, col_c = st.columns(3)
+                    col_a.metric("Tool call", len(yfinance_tools.calls))
+                    col_b.metric("Waktu data YFinance", f"{tool_seconds:.1f}s")
+                    col_c.metric("Waktu total", f"{run_seconds:.1f}s")
+                    st.dataframe(
+                        [
+                            {"Data": c["label"], "Saham": c["symbol"], "Latensi (s)": round(c["latency"], 3),
+                             "Status": "✅" if c["ok"] else "⚠️"}
+                            for c in yfinance_tools.calls
+                        ],
+                        use_container_width=True
+                    )
                 
                 with tab3:
                     st.markdown("### 📝 Ringkasan Perbandingan")
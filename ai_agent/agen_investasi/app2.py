@@ -1,7 +1,12 @@
 import streamlit as st
 from phi.assistant import Assistant
 from phi.llm.openai import OpenAIChat
-from phi.tools.yfinance import YFinanceTools
+
+from comparison_engine import BENCHMARK, compare, narration_prompt, price_frame
+from market_data import KINDS, fetch_bundle, start_prefetcher
+from market_tools import format_bundle
+from ohlcv_store import OHLCVStore
+from screener import UNIVERSES, ScreenStore, factor_scores, screening_prompt
 
 # 1. Set page config as the first Streamlit command
 st.set_page_config(
@@ -50,6 +55,9 @@ openai_api_key = st.sidebar.text_input("Masukkan API OpenAI", type="password")
 # 6. Optional slider for historical data range
 history_range = st.sidebar.slider("Rentang data historis (hari)", 30, 365, 90)
 
+# Mode perbandingan (2-4 saham) atau screening seluruh universe
+mode = st.sidebar.radio("Mode", ["Perbandingan", "Screening"], horizontal=True)
+
 # 7. Page caption
 st.caption("AI Agen untuk membandingkan kinerja beberapa saham dan menghasilkan laporan secara terperinci.")
 
@@ -61,7 +69,16 @@ system_prompt = (
     "should conduct their own research."
 )
 
+@st.cache_resource(show_spinner=False)
+def get_screen_store() -> ScreenStore:
+    return ScreenStore()
+
+@st.cache_resource(show_spinner=False)
+def get_ohlcv_store() -> OHLCVStore:
+    return OHLCVStore()
+
 # 9. Initialize the assistant if API key is provided
+# Angka dihitung oleh comparison_engine; LLM hanya menarasikan tabel yang sudah jadi
 if openai_api_key:
     assistant = Assistant(
         llm=OpenAIChat(
@@ -69,41 +86,75 @@ if openai_api_key:
             api_key=openai_api_key,
             system_prompt=system_prompt
         ),
-        tools=[
-            YFinanceTools(
-                stock_price=True,
-                analyst_recommendations=True,
-                company_info=True,
-                company_news=True
-            )
-        ],
-        show_tool_calls=True,
     )
 
-    # 10. Multi-select drop-down for stocks (up to 4)
-    available_stocks = [
-        "AAPL", "AMZN", "TSLA", "MSFT", "GOOGL", "META", "NFLX", "NVDA", 
-        "BABA", "BAC", "JPM", "WMT", "DIS", "V", "MA"
-    ]
-    selected_stocks = st.multiselect(
-        "Pilih simbol saham (2 hingga 4)",
-        options=available_stocks,
-        max_selections=4
-    )
+    if mode == "Perbandingan":
+        # 10. Multi-select drop-down for stocks (up to 4)
+        available_stocks = [
+            "AAPL", "AMZN", "TSLA", "MSFT", "GOOGL", "META", "NFLX", "NVDA", 
+            "BABA", "BAC", "JPM", "WMT", "DIS", "V", "MA"
+        ]
+        start_prefetcher(available_stocks)
+        selected_stocks = st.multiselect(
+            "Pilih simbol saham (2 hingga 4)",
+            options=available_stocks,
+            max_selections=4
+        )
+
+        # 11. Button to trigger comparison
+        if st.button("Bandingkan"):
+            if len(selected_stocks) < 2:
+                st.warning("Pilih minimal 2 simbol saham untuk dibandingkan.")
+            else:
+                # Semua (saham x jenis data) diambil paralel dalam satu fan-out;
+                # histori OHLCV hanya mengunduh bar yang belum tersimpan
+                with st.spinner("Mengambil data pasar..."):
+                    bundle = fetch_bundle(selected_stocks, KINDS)
+                    closes = get_ohlcv_store().closes(selected_stocks + [BENCHMARK], history_range)
+                try:
+                    failed = [symbol for symbol in selected_stocks if symbol not in closes.columns]
+                    if failed:
+                        raise LookupError(f"data historis tidak tersedia untuk {', '.join(failed)}")
+                    prices = price_frame(closes[selected_stocks], history_range)
+                    # Tanpa benchmark, beta dihitung terhadap keranjang saham terpilih
+                    benchmark = closes[BENCHMARK].dropna() if BENCHMARK in closes.columns else None
+                    result = compare(prices, benchmark)
+                except Exception as e:
+                    st.error(f"Gagal menghitung perbandingan: {e}")
+                else:
+                    st.subheader(f"Perbandingan {result['start']} s/d {result['end']} ({result['observations']} hari bursa)")
+                    st.dataframe(result["metrics"], use_container_width=True)
+                    st.line_chart(prices / prices.iloc[0] * 100)
+                    st.caption(f"Harga dinormalisasi ke 100 pada awal periode. Beta terhadap {result['beta_against']}.")
+                    st.markdown("**Korelasi return harian**")
+                    st.dataframe(result["correlation"], use_container_width=True)
 
-    # 11. Button to trigger comparison
-    if st.button("Bandingkan"):
-        if len(selected_stocks) < 2:
-            st.warning("Pilih minimal 2 simbol saham untuk dibandingkan.")
-        else:
-            # Build the query using selected symbols
-            stock_list = ", ".join(selected_stocks)
-            query = (
-                f"Bandingkan {stock_list} selama {history_range} hari. "
-                "Tampilkan hasil dalam format tabel. Gunakan semua tools yang tersedia."
-            )
-            response = assistant.run(query, stream=False)
-            st.write(response)
+                    response = assistant.run(narration_prompt(result, format_bundle(bundle)), stream=False)
+                    st.write(response)
+    else:
+        # Skor faktor dihitung untuk seluruh universe; LLM hanya dipanggil untuk shortlist top-K
+        universes = st.multiselect("Universe", list(UNIVERSES), default=list(UNIVERSES))
+        top_k = st.slider("Jumlah saham di shortlist", 3, 10, 5)
+        if st.button("Jalankan Screening"):
+            symbols = [symbol for name in universes for symbol in UNIVERSES[name]]
+            if not symbols:
+                st.warning("Pilih minimal satu universe.")
+            else:
+                try:
+                    with st.spinner(f"Memuat data historis {len(symbols)} saham..."):
+                        prices = get_screen_store().load(symbols)
+                    scores = factor_scores(prices)
+                except Exception as e:
+                    st.error(f"Gagal menjalankan screening: {e}")
+                else:
+                    st.subheader(f"Hasil screening: {len(scores)} dari {len(symbols)} saham")
+                    st.dataframe(scores, use_container_width=True)
+                    shortlist = scores.head(top_k)
+                    with st.spinner(f"Menganalisis {len(shortlist)} saham teratas..."):
+                        bundle = fetch_bundle(list(shortlist.index))
+                        response = assistant.run(screening_prompt(shortlist, len(scores), format_bundle(bundle)), stream=False)
+                    st.subheader("Analisis shortlist")
+                    st.write(response)
 
 # 12. Footer for disclaimer & copyright
 st.markdown(
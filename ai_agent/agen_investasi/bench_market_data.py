@@ -0,0 +1,124 @@
+"""
+Offline benchmark for the market data layer.
+
+Simulates concurrent sessions that each run a comparison (4 data kinds per ticker)
+against a FixtureProvider with artificial latency, and compares direct provider
+calls with the shared TTL cache (coalescing) and with a prefetcher-warmed cache.
+Also compares serial vs fan-out fetching of a 1-4 ticker comparison bundle.
+
+    python bench_market_data.py --sessions 20 --latency-ms 300
+    python bench_market_data.py --record fixtures/   # capture live Yahoo data as fixtures
+"""
+import os
+import time
+import random
+import argparse
+import tempfile
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from market_data import KINDS, FixtureProvider, MarketData, Prefetcher, fetch_bundle, record_fixtures
+
+SYMBOLS = ["AAPL", "GOOGL", "MSFT", "TSLA", "BBCA.JK", "TLKM.JK"]
+
+
+class CountingProvider:
+    def __init__(self, provider):
+        self.provider = provider
+        self.calls = 0
+
+    def fetch(self, kind, symbol):
+        self.calls += 1
+        return self.provider.fetch(kind, symbol)
+
+
+def write_synthetic_fixtures(directory: str) -> None:
+    rng = random.Random(0)
+    for symbol in SYMBOLS:
+        price = rng.uniform(50, 500)
+        data = {
+            "quote": {"price": price, "currency": "USD"},
+            "info": {"shortName": symbol, "symbol": symbol, "regularMarketPrice": price, "trailingPE": rng.uniform(5, 40)},
+            "recommendations": {"0": {"period": "0m", "strongBuy": 10, "buy": 20, "hold": 5, "sell": 1, "strongSell": 0}},
+            "news": [{"title": f"{symbol} news {i}"} for i in range(5)],
+        }
+        with open(os.path.join(directory, f"{symbol}.json"), "w") as f:
+            json.dump(data, f)
+
+
+def run_sessions(fetch, sessions: int) -> float:
+    """Each session compares two random tickers; sessions run concurrently like Streamlit users."""
+    rng = random.Random(1)
+    pairs = [rng.sample(SYMBOLS, 2) for _ in range(sessions)]
+
+    def session(pair):
+        for symbol in pair:
+            for kind in KINDS:
+                fetch(kind, symbol)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as executor:
+        list(executor.map(session, pairs))
+    return time.perf_counter() - start
+
+
+def time_bundle(directory: str, latency: float, symbols, fanout: bool) -> float:
+    market_data = MarketData(FixtureProvider(directory, latency))
+    start = time.perf_counter()
+    if fanout:
+        fetch_bundle(symbols, KINDS, market_data)
+    else:
+        for symbol in symbols:
+            for kind in KINDS:
+                market_data.get(kind, symbol)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--fixtures", help="Directory with recorded fixtures (default: synthetic)")
+    parser.add_argument("--record", metavar="DIR", help="Record live Yahoo Finance data for SYMBOLS into DIR and exit")
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures(SYMBOLS, args.record)
+        print(f"Recorded fixtures for {len(SYMBOLS)} symbols into {args.record}")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = args.fixtures or tmp
+        if not args.fixtures:
+            write_synthetic_fixtures(directory)
+        latency = args.latency_ms / 1000
+
+        direct = CountingProvider(FixtureProvider(directory, latency))
+        uncached = run_sessions(direct.fetch, args.sessions)
+
+        cached_provider = CountingProvider(FixtureProvider(directory, latency))
+        cache = MarketData(cached_provider)
+        cached = run_sessions(cache.get, args.sessions)
+
+        warm_provider = CountingProvider(FixtureProvider(directory, latency))
+        warm_cache = MarketData(warm_provider)
+        Prefetcher(warm_cache, SYMBOLS).warm_once()
+        warm_calls = warm_provider.calls
+        warmed = run_sessions(warm_cache.get, args.sessions)
+
+        bundles = [
+            (n, time_bundle(directory, latency, SYMBOLS[:n], False), time_bundle(directory, latency, SYMBOLS[:n], True))
+            for n in range(1, 5)
+        ]
+
+    print(f"sessions: {args.sessions}, provider latency: {args.latency_ms:.0f}ms, {len(KINDS)} kinds x 2 tickers per session")
+    print(f"direct provider       : {uncached:6.2f}s  provider calls: {direct.calls}")
+    print(f"shared cache          : {cached:6.2f}s  provider calls: {cached_provider.calls}  {cache.stats}")
+    print(f"prefetched cache      : {warmed:6.2f}s  provider calls during sessions: {warm_provider.calls - warm_calls}")
+    print("comparison bundle     : tickers  serial  fan-out")
+    for n, serial, fanout in bundles:
+        print(f"                        {n:7d}  {serial:5.2f}s  {fanout:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Offline benchmark for screening mode.
+
+Builds synthetic universes of daily closes (one year, some tickers with gaps or a
+short history), stores them in the Parquet ScreenStore and times reading plus
+vectorised factor scoring against a per-ticker pandas loop.
+
+    python bench_screener.py --sizes 100 250 500 1000
+"""
+import os
+import time
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from screener import MIN_OBSERVATIONS, ScreenStore, factor_scores
+
+
+def synthetic_closes(symbols, days: int = 252, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end="2025-06-30", periods=days)
+    drift = rng.normal(0.0004, 0.0003, len(symbols))
+    vol = rng.uniform(0.01, 0.035, len(symbols))
+    paths = 100 * np.cumprod(1 + drift + vol * rng.standard_normal((days, len(symbols))), axis=0)
+    frame = pd.DataFrame(paths, index=dates, columns=symbols)
+    frame.iloc[:, ::10] = frame.iloc[:, ::10].mask(rng.random((days, len(frame.columns[::10]))) < 0.03)
+    frame.iloc[: days - MIN_OBSERVATIONS // 2, ::25] = np.nan  # baru listing
+    return frame
+
+
+def loop_scores(prices: pd.DataFrame) -> pd.DataFrame:
+    """Baseline: the same factors computed ticker by ticker."""
+    rows = {}
+    for symbol in prices.columns:
+        series = prices[symbol]
+        if series.notna().sum() < MIN_OBSERVATIONS:
+            continue
+        series = series.ffill()
+        returns = series.pct_change(fill_method=None)
+        rows[symbol] = {
+            "Momentum 12-1 (%)": (series.iloc[-22] / series.iloc[0] - 1) * 100,
+            "Momentum 3B (%)": (series.iloc[-1] / series.iloc[-64] - 1) * 100,
+            "Volatilitas (%)": returns.std() * np.sqrt(252) * 100,
+            "Max Drawdown (%)": (series / series.cummax() - 1).min() * 100,
+        }
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 250, 500])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'tickers':>8} {'write':>8} {'read':>8} {'vectorised':>11} {'loop':>8}")
+    for size in args.sizes:
+        symbols = [f"T{i:04d}" for i in range(size)]
+        closes = synthetic_closes(symbols)
+        with tempfile.TemporaryDirectory() as tmp:
+            store = ScreenStore(os.path.join(tmp, "prices.parquet"), downloader=lambda missing: closes[missing])
+
+            start = time.perf_counter()
+            store.load(symbols)
+            write = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                prices = store.load(symbols)
+            read = (time.perf_counter() - start) / args.repeat
+
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                scores = factor_scores(prices)
+            vectorised = (time.perf_counter() - start) / args.repeat
+
+            start = time.perf_counter()
+            baseline = loop_scores(prices)
+            loop = time.perf_counter() - start
+
+        assert np.allclose(scores.loc[baseline.index, "Volatilitas (%)"], baseline["Volatilitas (%)"], atol=0.01)
+        print(f"{size:8d} {write:7.3f}s {read:7.3f}s {vectorised:10.4f}s {loop:7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
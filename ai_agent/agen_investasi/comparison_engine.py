@@ -0,0 +1,92 @@
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+BENCHMARK = "SPY"
+
+METRIC_COLUMNS = [
+    "Harga Terakhir", "Return Total (%)", "Return Tahunan (%)", "Volatilitas Tahunan (%)",
+    "Max Drawdown (%)", "Sharpe", "Beta",
+]
+
+
+def price_frame(closes: pd.DataFrame, days: int) -> pd.DataFrame:
+    """
+    Align daily closes (dates x symbols) on the dates every symbol traded within
+    the last `days` calendar days.
+    """
+    frame = closes.sort_index()
+    frame = frame[frame.index >= frame.index.max() - pd.Timedelta(days=days)]
+    # Libur bursa berbeda per negara: isi celah dengan harga terakhir, lalu buang awal yang kosong
+    return frame.ffill().dropna()
+
+
+def compare(prices: pd.DataFrame, benchmark: Optional[pd.Series] = None, risk_free: float = 0.0) -> Dict:
+    """
+    Risk/return metrics for every column of an aligned price frame in one vectorised pass.
+    Beta is measured against `benchmark` (aligned closes) or, without one, against the
+    equal-weighted basket of the compared symbols. `risk_free` is an annual rate.
+    """
+    if len(prices) < 3 or prices.shape[1] < 2:
+        raise ValueError("Need at least 2 symbols with 3 overlapping trading days")
+
+    values = prices.to_numpy(dtype=float)
+    returns = values[1:] / values[:-1] - 1.0
+    periods = len(returns)
+
+    total_return = values[-1] / values[0] - 1.0
+    annual_return = (1.0 + total_return) ** (TRADING_DAYS / periods) - 1.0
+    volatility = returns.std(axis=0, ddof=1) * np.sqrt(TRADING_DAYS)
+    sharpe = np.divide(
+        returns.mean(axis=0) * TRADING_DAYS - risk_free, volatility,
+        out=np.full_like(volatility, np.nan), where=volatility > 0
+    )
+    max_drawdown = (values / np.maximum.accumulate(values, axis=0) - 1.0).min(axis=0)
+
+    if benchmark is not None:
+        bench_values = benchmark.reindex(prices.index).ffill().bfill().to_numpy(dtype=float)
+        market = bench_values[1:] / bench_values[:-1] - 1.0
+    else:
+        market = returns.mean(axis=1)
+    centred = returns - returns.mean(axis=0)
+    market_centred = market - market.mean()
+    market_var = market_centred @ market_centred
+    beta = centred.T @ market_centred / market_var if market_var > 0 else np.full(prices.shape[1], np.nan)
+
+    metrics = pd.DataFrame(
+        np.column_stack([
+            values[-1], total_return * 100, annual_return * 100, volatility * 100,
+            max_drawdown * 100, sharpe, beta,
+        ]),
+        index=prices.columns, columns=METRIC_COLUMNS,
+    ).round(2)
+    correlation = pd.DataFrame(np.corrcoef(returns, rowvar=False), index=prices.columns, columns=prices.columns).round(2)
+
+    return {
+        "metrics": metrics,
+        "correlation": correlation,
+        "start": prices.index[0].date(),
+        "end": prices.index[-1].date(),
+        "observations": periods,
+        "beta_against": benchmark.name if benchmark is not None else "equal-weighted basket",
+    }
+
+
+def narration_prompt(result: Dict, context: str = "") -> str:
+    """Prompt for the LLM to explain the precomputed tables (and optional fetched data) without recomputing anything."""
+    context = f"\n\nData pendukung per saham (harga, profil, rekomendasi analis, berita):\n{context}" if context else ""
+    return f"""Berikut hasil perhitungan (deterministik) untuk periode {result['start']} s/d {result['end']} \
+({result['observations']} hari bursa, beta terhadap {result['beta_against']}):
+
+Metrik:
+{result['metrics'].to_string()}
+
+Korelasi return harian:
+{result['correlation'].to_string()}{context}
+
+Jelaskan perbandingan saham-saham ini berdasarkan tabel di atas: siapa unggul dari sisi return,
+risiko (volatilitas, drawdown), return per unit risiko (Sharpe), sensitivitas pasar (beta) dan
+diversifikasi (korelasi). Gunakan data pendukung untuk konteks fundamental, sentimen analis dan
+berita. Jangan menghitung ulang atau mengubah angka; kutip angka dari tabel."""
@@ -0,0 +1,251 @@
+import os
+import json
+import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# TTL per jenis data (detik)
+TTL = {
+    "quote": 60,
+    "info": 24 * 3600,
+    "recommendations": 6 * 3600,
+    "news": 15 * 60,
+}
+KINDS = tuple(TTL)
+
+# Jika di-set, semua data dibaca dari folder fixture (mode offline / benchmark)
+FIXTURES_ENV = "MARKET_DATA_FIXTURES"
+
+# Batas request ke Yahoo Finance (rata-rata per detik + burst), dibagi oleh semua thread & sesi
+YAHOO_REQUESTS_PER_SECOND = 8.0
+YAHOO_BURST = 20
+# Ukuran pool fan-out: cukup untuk 4 saham x 5 jenis data sekaligus
+FANOUT_WORKERS = 20
+
+
+class RateLimiter:
+    """Token bucket shared by all threads: `rate` calls per second on average, up to `burst` at once."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate) - 1
+            self._updated = now
+            # Token negatif = antrean; tunggu sampai giliran token ini terisi
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+
+# Satu limiter untuk host Yahoo Finance, dipakai oleh semua modul yang mengambil data dari sana
+YAHOO_LIMITER = RateLimiter(YAHOO_REQUESTS_PER_SECOND, YAHOO_BURST)
+
+
+class YahooProvider:
+    """Fetches raw, JSON-serialisable market data from Yahoo Finance, rate limited per host."""
+
+    def __init__(self, limiter: RateLimiter = YAHOO_LIMITER):
+        self.limiter = limiter
+
+    def fetch(self, kind: str, symbol: str) -> Any:
+        import yfinance as yf
+
+        self.limiter.acquire()
+
+        ticker = yf.Ticker(symbol)
+        if kind == "quote":
+            fast_info = ticker.fast_info
+            return {"price": fast_info["lastPrice"], "currency": fast_info["currency"]}
+        if kind == "info":
+            return ticker.info
+        if kind == "recommendations":
+            recommendations = ticker.recommendations
+            return json.loads(recommendations.to_json(orient="index")) if recommendations is not None else {}
+        if kind == "news":
+            return ticker.news
+        raise ValueError(f"Unknown market data kind: {kind}")
+
+
+class FixtureProvider:
+    """
+    Serves market data from JSON files (<directory>/<SYMBOL>.json, one key per kind)
+    with an optional simulated latency, for offline runs and benchmarks.
+    """
+
+    def __init__(self, directory: str, latency: float = 0.0):
+        self.directory = directory
+        self.latency = latency
+
+    def fetch(self, kind: str, symbol: str) -> Any:
+        if self.latency:
+            time.sleep(self.latency)
+        path = os.path.join(self.directory, f"{symbol}.json")
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)[kind]
+        except (OSError, KeyError) as e:
+            raise LookupError(f"No {kind} fixture for {symbol}") from e
+
+
+def record_fixtures(symbols: Iterable[str], directory: str, provider=None) -> None:
+    """Capture live data for the given symbols as fixtures for FixtureProvider."""
+    provider = provider or YahooProvider()
+    os.makedirs(directory, exist_ok=True)
+    for symbol in symbols:
+        data = {}
+        for kind in KINDS:
+            try:
+                data[kind] = provider.fetch(kind, symbol)
+            except Exception as e:
+                logger.warning(f"Could not record {kind} for {symbol}: {e}")
+        with open(os.path.join(directory, f"{symbol}.json"), "w", encoding="utf-8") as f:
+            json.dump(data, f, default=str)
+
+
+class MarketData:
+    """
+    TTL cache per (kind, symbol) in front of a provider, shared by every session in
+    the process. Concurrent requests for the same missing key are coalesced into
+    one provider call; failures are not cached.
+    """
+
+    def __init__(self, provider, ttl: Optional[Dict[str, float]] = None):
+        self.provider = provider
+        self.ttl = {**TTL, **(ttl or {})}
+        self._entries: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+        self._inflight: Dict[Tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0}
+
+    def expires_in(self, kind: str, symbol: str) -> float:
+        entry = self._entries.get((kind, symbol.upper()))
+        return entry[0] - time.time() if entry else 0.0
+
+    def get(self, kind: str, symbol: str) -> Any:
+        key = (kind, symbol.upper())
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.time():
+                self.stats["hits"] += 1
+                return entry[1]
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self.stats["misses"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            value = self.provider.fetch(kind, key[1])
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            with self._lock:
+                self._entries[key] = (time.time() + self.ttl[kind], value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+
+class Prefetcher:
+    """Background thread that keeps popular symbols warm, refreshing entries shortly before they expire."""
+
+    def __init__(self, market_data: MarketData, symbols: Iterable[str], kinds: Iterable[str] = KINDS,
+                 interval: float = 30.0, workers: int = 4):
+        self.market_data = market_data
+        self.symbols: List[str] = list(dict.fromkeys(s for s in symbols if s))
+        self.kinds = list(kinds)
+        self.interval = interval
+        self.workers = workers
+        self._thread = threading.Thread(target=self._run, name="market-data-prefetch", daemon=True)
+
+    def start(self) -> "Prefetcher":
+        self._thread.start()
+        return self
+
+    def _warm(self, kind: str, symbol: str) -> None:
+        try:
+            self.market_data.get(kind, symbol)
+        except Exception as e:
+            logger.debug(f"Prefetch {kind} {symbol} failed: {e}")
+
+    def warm_once(self) -> int:
+        """Refresh every entry that is missing or expires within one interval; returns how many."""
+        due = [
+            (kind, symbol) for symbol in self.symbols for kind in self.kinds
+            if self.market_data.expires_in(kind, symbol) < self.interval
+        ]
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            list(executor.map(lambda item: self._warm(*item), due))
+        return len(due)
+
+    def _run(self) -> None:
+        while True:
+            self.warm_once()
+            time.sleep(self.interval)
+
+
+_market_data: Optional[MarketData] = None
+_prefetchers: Dict[Tuple[Tuple[str, ...], Tuple[str, ...]], Prefetcher] = {}
+_singleton_lock = threading.Lock()
+
+
+def get_market_data() -> MarketData:
+    """Process-wide market data layer; uses fixtures when MARKET_DATA_FIXTURES is set."""
+    global _market_data
+    with _singleton_lock:
+        if _market_data is None:
+            fixtures = os.environ.get(FIXTURES_ENV)
+            _market_data = MarketData(FixtureProvider(fixtures) if fixtures else YahooProvider())
+        return _market_data
+
+
+def fetch_bundle(symbols: Iterable[str], kinds: Iterable[str] = KINDS, market_data: Optional[MarketData] = None,
+                 workers: int = FANOUT_WORKERS) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch every (symbol, kind) pair concurrently on a bounded pool, so latency stays
+    roughly flat as symbols are added. Returns {symbol: {kind: value}}; a failed pair
+    holds its exception instead of a value.
+    """
+    market_data = market_data or get_market_data()
+    pairs = [(symbol, kind) for symbol in dict.fromkeys(symbols) for kind in kinds]
+
+    def fetch(pair):
+        try:
+            return market_data.get(pair[1], pair[0])
+        except Exception as e:
+            logger.warning(f"Fetching {pair[1]} for {pair[0]} failed: {e}")
+            return e
+
+    bundle: Dict[str, Dict[str, Any]] = {symbol: {} for symbol, _ in pairs}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(pairs)))) as executor:
+        for (symbol, kind), value in zip(pairs, executor.map(fetch, pairs)):
+            bundle[symbol][kind] = value
+    return bundle
+
+
+def start_prefetcher(symbols: Iterable[str], kinds: Iterable[str] = KINDS) -> None:
+    """Start (once per symbol list and kinds) a background prefetcher for the shared market data layer."""
+    symbols, kinds = tuple(sorted(s for s in symbols if s)), tuple(kinds)
+    market_data = get_market_data()
+    with _singleton_lock:
+        if (symbols, kinds) not in _prefetchers:
+            _prefetchers[(symbols, kinds)] = Prefetcher(market_data, symbols, kinds).start()
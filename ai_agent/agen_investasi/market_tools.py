@@ -0,0 +1,133 @@
+import time
+import json
+import functools
+from typing import Callable, Dict, List, Optional
+
+from phi.tools.yfinance import YFinanceTools
+
+from market_data import MarketData
+
+# Label tampilan untuk setiap tool YFinance
+TOOL_LABELS = {
+    "get_current_stock_price": "Harga saham",
+    "get_company_info": "Informasi perusahaan",
+    "get_analyst_recommendations": "Rekomendasi analis",
+    "get_company_news": "Berita terkini",
+    "get_historical_stock_prices": "Harga historis",
+}
+
+# Field ringkasan perusahaan, sama dengan YFinanceTools.get_company_info
+COMPANY_INFO_FIELDS = {
+    "Name": "shortName", "Symbol": "symbol", "Sector": "sector", "Industry": "industry",
+    "Address": "address1", "City": "city", "State": "state", "Zip": "zip", "Country": "country",
+    "EPS": "trailingEps", "P/E Ratio": "trailingPE", "52 Week Low": "fiftyTwoWeekLow",
+    "52 Week High": "fiftyTwoWeekHigh", "50 Day Average": "fiftyDayAverage",
+    "200 Day Average": "twoHundredDayAverage", "Website": "website", "Summary": "longBusinessSummary",
+    "Analyst Recommendation": "recommendationKey", "Number Of Analyst Opinions": "numberOfAnalystOpinions",
+    "Employees": "fullTimeEmployees", "Total Cash": "totalCash", "Free Cash flow": "freeCashflow",
+    "Operating Cash flow": "operatingCashflow", "EBITDA": "ebitda", "Revenue Growth": "revenueGrowth",
+    "Gross Margins": "grossMargins", "Ebitda Margins": "ebitdaMargins",
+}
+
+
+def format_company_info(info: Dict) -> str:
+    currency = info.get("currency", "USD")
+    cleaned = {name: info.get(field) for name, field in COMPANY_INFO_FIELDS.items()}
+    cleaned["Current Stock Price"] = f"{info.get('regularMarketPrice', info.get('currentPrice'))} {currency}"
+    cleaned["Market Cap"] = f"{info.get('marketCap', info.get('enterpriseValue'))} {currency}"
+    return json.dumps(cleaned, indent=2)
+
+
+def format_bundle(bundle: Dict[str, Dict], num_stories: int = 3) -> str:
+    """Render a fetch_bundle result as one context block, in the same formats the tools return."""
+    formatters = {
+        "quote": ("Harga saham", lambda v: f"{v['price']:.4f} {v.get('currency', '')}".strip()),
+        "info": ("Informasi perusahaan", format_company_info),
+        "recommendations": ("Rekomendasi analis", json.dumps),
+        "news": ("Berita terkini", lambda v: json.dumps(v[:num_stories], indent=2)),
+    }
+    sections = []
+    for symbol, data in bundle.items():
+        lines = [f"### {symbol}"]
+        for kind, (label, formatter) in formatters.items():
+            if kind not in data:
+                continue
+            value = data[kind]
+            lines.append(f"{label}: " + (f"tidak tersedia ({value})" if isinstance(value, Exception) else formatter(value)))
+        sections.append("\n".join(lines))
+    return "\n\n".join(sections)
+
+
+class InstrumentedYFinanceTools(YFinanceTools):
+    """
+    YFinanceTools that times every tool call and reports it to on_call as it finishes.
+    With a MarketData layer, prices, company info, recommendations and news are served
+    from its TTL cache instead of hitting Yahoo Finance on every call.
+    """
+
+    def __init__(self, on_call: Optional[Callable[[Dict], None]] = None, market_data: Optional[MarketData] = None, **kwargs):
+        self.market_data = market_data
+        super().__init__(**kwargs)
+        self.on_call = on_call
+        self.calls: List[Dict] = []
+        for function in self.functions.values():
+            function.entrypoint = self._instrument(function.name, function.entrypoint)
+
+    def _instrument(self, name: str, entrypoint: Callable) -> Callable:
+        # functools.wraps menjaga signature & docstring, jadi schema tool untuk LLM tidak berubah
+        @functools.wraps(entrypoint)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            result = entrypoint(*args, **kwargs)
+            event = {
+                "tool": name,
+                "label": TOOL_LABELS.get(name, name),
+                "symbol": kwargs.get("symbol", args[0] if args else ""),
+                "latency": time.perf_counter() - started,
+                "ok": not str(result).startswith(("Error", "Could not")),
+            }
+            self.calls.append(event)
+            if self.on_call is not None:
+                self.on_call(event)
+            return result
+
+        return timed
+
+    def get_current_stock_price(self, symbol: str) -> str:
+        if self.market_data is None:
+            return super().get_current_stock_price(symbol)
+        try:
+            price = self.market_data.get("quote", symbol)["price"]
+            return f"{price:.4f}" if price else f"Could not fetch current price for {symbol}"
+        except Exception as e:
+            return f"Error fetching current price for {symbol}: {e}"
+
+    def get_company_info(self, symbol: str) -> str:
+        if self.market_data is None:
+            return super().get_company_info(symbol)
+        try:
+            return format_company_info(self.market_data.get("info", symbol))
+        except Exception as e:
+            return f"Error fetching company profile for {symbol}: {e}"
+
+    def get_analyst_recommendations(self, symbol: str) -> str:
+        if self.market_data is None:
+            return super().get_analyst_recommendations(symbol)
+        try:
+            return json.dumps(self.market_data.get("recommendations", symbol))
+        except Exception as e:
+            return f"Error fetching analyst recommendations for {symbol}: {e}"
+
+    def get_company_news(self, symbol: str, num_stories: int = 3) -> str:
+        if self.market_data is None:
+            return super().get_company_news(symbol, num_stories)
+        try:
+            return json.dumps(self.market_data.get("news", symbol)[:num_stories], indent=2)
+        except Exception as e:
+            return f"Error fetching company news for {symbol}: {e}"
+
+    # Docstring dipakai sebagai deskripsi tool untuk LLM
+    get_current_stock_price.__doc__ = YFinanceTools.get_current_stock_price.__doc__
+    get_company_info.__doc__ = YFinanceTools.get_company_info.__doc__
+    get_analyst_recommendations.__doc__ = YFinanceTools.get_analyst_recommendations.__doc__
+    get_company_news.__doc__ = YFinanceTools.get_company_news.__doc__
@@ -0,0 +1,127 @@
+import os
+import time
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from market_data import FANOUT_WORKERS, YAHOO_LIMITER
+
+logger = logging.getLogger(__name__)
+
+OHLCV_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "ohlcv")
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+# Riwayat awal per ticker; cukup untuk rentang 365 hari + benchmark
+LOOKBACK = "2y"
+
+# fetcher(symbol, start) -> OHLCV harian; start=None berarti seluruh LOOKBACK
+Fetcher = Callable[[str, Optional[str]], pd.DataFrame]
+
+
+def fetch_ohlcv(symbol: str, start: Optional[str] = None) -> pd.DataFrame:
+    """Daily OHLCV (unadjusted prices plus Adj Close) from Yahoo Finance, from `start` or the full LOOKBACK."""
+    import yfinance as yf
+
+    YAHOO_LIMITER.acquire()
+    kwargs = {"start": start} if start else {"period": LOOKBACK}
+    frame = yf.Ticker(symbol).history(auto_adjust=False, **kwargs)
+    if frame.index.tz is not None:
+        frame.index = frame.index.tz_localize(None)
+    frame.index = frame.index.normalize().rename("Date")
+    return frame.reindex(columns=OHLCV_COLUMNS)
+
+
+class OHLCVStore:
+    """
+    Per-ticker Parquet partitions (<directory>/<SYMBOL>.parquet) of daily OHLCV.
+    update() fetches only the bars after the last stored one, re-fetching that bar to
+    catch a partial day; if its Adj Close changed (dividend or split) the ticker is
+    reloaded in full. Reads are memory-mapped and filtered to the requested window.
+    """
+
+    def __init__(self, directory: str = OHLCV_DIR, refresh_interval: float = 3600, fetcher: Fetcher = fetch_ohlcv):
+        self.directory = directory
+        self.refresh_interval = refresh_interval
+        self.fetcher = fetcher
+        self._locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+        self._locks_guard = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, symbol: str) -> str:
+        return os.path.join(self.directory, f"{symbol.upper()}.parquet")
+
+    def _lock(self, symbol: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks[symbol.upper()]
+
+    def _write(self, path: str, frame: pd.DataFrame) -> None:
+        # Tulis ke file sementara lalu ganti, supaya pembaca tidak pernah melihat file setengah jadi
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        frame.to_parquet(tmp)
+        os.replace(tmp, path)
+
+    def update(self, symbol: str) -> int:
+        """Bring one ticker up to date; returns the number of new bars."""
+        path = self.path(symbol)
+        with self._lock(symbol):
+            if os.path.exists(path) and time.time() - os.path.getmtime(path) < self.refresh_interval:
+                return 0
+
+            if not os.path.exists(path):
+                frame = self.fetcher(symbol, None)
+                if frame.empty:
+                    raise LookupError(f"No price history for {symbol}")
+                self._write(path, frame)
+                return len(frame)
+
+            stored = pd.read_parquet(path)
+            last = stored.index[-1]
+            tail = self.fetcher(symbol, last.strftime("%Y-%m-%d"))
+            if tail.empty:
+                os.utime(path)
+                return 0
+
+            if last in tail.index and not np.isclose(tail.at[last, "Adj Close"], stored.at[last, "Adj Close"], rtol=1e-4):
+                logger.info(f"{symbol}: adjusted close changed, reloading full history")
+                frame = self.fetcher(symbol, None)
+                self._write(path, frame)
+                return len(frame.index.difference(stored.index))
+
+            new = len(tail.index.difference(stored.index))
+            self._write(path, pd.concat([stored[~stored.index.isin(tail.index)], tail]).sort_index())
+            return new
+
+    def read(self, symbol: str, days: Optional[int] = None, columns: Iterable[str] = OHLCV_COLUMNS) -> pd.DataFrame:
+        import pyarrow.parquet as pq
+
+        filters = [("Date", ">=", pd.Timestamp.today().normalize() - pd.Timedelta(days=days))] if days else None
+        table = pq.read_table(self.path(symbol), columns=list(columns), filters=filters, memory_map=True,
+                              use_pandas_metadata=True)
+        return table.to_pandas()
+
+    def closes(self, symbols: Iterable[str], days: Optional[int] = None, column: str = "Adj Close",
+               workers: int = FANOUT_WORKERS) -> pd.DataFrame:
+        """
+        Update all symbols concurrently, then return one column per symbol (dates x symbols).
+        A symbol whose update fails is served from its stored history, or left out if it has none.
+        """
+        symbols = list(dict.fromkeys(symbols))
+
+        def update(symbol):
+            try:
+                self.update(symbol)
+            except Exception as e:
+                logger.warning(f"Updating {symbol} failed: {e}")
+
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(symbols)))) as executor:
+            list(executor.map(update, symbols))
+
+        series = {
+            symbol: self.read(symbol, days, [column])[column]
+            for symbol in symbols if os.path.exists(self.path(symbol))
+        }
+        return pd.DataFrame(series).sort_index()
@@ -0,0 +1,184 @@
+import os
+import time
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from market_data import YAHOO_LIMITER
+
+logger = logging.getLogger(__name__)
+
+SCREEN_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "screen_prices.parquet")
+
+TRADING_DAYS = 252
+# Jendela faktor: satu tahun kalender, sama untuk penyimpanan dan scoring
+HISTORY_WINDOW = pd.DateOffset(years=1)
+MIN_OBSERVATIONS = 126
+DOWNLOAD_CHUNK = 100
+
+# Snapshot konstituen LQ45; perbarui saat rebalancing indeks
+LQ45 = [
+    "ACES", "ADRO", "AKRA", "AMMN", "AMRT", "ANTM", "ARTO", "ASII", "BBCA", "BBNI",
+    "BBRI", "BBTN", "BMRI", "BRIS", "BRPT", "BUKA", "CPIN", "CTRA", "ESSA", "EXCL",
+    "GOTO", "ICBP", "INCO", "INDF", "INKP", "INTP", "ISAT", "ITMG", "JPFA", "JSMR",
+    "KLBF", "MAPA", "MAPI", "MBMA", "MDKA", "MEDC", "PGAS", "PGEO", "PTBA", "SIDO",
+    "SMGR", "SMRA", "TLKM", "UNTR", "UNVR",
+]
+US_WATCHLIST = [
+    "AAPL", "AMZN", "TSLA", "MSFT", "GOOGL", "META", "NFLX", "NVDA", "BABA", "BAC",
+    "JPM", "WMT", "DIS", "V", "MA", "AVGO", "ORCL", "CRM", "ADBE", "AMD",
+    "INTC", "QCOM", "CSCO", "IBM", "PEP", "KO", "PG", "JNJ", "PFE", "MRK",
+    "UNH", "LLY", "ABBV", "XOM", "CVX", "HD", "MCD", "NKE", "COST", "GS",
+]
+UNIVERSES = {
+    "LQ45": [f"{symbol}.JK" for symbol in LQ45],
+    "US Watchlist": US_WATCHLIST,
+}
+
+# Bobot skor gabungan; volatilitas bernilai negatif (lebih rendah lebih baik)
+FACTOR_WEIGHTS = {
+    "Momentum 12-1 (%)": 0.35,
+    "Momentum 3B (%)": 0.25,
+    "Volatilitas (%)": -0.2,
+    "Max Drawdown (%)": 0.2,
+}
+
+
+def download_closes(symbols: List[str], start: Optional[str] = None) -> pd.DataFrame:
+    """Bulk-download adjusted daily closes (dates x symbols) from Yahoo Finance in chunks, from `start` or one year."""
+    import yfinance as yf
+
+    frames = []
+    window = {"start": start} if start else {"period": "1y"}
+    for i in range(0, len(symbols), DOWNLOAD_CHUNK):
+        chunk = symbols[i:i + DOWNLOAD_CHUNK]
+        YAHOO_LIMITER.acquire()
+        data = yf.download(chunk, auto_adjust=True, threads=True, progress=False, group_by="column", **window)
+        closes = data["Close"]
+        if isinstance(closes, pd.Series):
+            closes = closes.to_frame(chunk[0])
+        frames.append(closes)
+    return pd.concat(frames, axis=1) if frames else pd.DataFrame()
+
+
+def last_year(prices: pd.DataFrame) -> pd.DataFrame:
+    """The rows within HISTORY_WINDOW of the last date, so every ticker is measured over the same year."""
+    if prices.empty:
+        return prices
+    return prices.loc[prices.index > prices.index[-1] - HISTORY_WINDOW]
+
+
+class ScreenStore:
+    """
+    Wide Parquet file of daily closes, one column per ticker. Reads only the requested
+    columns; missing tickers are downloaded and merged in. Once the file is older than
+    max_age, only the bars from the last stored date onwards are downloaded; tickers
+    whose overlapping close changed (dividend or split) are re-downloaded in full.
+    The file is trimmed to HISTORY_WINDOW on every write, so it never outgrows one year.
+    Writes go through a temp file and os.replace, and refreshes are serialised, so
+    concurrent sessions never read a half-written file or download the same tickers twice.
+    """
+
+    def __init__(self, path: str = SCREEN_STORE_PATH, max_age: float = 12 * 3600,
+                 downloader: Callable[..., pd.DataFrame] = download_closes):
+        self.path = path
+        self.max_age = max_age
+        self.downloader = downloader
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def _write(self, frame: pd.DataFrame) -> None:
+        tmp = f"{self.path}.{threading.get_ident()}.tmp"
+        frame.to_parquet(tmp)
+        os.replace(tmp, self.path)
+
+    def _columns(self) -> List[str]:
+        import pyarrow.parquet as pq
+
+        return [name for name in pq.read_schema(self.path).names if not name.startswith("__")]
+
+    def _refresh_tail(self) -> None:
+        frame = pd.read_parquet(self.path)
+        last = frame.index[-1]
+        tail = self.downloader(list(frame.columns), start=last.strftime("%Y-%m-%d"))
+        if tail.empty:
+            os.utime(self.path)
+            return
+        # Bar terakhir ikut diunduh ulang; jika nilainya berubah, harga historis ticker itu sudah disesuaikan ulang
+        changed = []
+        if last in tail.index:
+            before, after = frame.loc[last], tail.loc[last].reindex(frame.columns)
+            changed = list(frame.columns[~np.isclose(before, after, rtol=1e-4) & before.notna() & after.notna()])
+        frame = pd.concat([frame[~frame.index.isin(tail.index)], tail.reindex(columns=frame.columns)]).sort_index()
+        frame = last_year(frame)
+        if changed:
+            logger.info(f"Re-downloading {len(changed)} adjusted tickers")
+            frame[changed] = self.downloader(changed).reindex(frame.index)
+        self._write(frame)
+
+    def load(self, symbols: List[str]) -> pd.DataFrame:
+        symbols = list(dict.fromkeys(symbols))
+        with self._lock:
+            if os.path.exists(self.path) and time.time() - os.path.getmtime(self.path) >= self.max_age:
+                self._refresh_tail()
+            stored = self._columns() if os.path.exists(self.path) else []
+            missing = [symbol for symbol in symbols if symbol not in stored]
+
+            if missing:
+                logger.info(f"Downloading history for {len(missing)} tickers into {self.path}")
+                downloaded = self.downloader(missing)
+                frame = pd.read_parquet(self.path) if stored else pd.DataFrame()
+                frame = frame.join(downloaded, how="outer") if not frame.empty else downloaded
+                frame = last_year(frame.loc[:, ~frame.columns.duplicated(keep="last")].sort_index())
+                self._write(frame)
+                stored = list(frame.columns)
+
+        columns = [symbol for symbol in symbols if symbol in stored]
+        return pd.read_parquet(self.path, columns=columns)
+
+
+def factor_scores(prices: pd.DataFrame, weights: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+    """
+    Factor values and a composite z-score for every ticker in one vectorised pass,
+    over the last HISTORY_WINDOW of prices. Tickers with fewer than MIN_OBSERVATIONS
+    closes are dropped; a missing factor counts as neutral in the composite.
+    """
+    weights = weights or FACTOR_WEIGHTS
+    prices = last_year(prices)
+    prices = prices.loc[:, prices.notna().sum() >= MIN_OBSERVATIONS]
+    if prices.empty:
+        raise ValueError(f"No ticker has at least {MIN_OBSERVATIONS} daily closes")
+    # Kalender bursa berbeda: isi libur dengan harga terakhir
+    values = prices.ffill().to_numpy(dtype=float)
+    first = prices.bfill().to_numpy(dtype=float)[0]
+    returns = values[1:] / values[:-1] - 1.0
+
+    factors = pd.DataFrame({
+        "Harga Terakhir": values[-1],
+        "Momentum 12-1 (%)": (values[-22] / first - 1.0) * 100,
+        "Momentum 3B (%)": (values[-1] / values[-64] - 1.0) * 100,
+        "Volatilitas (%)": np.nanstd(returns, axis=0, ddof=1) * np.sqrt(TRADING_DAYS) * 100,
+        "Max Drawdown (%)": np.nanmin(values / np.fmax.accumulate(values, axis=0) - 1.0, axis=0) * 100,
+    }, index=prices.columns)
+
+    columns = list(weights)
+    raw = factors[columns].to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = (raw - np.nanmean(raw, axis=0)) / np.nanstd(raw, axis=0)
+    factors["Skor"] = np.nan_to_num(z, nan=0.0) @ np.array([weights[c] for c in columns])
+    return factors.sort_values("Skor", ascending=False).round(2)
+
+
+def screening_prompt(shortlist: pd.DataFrame, universe_size: int, context: str = "") -> str:
+    """Prompt for the LLM to discuss only the precomputed top-K shortlist."""
+    context = f"\n\nData pendukung per saham (harga, profil, rekomendasi analis, berita):\n{context}" if context else ""
+    return f"""Dari {universe_size} saham yang discreening secara kuantitatif, berikut {len(shortlist)} teratas \
+berdasarkan skor faktor (momentum, volatilitas rendah, drawdown kecil):
+
+{shortlist.to_string()}{context}
+
+Bahas setiap saham di shortlist ini: mengapa skornya tinggi, risiko yang perlu diperhatikan, dan
+konteks fundamental/berita yang relevan. Jangan menghitung ulang atau mengubah angka; kutip dari tabel."""
@@ -0,0 +1,75 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+
+from screener import HISTORY_WINDOW, ScreenStore, factor_scores
+
+SYMBOLS = ["AAA", "BBB", "CCC"]
+DATES = pd.bdate_range("2022-01-03", "2024-06-28", name="Date")
+RNG = np.random.default_rng(7)
+PRICES = pd.DataFrame(
+    100 * np.cumprod(1 + RNG.normal(0.0005, 0.02, (len(DATES), len(SYMBOLS))), axis=0),
+    index=DATES, columns=SYMBOLS
+)
+
+
+class FakeMarket:
+    """Serves PRICES up to `today`, like download_closes: from `start` or the last year."""
+
+    def __init__(self, today):
+        self.today = pd.Timestamp(today)
+
+    def __call__(self, symbols, start=None):
+        available = PRICES.loc[:self.today, symbols]
+        if start is not None:
+            return available.loc[start:]
+        return available.loc[available.index > self.today - HISTORY_WINDOW]
+
+
+def test_factor_window_stays_one_year_across_tail_refreshes(tmp_path):
+    market = FakeMarket("2023-06-30")
+    store = ScreenStore(path=str(tmp_path / "prices.parquet"), max_age=0, downloader=market)
+    store.load(SYMBOLS)
+
+    for today in pd.date_range("2023-07-31", periods=8, freq="BME"):
+        market.today = today
+        stored = store.load(SYMBOLS)
+        fresh = market(SYMBOLS)
+
+        assert stored.index[0] > today - HISTORY_WINDOW
+        pdt.assert_frame_equal(stored, fresh, check_freq=False, check_names=False)
+        pdt.assert_frame_equal(factor_scores(stored), factor_scores(fresh))
+
+
+def test_factor_scores_ignore_history_older_than_a_year():
+    recent = PRICES.loc["2023-06-29":]
+    pdt.assert_frame_equal(factor_scores(PRICES), factor_scores(recent))
+
+
+def test_concurrent_loads_download_missing_tickers_once(tmp_path):
+    market = FakeMarket("2023-06-30")
+    calls = []
+
+    def downloader(symbols, start=None):
+        calls.append((tuple(symbols), start))
+        return market(symbols, start)
+
+    store = ScreenStore(path=str(tmp_path / "prices.parquet"), downloader=downloader)
+    barrier = threading.Barrier(4)
+    results = []
+
+    def load():
+        barrier.wait()
+        results.append(store.load(SYMBOLS))
+
+    threads = [threading.Thread(target=load) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [(tuple(SYMBOLS), None)]
+    assert len(results) == 4 and all(result.equals(results[0]) for result in results)
+    assert not [name for name in tmp_path.iterdir() if name.suffix == ".tmp"]
@@ -2,6 +2,10 @@ import streamlit as st
 from phi.agent import Agent
 from phi.model.google import Gemini
 
+from plan_cache import PlanCache
+from plan_retrieval import AnswerCache, PlanIndex, build_grounded_prompt, gemini_embedder
+from plan_streaming import stream_concurrently
+
 st.set_page_config(
     page_title="AI Health & Fitness Planner",
     page_icon="../../favicon.ico",
@@ -72,12 +76,34 @@ def display_fitness_plan(plan_content):
                 if tip.strip():
                     st.info(tip)
 
+@st.cache_resource(show_spinner=False)
+def get_plan_cache() -> PlanCache:
+    return PlanCache()
+
+def stream_agent(agent: Agent, message: str):
+    """Yield the text chunks of a streamed agent run"""
+    for chunk in agent.run(message, stream=True):
+        yield chunk.content or ""
+
+def create_qa_agent(api_key: str) -> Agent:
+    """Per-session Q&A agent that keeps the last few exchanges for follow-up questions"""
+    return Agent(
+        model=Gemini(id="gemini-1.5-flash", api_key=api_key),
+        instructions=["Answer questions about the user's dietary and fitness plans concisely."],
+        add_history_to_messages=True,
+        num_history_responses=3,
+        markdown=True
+    )
+
 def main():
     if 'dietary_plan' not in st.session_state:
         st.session_state.dietary_plan = {}
         st.session_state.fitness_plan = {}
         st.session_state.qa_pairs = []
         st.session_state.plans_generated = False
+        st.session_state.plan_index = None
+        st.session_state.qa_agent = None
+        st.session_state.answer_cache = AnswerCache()
 
     st.title("🏋️‍♂️ AI Health & Fitness Planner")
     st.markdown("""
@@ -104,9 +130,18 @@ def main():
         
         st.success("API Key accepted!")
 
+        st.header("⚡ Plan Cache")
+        use_plan_cache = st.checkbox(
+            "Reuse plans for similar profiles", value=True,
+            help="Profiles in the same 5-year / 5-cm / 5-kg band with the same goals and preferences share a plan"
+        )
+        cache_stats = get_plan_cache().stats()
+        st.caption(f"{cache_stats['entries']} cached plans, {cache_stats['hits']} served from cache")
+
     if gemini_api_key:
         try:
-            gemini_model = Gemini(id="gemini-1.5-flash", api_key=gemini_api_key)
+            # Hanya untuk memvalidasi konfigurasi; setiap agent membuat instance model sendiri
+            Gemini(id="gemini-1.5-flash", api_key=gemini_api_key)
         except Exception as e:
             st.error(f"❌ Error initializing Gemini model: {e}")
             return
@@ -138,13 +173,15 @@ def main():
                 help="What do you want to achieve?"
             )
 
+        exact_regenerate = st.checkbox("Exact regenerate (ignore cached plans for this profile)", value=False)
         if st.button("🎯 Generate My Personalized Plan", use_container_width=True):
             with st.spinner("Creating your perfect health and fitness routine..."):
                 try:
+                    # Each agent gets its own model instance because both run concurrently
                     dietary_agent = Agent(
                         name="Dietary Expert",
                         role="Provides personalized dietary recommendations",
-                        model=gemini_model,
+                        model=Gemini(id="gemini-1.5-flash", api_key=gemini_api_key),
                         instructions=[
                             "Consider the user's input, including dietary restrictions and preferences.",
                             "Suggest a detailed meal plan for the day, including breakfast, lunch, dinner, and snacks.",
@@ -156,7 +193,7 @@ def main():
                     fitness_agent = Agent(
                         name="Fitness Expert",
                         role="Provides personalized fitness recommendations",
-                        model=gemini_model,
+                        model=Gemini(id="gemini-1.5-flash", api_key=gemini_api_key),
                         instructions=[
                             "Provide exercises tailored to the user's goals.",
                             "Include warm-up, main workout, and cool-down exercises.",
@@ -175,10 +212,39 @@ def main():
                     Fitness Goals: {fitness_goals}
                     """
 
-                    dietary_plan_response = dietary_agent.run(user_profile)
+                    profile_fields = {
+                        "age": age, "weight": weight, "height": height, "sex": sex,
+                        "activity_level": activity_level, "dietary_preferences": dietary_preferences,
+                        "fitness_goals": fitness_goals
+                    }
+                    plan_cache = get_plan_cache()
+                    cache_key = plan_cache.key("gemini:gemini-1.5-flash", profile_fields)
+                    responses = plan_cache.get(cache_key) if use_plan_cache and not exact_regenerate else None
+
+                    if responses:
+                        st.info("⚡ Served from the plan cache for your profile band. Tick 'Exact regenerate' for a fresh plan.")
+                    else:
+                        # Both plans stream in parallel; total time is the slower of the two
+                        live_plans = st.empty()
+                        with live_plans.container():
+                            with st.expander("📋 Your Personalized Dietary Plan", expanded=True):
+                                dietary_placeholder = st.empty()
+                            with st.expander("💪 Your Personalized Fitness Plan", expanded=True):
+                                fitness_placeholder = st.empty()
+                        responses = stream_concurrently(
+                            {
+                                "dietary": lambda: stream_agent(dietary_agent, user_profile),
+                                "fitness": lambda: stream_agent(fitness_agent, user_profile),
+                            },
+                            {"dietary": dietary_placeholder, "fitness": fitness_placeholder}
+                        )
+                        live_plans.empty()
+                        if not any("❌" in text for text in responses.values()):
+                            plan_cache.put(cache_key, profile_fields, responses)
+
                     dietary_plan = {
                         "why_this_plan_works": "High Protein, Healthy Fats, Moderate Carbohydrates, and Caloric Balance",
-                        "meal_plan": dietary_plan_response.content,
+                        "meal_plan": responses["dietary"],
                         "important_considerations": """
                         - Hydration: Drink plenty of water throughout the day
                         - Electrolytes: Monitor sodium, potassium, and magnesium levels
@@ -187,10 +253,9 @@ def main():
                         """
                     }
 
-                    fitness_plan_response = fitness_agent.run(user_profile)
                     fitness_plan = {
                         "goals": "Build strength, improve endurance, and maintain overall fitness",
-                        "routine": fitness_plan_response.content,
+                        "routine": responses["fitness"],
                         "tips": """
                         - Track your progress regularly
                         - Allow proper rest between workouts
@@ -204,6 +269,14 @@ def main():
                     st.session_state.plans_generated = True
                     st.session_state.qa_pairs = []
 
+                    # Plans are chunked and embedded once; each question only sends the relevant chunks
+                    st.session_state.plan_index = PlanIndex(
+                        {"Dietary": responses["dietary"], "Fitness": responses["fitness"]},
+                        gemini_embedder(gemini_api_key)
+                    )
+                    st.session_state.qa_agent = create_qa_agent(gemini_api_key)
+                    st.session_state.answer_cache = AnswerCache()
+
                     display_dietary_plan(dietary_plan)
                     display_fitness_plan(fitness_plan)
 
@@ -217,20 +290,17 @@ def main():
             if st.button("Get Answer"):
                 if question_input:
                     with st.spinner("Finding the best answer for you..."):
-                        dietary_plan = st.session_state.dietary_plan
-                        fitness_plan = st.session_state.fitness_plan
-
-                        context = f"Dietary Plan: {dietary_plan.get('meal_plan', '')}\n\nFitness Plan: {fitness_plan.get('routine', '')}"
-                        full_context = f"{context}\nUser Question: {question_input}"
-
                         try:
-                            agent = Agent(model=gemini_model, show_tool_calls=True, markdown=True)
-                            run_response = agent.run(full_context)
+                            answer = st.session_state.answer_cache.get(question_input)
+                            if answer is None:
+                                chunks = st.session_state.plan_index.search(question_input)
+                                run_response = st.session_state.qa_agent.run(build_grounded_prompt(question_input, chunks))
 
-                            if hasattr(run_response, 'content'):
-                                answer = run_response.content
-                            else:
-                                answer = "Sorry, I couldn't generate a response at this time."
+                                if hasattr(run_response, 'content') and run_response.content:
+                                    answer = run_response.content
+                                    st.session_state.answer_cache.put(question_input, answer)
+                                else:
+                                    answer = "Sorry, I couldn't generate a response at this time."
 
                             st.session_state.qa_pairs.append((question_input, answer))
                         except Exception as e:
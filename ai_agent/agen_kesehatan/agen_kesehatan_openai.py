@@ -1,10 +1,16 @@
 import openai
 import streamlit as st
 import json
-from datetime import datetime, timedelta
+import numpy as np
+from datetime import datetime
 import plotly.graph_objects as go
 import plotly.express as px
-from typing import Dict, Any
+from typing import Dict, Any, Iterator
+
+from health_metrics import compute_metrics
+from openai_client import stream_chat
+from plan_cache import PlanCache
+from plan_streaming import stream_concurrently
 
 st.set_page_config(
     page_title="AI Health & Fitness Planner",
@@ -132,70 +138,41 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-def calculate_bmi(weight: float, height: float) -> float:
-    """Calculate BMI"""
-    height_m = height / 100
-    return weight / (height_m ** 2)
-
-def get_bmi_category(bmi: float) -> str:
-    """Get BMI category"""
-    if bmi < 18.5:
-        return "Underweight"
-    elif bmi < 25:
-        return "Normal"
-    elif bmi < 30:
-        return "Overweight"
-    else:
-        return "Obese"
-
-def calculate_bmr(weight: float, height: float, age: int, sex: str) -> float:
-    """Calculate Basal Metabolic Rate using Harris-Benedict equation"""
-    if sex.lower() == "male":
-        return 88.362 + (13.397 * weight) + (4.799 * height) - (5.677 * age)
-    else:
-        return 447.593 + (9.247 * weight) + (3.098 * height) - (4.330 * age)
+def profile_metrics(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Metrics for a stored user profile (memoised in compute_metrics)"""
+    return compute_metrics(
+        profile['weight'], profile['height'], profile['age'], profile['sex'],
+        profile['activity_level'], profile['fitness_goals']
+    )
 
-def calculate_daily_calories(bmr: float, activity_level: str) -> float:
-    """Calculate daily calorie needs"""
-    multipliers = {
-        "Sedentary": 1.2,
-        "Lightly Active": 1.375,
-        "Moderately Active": 1.55,
-        "Very Active": 1.725,
-        "Extremely Active": 1.9
-    }
-    return bmr * multipliers.get(activity_level, 1.2)
+@st.cache_resource(show_spinner=False)
+def get_plan_cache() -> PlanCache:
+    return PlanCache()
 
-def generate_openai_response(prompt: str, api_key: str, model: str = "gpt-4") -> str:
-    """Generate response using OpenAI Chat API with better error handling"""
-    openai.api_key = api_key
+def stream_openai_response(prompt: str, api_key: str, model: str = "gpt-4") -> Iterator[str]:
+    """Stream a response from the OpenAI Chat API chunk by chunk, with better error handling"""
     try:
-        response = openai.ChatCompletion.create(
-            model=model,
-            messages=[
+        yield from stream_chat(
+            api_key,
+            [
                 {"role": "system", "content": "You are a professional health and fitness expert with extensive knowledge in nutrition and exercise science. Provide detailed, safe, and personalized advice."},
                 {"role": "user", "content": prompt}
             ],
+            model=model,
             max_tokens=1500,
             temperature=0.7
         )
-        return response["choices"][0]["message"]["content"]
-    except openai.error.RateLimitError:
-        return "❌ API rate limit reached. Please try again later."
-    except openai.error.InvalidRequestError:
-        return "❌ Invalid API request. Please check your API key."
-    except openai.error.AuthenticationError:
-        return "❌ Invalid API key. Please check your credentials."
+    except openai.RateLimitError:
+        yield "❌ API rate limit reached. Please try again later."
+    except openai.BadRequestError:
+        yield "❌ Invalid API request. Please check your API key."
+    except openai.AuthenticationError:
+        yield "❌ Invalid API key. Please check your credentials."
     except Exception as e:
-        return f"❌ Error: {str(e)}"
+        yield f"❌ Error: {str(e)}"
 
-def display_health_metrics(weight: float, height: float, age: int, sex: str, activity_level: str):
+def display_health_metrics(metrics: Dict[str, Any]):
     """Display health metrics in an attractive format"""
-    bmi = calculate_bmi(weight, height)
-    bmi_category = get_bmi_category(bmi)
-    bmr = calculate_bmr(weight, height, age, sex)
-    daily_calories = calculate_daily_calories(bmr, activity_level)
-    
     st.markdown("### 📊 Your Health Metrics")
     
     col1, col2, col3, col4 = st.columns(4)
@@ -203,15 +180,15 @@ def display_health_metrics(weight: float, height: float, age: int, sex: str, act
     with col1:
         st.markdown(f"""
         <div class="metric-card">
-            <div class="metric-value">{bmi:.1f}</div>
-            <div class="metric-label">BMI ({bmi_category})</div>
+            <div class="metric-value">{metrics['bmi']:.1f}</div>
+            <div class="metric-label">BMI ({metrics['bmi_category']})</div>
         </div>
         """, unsafe_allow_html=True)
     
     with col2:
         st.markdown(f"""
         <div class="metric-card">
-            <div class="metric-value">{bmr:.0f}</div>
+            <div class="metric-value">{metrics['bmr']:.0f}</div>
             <div class="metric-label">BMR (kcal/day)</div>
         </div>
         """, unsafe_allow_html=True)
@@ -219,14 +196,13 @@ def display_health_metrics(weight: float, height: float, age: int, sex: str, act
     with col3:
         st.markdown(f"""
         <div class="metric-card">
-            <div class="metric-value">{daily_calories:.0f}</div>
-            <div class="metric-label">Daily Calories</div>
+            <div class="metric-value">{metrics['target_calories']:.0f}</div>
+            <div class="metric-label">Daily Calories (TDEE {metrics['tdee']:.0f})</div>
         </div>
         """, unsafe_allow_html=True)
     
     with col4:
-        ideal_weight_min = 18.5 * (height/100)**2
-        ideal_weight_max = 24.9 * (height/100)**2
+        ideal_weight_min, ideal_weight_max = metrics['ideal_weight']
         st.markdown(f"""
         <div class="metric-card">
             <div class="metric-value">{ideal_weight_min:.0f}-{ideal_weight_max:.0f}</div>
@@ -234,16 +210,11 @@ def display_health_metrics(weight: float, height: float, age: int, sex: str, act
         </div>
         """, unsafe_allow_html=True)
 
-def create_nutrition_chart(calories: float):
+def create_nutrition_chart(metrics: Dict[str, Any]):
     """Create a nutrition breakdown chart"""
-    # Sample macro distribution (can be customized based on goals)
-    protein_cal = calories * 0.25
-    carb_cal = calories * 0.45
-    fat_cal = calories * 0.30
-    
     fig = go.Figure(data=[go.Pie(
-        labels=['Protein', 'Carbohydrates', 'Fats'],
-        values=[protein_cal, carb_cal, fat_cal],
+        labels=[f"{label} ({grams:.0f} g)" for label, grams in zip(metrics['macro_labels'], metrics['macro_grams'])],
+        values=metrics['macro_calories'],
         hole=.3,
         marker_colors=['#ff6b6b', '#4ecdc4', '#45b7d1']
     )])
@@ -257,7 +228,7 @@ def create_nutrition_chart(calories: float):
     
     return fig
 
-def display_dietary_plan(plan_content: Dict[str, Any], daily_calories: float):
+def display_dietary_plan(plan_content: Dict[str, Any], metrics: Dict[str, Any]):
     """Enhanced dietary plan display"""
     with st.expander("🍽️ Your Personalized Dietary Plan", expanded=True):
         
@@ -265,7 +236,7 @@ def display_dietary_plan(plan_content: Dict[str, Any], daily_calories: float):
         col1, col2 = st.columns([1, 1])
         
         with col1:
-            fig = create_nutrition_chart(daily_calories)
+            fig = create_nutrition_chart(metrics)
             st.plotly_chart(fig, use_container_width=True)
         
         with col2:
@@ -344,24 +315,30 @@ def display_fitness_plan(plan_content: Dict[str, Any]):
             </div>
             """, unsafe_allow_html=True)
 
-def display_progress_dashboard():
-    """Display a simple progress dashboard"""
+def display_progress_dashboard(metrics: Dict[str, Any]):
+    """Display the projected weight trend at the plan's daily calorie target"""
     st.markdown("### 📊 Progress Dashboard")
     
-    # Sample data - in real app, this would come from user tracking
-    dates = [datetime.now() - timedelta(days=x) for x in range(30, 0, -1)]
-    weights = [75 + (x/10) * (-0.5) for x in range(30)]  # Sample weight loss trend
+    days = metrics['projection_days']
+    dates = np.datetime64(datetime.now().date()) + days.astype('timedelta64[D]')
+    weeks = len(days) // 7
     
     fig = px.line(
         x=dates, 
-        y=weights,
-        title="Weight Progress (Last 30 Days)",
+        y=metrics['projected_weight'],
+        title=f"Projected Weight (Next {weeks} Weeks at {metrics['target_calories']:.0f} kcal/day)",
         labels={"x": "Date", "y": "Weight (kg)"}
     )
     fig.update_traces(line_color="#667eea", line_width=3)
+    ideal_weight_min, ideal_weight_max = metrics['ideal_weight']
+    fig.add_hrect(y0=ideal_weight_min, y1=ideal_weight_max, fillcolor="#4ecdc4", opacity=0.15, line_width=0)
     fig.update_layout(height=300)
     
     st.plotly_chart(fig, use_container_width=True)
+    
+    change = metrics['projected_weight'][-1] - metrics['projected_weight'][0]
+    st.caption(f"Estimated change after {weeks} weeks: {change:+.1f} kg (BMI {metrics['projected_bmi'][-1]:.1f}). "
+               "Shaded band: healthy weight range.")
 
 def main():
     # Initialize session state
@@ -414,14 +391,23 @@ def main():
         
         st.markdown('</div>', unsafe_allow_html=True)
         
+        st.markdown("## ⚡ Plan Cache")
+        use_plan_cache = st.checkbox(
+            "Reuse plans for similar profiles", value=True,
+            help="Profiles in the same 5-year / 5-cm / 5-kg band with the same goals and preferences share a plan"
+        )
+        cache_stats = get_plan_cache().stats()
+        st.caption(f"{cache_stats['entries']} cached plans, {cache_stats['hits']} served from cache")
+        
         # Quick stats if plans are generated
         if st.session_state.plans_generated:
             st.markdown("---")
             st.markdown("## 📈 Quick Stats")
             profile = st.session_state.user_profile
             if profile:
-                st.metric("Current BMI", f"{calculate_bmi(profile['weight'], profile['height']):.1f}")
-                st.metric("Daily Calories", f"{calculate_daily_calories(calculate_bmr(profile['weight'], profile['height'], profile['age'], profile['sex']), profile['activity_level']):.0f}")
+                metrics = profile_metrics(profile)
+                st.metric("Current BMI", f"{metrics['bmi']:.1f}")
+                st.metric("Daily Calories", f"{metrics['target_calories']:.0f}")
 
     if openai_api_key:
         # User Profile Section
@@ -465,11 +451,12 @@ def main():
                 )
 
         # Display health metrics
-        if age and height and weight:
-            display_health_metrics(weight, height, age, sex, activity_level)
+        metrics = compute_metrics(weight, height, age, sex, activity_level, fitness_goals)
+        display_health_metrics(metrics)
 
         # Generate plans button
         st.markdown("---")
+        exact_regenerate = st.checkbox("Exact regenerate (ignore cached plans for this profile)", value=False)
         if st.button("🚀 Generate My Personalized Health Plan", use_container_width=True):
             with st.spinner("🤖 AI is analyzing your profile and creating your personalized plans..."):
                 try:
@@ -481,22 +468,20 @@ def main():
                     }
                     st.session_state.user_profile = user_profile
                     
-                    # Calculate metrics
-                    bmi = calculate_bmi(weight, height)
-                    bmr = calculate_bmr(weight, height, age, sex)
-                    daily_calories = calculate_daily_calories(bmr, activity_level)
+                    daily_calories = metrics['target_calories']
                     
                     profile_text = f"""
                     User Profile:
                     - Age: {age} years
                     - Weight: {weight}kg, Height: {height}cm
                     - Sex: {sex}
-                    - BMI: {bmi:.1f} ({get_bmi_category(bmi)})
+                    - BMI: {metrics['bmi']:.1f} ({metrics['bmi_category']})
                     - Activity Level: {activity_level}
                     - Fitness Goals: {fitness_goals}
                     - Dietary Preferences: {', '.join(dietary_preferences) if dietary_preferences else 'None specified'}
                     - Experience Level: {experience_level}
-                    - Daily Calorie Needs: {daily_calories:.0f} kcal
+                    - Daily Calorie Needs: {metrics['tdee']:.0f} kcal (target for goal: {daily_calories:.0f} kcal)
+                    - Macro Targets: {', '.join(f"{label} {grams:.0f} g" for label, grams in zip(metrics['macro_labels'], metrics['macro_grams']))}
                     """
 
                     # Generate dietary plan
@@ -530,9 +515,33 @@ def main():
                     Make it practical and progressive for their fitness level and goals.
                     """
 
-                    # Get AI responses
-                    dietary_response = generate_openai_response(dietary_prompt, openai_api_key)
-                    fitness_response = generate_openai_response(fitness_prompt, openai_api_key)
+                    plan_cache = get_plan_cache()
+                    cache_key = plan_cache.key("openai:gpt-4", user_profile)
+                    responses = plan_cache.get(cache_key) if use_plan_cache and not exact_regenerate else None
+
+                    if responses:
+                        st.info("⚡ Served from the plan cache for your profile band. Tick 'Exact regenerate' for a fresh plan.")
+                    else:
+                        # Get AI responses: both plans stream in parallel into temporary expanders
+                        live_plans = st.empty()
+                        with live_plans.container():
+                            with st.expander("🍽️ Your Personalized Dietary Plan", expanded=True):
+                                dietary_placeholder = st.empty()
+                            with st.expander("💪 Your Personalized Fitness Plan", expanded=True):
+                                fitness_placeholder = st.empty()
+                        responses = stream_concurrently(
+                            {
+                                "dietary": lambda: stream_openai_response(dietary_prompt, openai_api_key),
+                                "fitness": lambda: stream_openai_response(fitness_prompt, openai_api_key),
+                            },
+                            {"dietary": dietary_placeholder, "fitness": fitness_placeholder}
+                        )
+                        live_plans.empty()
+                        if not any("❌" in text for text in responses.values()):
+                            plan_cache.put(cache_key, user_profile, responses)
+
+                    dietary_response = responses["dietary"]
+                    fitness_response = responses["fitness"]
 
                     # Prepare plan data
                     dietary_plan = {
@@ -575,18 +584,14 @@ def main():
         # Display generated plans
         if st.session_state.plans_generated:
             st.markdown("---")
-            profile = st.session_state.user_profile
-            daily_calories = calculate_daily_calories(
-                calculate_bmr(profile['weight'], profile['height'], profile['age'], profile['sex']),
-                profile['activity_level']
-            )
+            plan_metrics = profile_metrics(st.session_state.user_profile)
             
-            display_dietary_plan(st.session_state.dietary_plan, daily_calories)
+            display_dietary_plan(st.session_state.dietary_plan, plan_metrics)
             display_fitness_plan(st.session_state.fitness_plan)
             
             # Progress dashboard
             st.markdown("---")
-            display_progress_dashboard()
+            display_progress_dashboard(plan_metrics)
             
             # Action buttons
             col1, col2, col3 = st.columns(3)
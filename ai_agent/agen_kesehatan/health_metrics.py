@@ -0,0 +1,107 @@
+from functools import lru_cache
+from typing import Dict
+
+import numpy as np
+
+ACTIVITY_MULTIPLIERS = {
+    "Sedentary": 1.2,
+    "Lightly Active": 1.375,
+    "Moderately Active": 1.55,
+    "Very Active": 1.725,
+    "Extremely Active": 1.9
+}
+
+# Daily calorie adjustment relative to TDEE per goal
+GOAL_CALORIE_DELTA = {
+    "Lose Weight": -500.0,
+    "Gain Muscle": 300.0,
+}
+
+# Protein / carbohydrate / fat share of daily calories per goal
+MACRO_SPLITS = {
+    "Lose Weight": (0.30, 0.40, 0.30),
+    "Gain Muscle": (0.30, 0.45, 0.25),
+    "Strength Training": (0.30, 0.45, 0.25),
+    "Improve Endurance": (0.20, 0.55, 0.25),
+    "Endurance": (0.20, 0.55, 0.25),
+}
+DEFAULT_MACRO_SPLIT = (0.25, 0.45, 0.30)
+KCAL_PER_GRAM = np.array([4.0, 4.0, 9.0])
+
+# Energy content of one kg of body weight change
+KCAL_PER_KG = 7700.0
+
+# Harris-Benedict coefficients: constant, per kg, per cm, per year
+HARRIS_BENEDICT = {
+    "male": (88.362, 13.397, 4.799, -5.677),
+    "female": (447.593, 9.247, 3.098, -4.330),
+}
+
+
+def get_bmi_category(bmi: float) -> str:
+    """Get BMI category"""
+    if bmi < 18.5:
+        return "Underweight"
+    elif bmi < 25:
+        return "Normal"
+    elif bmi < 30:
+        return "Overweight"
+    else:
+        return "Obese"
+
+
+@lru_cache(maxsize=256)
+def compute_metrics(
+    weight: float,
+    height: float,
+    age: int,
+    sex: str,
+    activity_level: str,
+    fitness_goal: str = "General Health",
+    weeks: int = 12
+) -> Dict:
+    """
+    Compute every health metric for a profile in one pass, memoised per profile tuple.
+
+    The weight projection keeps calorie intake at the goal target while BMR (and so
+    TDEE) follows the changing body weight. Because BMR is linear in weight, the daily
+    balance w[t+1] = w[t] + (target - m * (c + k * w[t])) / 7700 has the closed form
+    w[t] = w_eq + (w0 - w_eq) * r**t, evaluated for all days at once.
+    """
+    const, per_kg, per_cm, per_year = HARRIS_BENEDICT["male" if sex.lower() == "male" else "female"]
+    multiplier = ACTIVITY_MULTIPLIERS.get(activity_level, 1.2)
+    height_m = height / 100
+
+    bmi = weight / height_m ** 2
+    base = const + per_cm * height + per_year * age  # BMR without the weight term
+    bmr = base + per_kg * weight
+    tdee = bmr * multiplier
+    target_calories = tdee + GOAL_CALORIE_DELTA.get(fitness_goal, 0.0)
+
+    split = np.array(MACRO_SPLITS.get(fitness_goal, DEFAULT_MACRO_SPLIT))
+    macro_calories = target_calories * split
+    macro_grams = macro_calories / KCAL_PER_GRAM
+
+    days = np.arange(weeks * 7 + 1)
+    ratio = 1 - multiplier * per_kg / KCAL_PER_KG
+    equilibrium = (target_calories / multiplier - base) / per_kg
+    projection = equilibrium + (weight - equilibrium) * ratio ** days
+
+    # Results are shared between callers through the cache
+    for array in (macro_calories, macro_grams, days, projection):
+        array.setflags(write=False)
+
+    return {
+        "bmi": bmi,
+        "bmi_category": get_bmi_category(bmi),
+        "bmr": bmr,
+        "tdee": tdee,
+        "target_calories": target_calories,
+        "ideal_weight": (18.5 * height_m ** 2, 24.9 * height_m ** 2),
+        "macro_labels": ("Protein", "Carbohydrates", "Fats"),
+        "macro_calories": macro_calories,
+        "macro_grams": macro_grams,
+        "projection_days": days,
+        "projected_weight": projection,
+        "projected_bmi": projection / height_m ** 2,
+    }
@@ -0,0 +1,94 @@
+import time
+import random
+import logging
+import threading
+from typing import Dict, Iterator, List, Optional
+
+import httpx
+from openai import APIConnectionError, APIStatusError, InternalServerError, OpenAI, RateLimitError
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENT_REQUESTS = 4
+MAX_RETRIES = 4
+REQUEST_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 16.0
+
+# Errors worth retrying: rate limits, 5xx and network failures (timeouts included)
+RETRYABLE_ERRORS = (RateLimitError, InternalServerError, APIConnectionError)
+
+_clients: Dict[str, OpenAI] = {}
+_clients_lock = threading.Lock()
+_request_slots = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+
+
+def get_client(api_key: str) -> OpenAI:
+    """One OpenAI client per API key for the whole process, sharing a keep-alive connection pool."""
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            # Retry diatur sendiri di bawah agar backoff-nya ber-jitter dan bisa dibatasi semaphore
+            client = OpenAI(
+                api_key=api_key,
+                max_retries=0,
+                timeout=REQUEST_TIMEOUT,
+                http_client=httpx.Client(
+                    limits=httpx.Limits(max_connections=MAX_CONCURRENT_REQUESTS * 2, max_keepalive_connections=MAX_CONCURRENT_REQUESTS),
+                    timeout=REQUEST_TIMEOUT
+                )
+            )
+            _clients[api_key] = client
+        return client
+
+
+def backoff_delay(attempt: int, error: Exception) -> float:
+    """Retry-After from the server if given, otherwise full-jitter exponential backoff."""
+    if isinstance(error, APIStatusError):
+        retry_after = error.response.headers.get("retry-after")
+        try:
+            if retry_after is not None:
+                return min(float(retry_after), BACKOFF_CAP)
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def stream_chat(
+    api_key: str,
+    messages: List[Dict[str, str]],
+    model: str,
+    max_tokens: Optional[int] = None,
+    temperature: float = 0.7,
+    max_retries: int = MAX_RETRIES
+) -> Iterator[str]:
+    """
+    Stream a chat completion as text chunks.
+
+    At most MAX_CONCURRENT_REQUESTS requests run at once across the process. Rate
+    limits, 5xx and connection errors are retried with jittered backoff as long as
+    nothing has been streamed yet; other API errors are raised to the caller.
+    """
+    client = get_client(api_key)
+    for attempt in range(max_retries + 1):
+        streamed = False
+        try:
+            with _request_slots:
+                stream = client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    stream=True
+                )
+                for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        streamed = True
+                        yield chunk.choices[0].delta.content
+            return
+        except RETRYABLE_ERRORS as e:
+            if streamed or attempt == max_retries:
+                raise
+            delay = backoff_delay(attempt, e)
+            logger.warning(f"OpenAI request failed ({type(e).__name__}), retrying in {delay:.1f}s")
+            time.sleep(delay)
@@ -0,0 +1,99 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+PLAN_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "plans.sqlite3")
+
+# Bucket sizes for the numeric profile fields
+AGE_STEP = 5
+HEIGHT_STEP = 5.0
+WEIGHT_STEP = 5.0
+
+
+def quantise_profile(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a profile onto its bucket: age, height and weight rounded down to their step, lists sorted."""
+    bucket = {}
+    for field, value in profile.items():
+        if field == "age":
+            value = int(value) // AGE_STEP * AGE_STEP
+        elif field == "height":
+            value = int(float(value) // HEIGHT_STEP * HEIGHT_STEP)
+        elif field == "weight":
+            value = int(float(value) // WEIGHT_STEP * WEIGHT_STEP)
+        elif isinstance(value, (list, tuple, set)):
+            value = sorted(value)
+        bucket[field] = value
+    return bucket
+
+
+class PlanCache:
+    """
+    Generated plans stored in SQLite per (model, quantised profile), so near-identical
+    profiles are served without an LLM call. Entries expire after ttl_days and the
+    least recently used ones are evicted beyond max_entries.
+    """
+
+    def __init__(self, path: str = PLAN_CACHE_PATH, max_entries: int = 500, ttl_days: float = 30):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl_days * 86400
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._db() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS plans (
+                    key TEXT PRIMARY KEY,
+                    profile TEXT NOT NULL,
+                    plans TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+
+    @contextmanager
+    def _db(self) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            yield db
+            db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    def key(namespace: str, profile: Dict[str, Any]) -> str:
+        bucket = json.dumps(quantise_profile(profile), sort_keys=True)
+        return hashlib.sha256(f"{namespace}\n{bucket}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, str]]:
+        now = time.time()
+        with self._db() as db:
+            row = db.execute(
+                "SELECT plans FROM plans WHERE key = ? AND created_at > ?", (key, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE plans SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def put(self, key: str, profile: Dict[str, Any], plans: Dict[str, str]) -> None:
+        now = time.time()
+        with self._db() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO plans (key, profile, plans, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(quantise_profile(profile), sort_keys=True), json.dumps(plans), now, now)
+            )
+            db.execute("DELETE FROM plans WHERE created_at <= ?", (now - self.ttl,))
+            db.execute(
+                "DELETE FROM plans WHERE key NOT IN (SELECT key FROM plans ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+
+    def stats(self) -> Dict[str, int]:
+        with self._db() as db:
+            entries, hits = db.execute("SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM plans").fetchone()
+        return {"entries": entries, "hits": hits}
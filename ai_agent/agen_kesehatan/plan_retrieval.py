@@ -0,0 +1,118 @@
+import re
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+EMBEDDING_MODEL = "models/text-embedding-004"
+CHUNK_CHARS = 700
+TOP_K = 4
+
+# embed_fn(texts, task_type) -> one vector per text
+EmbedFn = Callable[[List[str], str], List[List[float]]]
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def chunk_plan(text: str, source: str, max_chars: int = CHUNK_CHARS) -> List[Dict[str, str]]:
+    """Split a plan on headings and blank lines, packing paragraphs into chunks of up to max_chars."""
+    blocks = [block.strip() for block in re.split(r"\n\s*\n|\n(?=#)", text) if block.strip()]
+    chunks, current = [], ""
+    for block in blocks:
+        if current and len(current) + len(block) + 2 > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{block}" if current else block
+    if current:
+        chunks.append(current)
+    return [{"source": source, "text": chunk} for chunk in chunks]
+
+
+def gemini_embedder(api_key: str) -> EmbedFn:
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+
+    def embed(texts: List[str], task_type: str) -> List[List[float]]:
+        return genai.embed_content(model=EMBEDDING_MODEL, content=texts, task_type=task_type)["embedding"]
+
+    return embed
+
+
+class PlanIndex:
+    """
+    Plan chunks embedded once when the plans are generated. Questions are answered
+    from the top-k chunks by cosine similarity; if the embedding call fails the index
+    falls back to keyword overlap so Q&A keeps working.
+    """
+
+    def __init__(self, plans: Dict[str, str], embed_fn: Optional[EmbedFn] = None):
+        self.chunks = [chunk for source, text in plans.items() for chunk in chunk_plan(text, source)]
+        self.embed_fn = embed_fn
+        self.vectors: Optional[np.ndarray] = None
+        if embed_fn is not None and self.chunks:
+            try:
+                self.vectors = self._normalise(embed_fn([c["text"] for c in self.chunks], "retrieval_document"))
+            except Exception:
+                self.vectors = None
+
+    @staticmethod
+    def _normalise(vectors) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+    def _keyword_scores(self, question: str) -> np.ndarray:
+        words = set(_WORD.findall(question.lower()))
+        return np.array([
+            len(words & set(_WORD.findall(chunk["text"].lower()))) for chunk in self.chunks
+        ], dtype=np.float32)
+
+    def search(self, question: str, k: int = TOP_K) -> List[Dict[str, str]]:
+        if not self.chunks:
+            return []
+        scores = None
+        if self.vectors is not None:
+            try:
+                query = self._normalise(self.embed_fn([question], "retrieval_query"))[0]
+                scores = self.vectors @ query
+            except Exception:
+                scores = None
+        if scores is None:
+            scores = self._keyword_scores(question)
+        top = np.argsort(-scores, kind="stable")[:k]
+        return [self.chunks[i] for i in sorted(top)]
+
+
+class AnswerCache:
+    """The last N answers keyed by normalised question, so repeated questions skip the model."""
+
+    def __init__(self, size: int = 20):
+        self.size = size
+        self._answers: "OrderedDict[str, str]" = OrderedDict()
+
+    @staticmethod
+    def _key(question: str) -> str:
+        return " ".join(_WORD.findall(question.lower()))
+
+    def get(self, question: str) -> Optional[str]:
+        key = self._key(question)
+        if key in self._answers:
+            self._answers.move_to_end(key)
+            return self._answers[key]
+        return None
+
+    def put(self, question: str, answer: str) -> None:
+        self._answers[self._key(question)] = answer
+        self._answers.move_to_end(self._key(question))
+        while len(self._answers) > self.size:
+            self._answers.popitem(last=False)
+
+
+def build_grounded_prompt(question: str, chunks: List[Dict[str, str]]) -> str:
+    context = "\n\n".join(f"[{chunk['source']} plan]\n{chunk['text']}" for chunk in chunks)
+    return f"""Relevant parts of the user's plans:
+{context}
+
+User Question: {question}
+
+Answer using the plan excerpts above and the earlier conversation. If they do not cover the question, say so briefly and give general guidance."""
@@ -0,0 +1,43 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator
+
+_DONE = object()
+
+
+def stream_concurrently(streams: Dict[str, Callable[[], Iterator[str]]], placeholders: Dict) -> Dict[str, str]:
+    """
+    Run independent text streams in parallel and render each into its own placeholder.
+
+    Worker threads only produce chunks; all Streamlit calls stay on the script
+    thread, which drains a shared queue. Total latency is that of the slowest
+    stream, and each placeholder shows text as soon as its first chunk arrives.
+    """
+    chunks: "queue.Queue" = queue.Queue()
+    texts = {name: "" for name in streams}
+
+    def pump(name: str, stream: Callable[[], Iterator[str]]) -> None:
+        try:
+            for chunk in stream():
+                if chunk:
+                    chunks.put((name, chunk))
+        except Exception as e:
+            chunks.put((name, f"\n\n❌ Error: {str(e)}"))
+        finally:
+            chunks.put((name, _DONE))
+
+    with ThreadPoolExecutor(max_workers=len(streams)) as executor:
+        for name, stream in streams.items():
+            executor.submit(pump, name, stream)
+
+        pending = len(streams)
+        while pending:
+            name, chunk = chunks.get()
+            if chunk is _DONE:
+                pending -= 1
+                placeholders[name].markdown(texts[name])
+                continue
+            texts[name] += chunk
+            placeholders[name].markdown(texts[name] + "▌")
+
+    return texts
@@ -1,56 +1,20 @@
-from typing import Literal, Tuple, Dict, Optional
+from typing import Literal, Tuple, Dict
 import os
-import time
 import json
-import requests
 import PyPDF2
-from datetime import datetime, timedelta
+from datetime import datetime
 import pytz
 
 import streamlit as st
 from phi.agent import Agent
 from phi.model.openai import OpenAIChat
 from phi.tools.email import EmailTools
-from phi.tools.zoom import ZoomTool
 from phi.utils.log import logger
 from streamlit_pdf_viewer import pdf_viewer
 
-
-
-class CustomZoomTool(ZoomTool):
-    def __init__(self, *, account_id: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, name: str = "zoom_tool"):
-        super().__init__(account_id=account_id, client_id=client_id, client_secret=client_secret, name=name)
-        self.token_url = "https://zoom.us/oauth/token"
-        self.access_token = None
-        self.token_expires_at = 0
-
-    def get_access_token(self) -> str:
-        if self.access_token and time.time() < self.token_expires_at:
-            return str(self.access_token)
-            
-        headers = {"Content-Type": "application/x-www-form-urlencoded"}
-        data = {"grant_type": "account_credentials", "account_id": self.account_id}
-
-        try:
-            response = requests.post(self.token_url, headers=headers, data=data, auth=(self.client_id, self.client_secret))
-            response.raise_for_status()
-
-            token_info = response.json()
-            self.access_token = token_info["access_token"]
-            expires_in = token_info["expires_in"]
-            self.token_expires_at = time.time() + expires_in - 60
-
-            self._set_parent_token(str(self.access_token))
-            return str(self.access_token)
-
-        except requests.RequestException as e:
-            logger.error(f"Error fetching access token: {e}")
-            return ""
-
-    def _set_parent_token(self, token: str) -> None:
-        """Helper method to set the token in the parent ZoomTool class"""
-        if token:
-            self._ZoomTool__access_token = token
+from interview_calendar import InterviewCalendar
+from resume_schema import ResumeAnalysis, parse_analysis, repair_prompt
+from zoom_client import CustomZoomTool
 
 
 # Role requirements as a constant dictionary
@@ -117,7 +81,8 @@ def create_resume_analyzer() -> Agent:
             "Value hands-on experience with key technologies",
             "Return a JSON response with selection decision and feedback"
         ],
-        markdown=True
+        response_model=ResumeAnalysis,
+        structured_outputs=True
     )
 
 def create_email_agent() -> Agent:
@@ -193,40 +158,29 @@ def analyze_resume(
 ) -> Tuple[bool, str]:
     try:
         response = analyzer.run(
-            f"""Please analyze this resume against the following requirements and provide your response in valid JSON format:
+            f"""Please analyze this resume against the following requirements:
             Role Requirements:
             {ROLE_REQUIREMENTS[role]}
             Resume Text:
             {resume_text}
-            Your response must be a valid JSON object like this:
-            {{
-                "selected": true/false,
-                "feedback": "Detailed feedback explaining the decision",
-                "matching_skills": ["skill1", "skill2"],
-                "missing_skills": ["skill3", "skill4"],
-                "experience_level": "junior/mid/senior"
-            }}
             Evaluation criteria:
             1. Match at least 70% of required skills
             2. Consider both theoretical knowledge and practical experience
             3. Value project experience and real-world applications
             4. Consider transferable skills from similar technologies
             5. Look for evidence of continuous learning and adaptability
-            Important: Return ONLY the JSON object without any markdown formatting or backticks.
             """
         )
-
-        assistant_message = next((msg.content for msg in response.messages if msg.role == 'assistant'), None)
-        if not assistant_message:
-            raise ValueError("No assistant message found in response.")
-
-        result = json.loads(assistant_message.strip())
-        if not isinstance(result, dict) or not all(k in result for k in ["selected", "feedback"]):
-            raise ValueError("Invalid response format")
+        try:
+            result = parse_analysis(response.content)
+        except ValueError as e:
+            # Satu kali repair sebelum kandidat dianggap gagal dianalisis
+            logger.warning(f"Unparseable analysis, requesting repair: {e}")
+            result = parse_analysis(analyzer.run(repair_prompt(response.content, str(e))).content)
 
         return result["selected"], result["feedback"]
 
-    except (json.JSONDecodeError, ValueError) as e:
+    except ValueError as e:
         st.error(f"Error processing response: {str(e)}")
         return False, f"Error analyzing resume: {str(e)}"
 
@@ -266,19 +220,21 @@ def send_rejection_email(email_agent: Agent, to_email: str, role: str, feedback:
         """
     )
 
-def schedule_interview(scheduler: Agent, candidate_email: str, email_agent: Agent, role: str) -> None:
+def schedule_interview(scheduler: Agent, candidate_email: str, email_agent: Agent, role: str) -> bool:
     """
     Schedule interviews during business hours (9 AM - 5 PM Jakarta Time).
-    Send a clean, user-friendly confirmation email.
+    Send a clean, user-friendly confirmation email. Returns False when no meeting
+    could be booked; the slot is then released and no confirmation is sent.
     """
     try:
         # --- Waktu Interview ---
         jakarta_tz = pytz.timezone('Asia/Jakarta')
         current_time_jkt = datetime.now(jakarta_tz)
 
-        # Default besok jam 11.00
-        tomorrow_jkt = current_time_jkt + timedelta(days=1)
-        interview_time = tomorrow_jkt.replace(hour=11, minute=0, second=0, microsecond=0)
+        # Slot kosong berikutnya di kalender interview (tidak bentrok dengan booking lain)
+        calendar = InterviewCalendar()
+        booking = calendar.allocate([candidate_email], role, ["Interviewer 1"], 60, current_time_jkt)[0]
+        interview_time = booking['start']
         formatted_time_iso = interview_time.strftime('%Y-%m-%dT%H:%M:%S')
 
         # --- Request Zoom Meeting ---
@@ -308,6 +264,18 @@ def schedule_interview(scheduler: Agent, candidate_email: str, email_agent: Agen
         except Exception as e:
             logger.warning(f"Could not parse meeting response: {e}")
 
+        if meeting_link.startswith("https://"):
+            calendar.confirm(booking['id'], meeting_id, meeting_link)
+        elif booking['status'] == 'tentative':
+            # Slot dilepas dan bisa diberikan ke kandidat lain: jangan kirim konfirmasi untuk slot ini
+            calendar.cancel(booking['id'])
+            logger.error(f"No Zoom link for {candidate_email}, released slot {formatted_time_iso}")
+            st.error("❌ The Zoom meeting could not be created, so no confirmation email was sent. Please try again.")
+            return False
+        else:
+            # Booking terkonfirmasi dari percobaan sebelumnya: pakai meeting yang sudah ada
+            meeting_link, meeting_id = booking['join_url'], booking['meeting_id']
+
         logger.info(f"Meeting scheduled successfully. ID: {meeting_id}, Link: {meeting_link}")
 
         # --- Format Tanggal untuk Email ---
@@ -342,10 +310,12 @@ def schedule_interview(scheduler: Agent, candidate_email: str, email_agent: Agen
         )
 
         st.success("✅ Interview scheduled successfully! Confirmation email sent.")
+        return True
 
     except Exception as e:
         logger.error(f"Error scheduling interview: {str(e)}")
         st.error("❌ Unable to schedule interview. Please try again.")
+        return False
 
 
 def main() -> None:
@@ -518,28 +488,32 @@ def main() -> None:
                     # 4. Schedule interview
                     with st.status("📅 Scheduling interview...", expanded=True) as status:
                         print("DEBUG: Attempting to schedule interview")  # Debug
-                        schedule_interview(
+                        scheduled = schedule_interview(
                             scheduler_agent,
                             st.session_state.candidate_email,
                             email_agent,
                             role
                         )
-                        print("DEBUG: Interview scheduled successfully")  # Debug
-                        status.update(label="✅ Interview scheduled!")
-
-                    print("DEBUG: All processes completed successfully")  # Debug
-                    st.success("""
-                        🎉 Application Successfully Processed!
+                        if scheduled:
+                            print("DEBUG: Interview scheduled successfully")  # Debug
+                            status.update(label="✅ Interview scheduled!")
+                        else:
+                            status.update(label="❌ Interview could not be scheduled", state="error")
+
+                    if scheduled:
+                        print("DEBUG: All processes completed successfully")  # Debug
+                        st.success("""
+                            🎉 Application Successfully Processed!
                         
-                        Please check your email for:
-                        1. Selection confirmation ✅
-                        2. Interview details with Zoom link 🔗
+                            Please check your email for:
+                            1. Selection confirmation ✅
+                            2. Interview details with Zoom link 🔗
                         
-                        Next steps:
-                        1. Review the role requirements
-                        2. Prepare for your technical interview
-                        3. Join the interview 5 minutes early
-                    """)
+                            Next steps:
+                            1. Review the role requirements
+                            2. Prepare for your technical interview
+                            3. Join the interview 5 minutes early
+                        """)
 
                 except Exception as e:
                     print(f"DEBUG: Error occurred: {str(e)}")  # Debug
@@ -1,55 +1,32 @@
-from typing import Literal, Tuple, Dict, Optional, List
+from typing import Literal, Tuple, Dict, List
 import os
 import time
 import json
-import requests
-import PyPDF2
-from datetime import datetime, timedelta
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 import pytz
 import pandas as pd
 
 import streamlit as st
 from phi.agent import Agent
 from phi.model.openai import OpenAIChat
-from phi.tools.email import EmailTools
-from phi.tools.zoom import ZoomTool
 from phi.utils.log import logger
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from streamlit_pdf_viewer import pdf_viewer
 
+from mailer import Outbox, SMTPPool, render_email
+from pdf_cache import cached_extract_texts
+from pipeline import RateLimiter, Stage, run_pipeline
+from prescreen import MAX_LLM_RESUME_CHARS, prescreen_candidates, savings_report, templated_analysis
+from resume_schema import ResumeAnalysis, parse_analysis, repair_prompt
+from interview_calendar import InterviewCalendar
+from job_store import JobStore, candidate_key, reached
+from zoom_client import ZoomClient
 
-class CustomZoomTool(ZoomTool):
-    def __init__(self, *, account_id: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, name: str = "zoom_tool"):
-        super().__init__(account_id=account_id, client_id=client_id, client_secret=client_secret, name=name)
-        self.token_url = "https://zoom.us/oauth/token"
-        self.access_token = None
-        self.token_expires_at = 0
 
-    def get_access_token(self) -> str:
-        if self.access_token and time.time() < self.token_expires_at:
-            return str(self.access_token)
-            
-        headers = {"Content-Type": "application/x-www-form-urlencoded"}
-        data = {"grant_type": "account_credentials", "account_id": self.account_id}
-
-        try:
-            response = requests.post(self.token_url, headers=headers, data=data, auth=(self.client_id, self.client_secret))
-            response.raise_for_status()
-
-            token_info = response.json()
-            self.access_token = token_info["access_token"]
-            expires_in = token_info["expires_in"]
-            self.token_expires_at = time.time() + expires_in - 60
-
-            self._set_parent_token(str(self.access_token))
-            return str(self.access_token)
-
-        except requests.RequestException as e:
-            logger.error(f"Error fetching access token: {e}")
-            return ""
-
-    def _set_parent_token(self, token: str) -> None:
-        if token:
-            self._ZoomTool__access_token = token
+INTERVIEW_DURATION_MINUTES = 60
 
 
 def init_session_state() -> None:
@@ -58,7 +35,11 @@ def init_session_state() -> None:
         'openai_api_key': "", 'zoom_account_id': "", 'zoom_client_id': "", 
         'zoom_client_secret': "", 'email_sender': "", 'email_passkey': "", 
         'company_name': "", 'custom_role_name': "", 'custom_requirements': "",
-        'batch_results': [], 'processing_complete': False
+        'batch_results': [], 'processing_complete': False,
+        'openai_rpm': 60, 'smtp_per_minute': 30, 'zoom_per_minute': 30,
+        'stage_workers': {'analysis': 8, 'email': 4, 'schedule': 2},
+        'personalise_emails': False, 'interviewers': ['Interviewer 1'],
+        'prescreen_enabled': True, 'prescreen_thresholds': (0.3, 0.85), 'prescreen_report': {}
     }
     for key, value in defaults.items():
         if key not in st.session_state:
@@ -84,113 +65,45 @@ def create_resume_analyzer(requirements: str) -> Agent:
             "Value hands-on experience with key technologies",
             "Return a JSON response with selection decision and feedback"
         ],
-        markdown=True
-    )
-
-
-def create_email_agent(receiver_email: str) -> Agent:
-    """Create email agent for specific receiver."""
-    return Agent(
-        model=OpenAIChat(
-            id="gpt-4o",
-            api_key=st.session_state.openai_api_key
-        ),
-        tools=[EmailTools(
-            receiver_email=receiver_email,
-            sender_email=st.session_state.email_sender,
-            sender_name=st.session_state.company_name,
-            sender_passkey=st.session_state.email_passkey
-        )],
-        description="You are a professional recruitment coordinator.",
-        instructions=[
-            "Draft and send professional recruitment emails",
-            "Use all lowercase letters for casual, human tone",
-            "Maintain friendly yet professional tone",
-            "Always end emails with: 'best,\\nthe ai recruiting team'",
-            f"Company name: '{st.session_state.company_name}'"
-        ],
-        markdown=True,
-        show_tool_calls=True
-    )
-
-
-def create_scheduler_agent() -> Agent:
-    """Create Zoom scheduler agent."""
-    zoom_tools = CustomZoomTool(
-        account_id=st.session_state.zoom_account_id,
-        client_id=st.session_state.zoom_client_id,
-        client_secret=st.session_state.zoom_client_secret
+        response_model=ResumeAnalysis,
+        structured_outputs=True
     )
 
-    return Agent(
-        name="Interview Scheduler",
-        model=OpenAIChat(
-            id="gpt-4o",
-            api_key=st.session_state.openai_api_key
-        ),
-        tools=[zoom_tools],
-        description="You are an interview scheduling coordinator.",
-        instructions=[
-            "Schedule interviews during business hours (9 AM - 5 PM Jakarta Time)",
-            "Create meetings with proper titles and descriptions",
-            "Use ISO 8601 format for dates"
-        ],
-        markdown=True,
-        show_tool_calls=True
-    )
 
-
-def extract_text_from_pdf(pdf_file) -> str:
-    """Extract text from PDF file."""
-    try:
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-        return text
-    except Exception as e:
-        logger.error(f"Error extracting PDF text: {str(e)}")
-        return ""
+def extract_texts_from_pdfs(pdf_files) -> List[str]:
+    """Extract text from all uploaded PDFs in parallel, skipping ones already cached."""
+    return cached_extract_texts([pdf_file.getvalue() for pdf_file in pdf_files])
 
 
 def analyze_resume(resume_text: str, requirements: str, analyzer: Agent) -> Tuple[bool, str, dict]:
-    """Analyze single resume against requirements."""
+    """
+    Analyze single resume against requirements.
+
+    The analyzer returns schema-constrained output; anything that still fails to
+    parse gets one repair request instead of failing the candidate.
+    """
     try:
         response = analyzer.run(
-            f"""Analyze this resume against the requirements and respond in valid JSON:
+            f"""Analyze this resume against the requirements.
             
             Role Requirements:
             {requirements}
             
             Resume Text:
-            {resume_text}
-            
-            Return JSON:
-            {{
-                "selected": true/false,
-                "feedback": "Detailed feedback",
-                "matching_skills": ["skill1", "skill2"],
-                "missing_skills": ["skill3", "skill4"],
-                "experience_level": "junior/mid/senior"
-            }}
+            {resume_text[:MAX_LLM_RESUME_CHARS]}
             
             Criteria:
             1. Match at least 70% of required skills
             2. Consider practical experience and projects
             3. Value transferable skills
             4. Look for continuous learning
-            
-            Return ONLY the JSON object without markdown.
             """
         )
-
-        assistant_message = next((msg.content for msg in response.messages if msg.role == 'assistant'), None)
-        if not assistant_message:
-            raise ValueError("No assistant message found")
-
-        result = json.loads(assistant_message.strip())
-        if not isinstance(result, dict) or not all(k in result for k in ["selected", "feedback"]):
-            raise ValueError("Invalid response format")
+        try:
+            result = parse_analysis(response.content)
+        except ValueError as e:
+            logger.warning(f"Unparseable analysis, requesting repair: {e}")
+            result = parse_analysis(analyzer.run(repair_prompt(response.content, str(e))).content)
 
         return result["selected"], result["feedback"], result
 
@@ -199,158 +112,341 @@ def analyze_resume(resume_text: str, requirements: str, analyzer: Agent) -> Tupl
         return False, f"Error: {str(e)}", {}
 
 
-def send_selection_email(email_agent: Agent, role: str) -> None:
-    """Send selection email to candidate."""
-    email_agent.run(
-        f"""Send selection email for {role} position.
-        
-        Include:
-        1. Congratulate on selection
-        2. Explain next steps
-        3. Mention interview details coming soon
-        4. End with: best,\\nthe ai recruiting team
-        """
+@st.cache_resource(show_spinner=False)
+def get_smtp_pool(sender_email: str, sender_passkey: str, sender_name: str) -> SMTPPool:
+    """One authenticated SMTP connection pool per sender account, shared across reruns."""
+    return SMTPPool(sender_email, sender_passkey, sender_name, size=4)
+
+
+@st.cache_resource(show_spinner=False)
+def get_outbox() -> Outbox:
+    return Outbox()
+
+
+def personalise_email(body: str, analysis: dict) -> str:
+    """Optional LLM pass that lightly personalises a templated email."""
+    agent = Agent(
+        model=OpenAIChat(
+            id="gpt-4o",
+            api_key=st.session_state.openai_api_key
+        ),
+        description="You are a professional recruitment coordinator.",
+        instructions=[
+            "Lightly personalise the given email using the candidate analysis",
+            "Keep every fact, link and the signature exactly as they are",
+            "Use all lowercase letters for casual, human tone",
+            "Return only the email body"
+        ]
+    )
+    response = agent.run(f"Email:\n{body}\n\nCandidate analysis:\n{json.dumps(analysis)}")
+    return (response.content or "").strip() or body
+
+
+def send_templated_email(template_name: str, candidate_email: str, role: str, analysis: dict, job_id: str) -> bool:
+    """
+    Render, queue and deliver a recruitment email through the pooled SMTP transport.
+    The idempotency key includes the job, so resuming a job never sends twice while a
+    later job for the same candidate and role still gets its email.
+    """
+    subject, body = render_email(
+        template_name,
+        role=role,
+        company=st.session_state.company_name,
+        feedback=analysis.get('feedback', ''),
+        matching_skills=analysis.get('matching_skills', []),
+        missing_skills=analysis.get('missing_skills', [])
     )
+    if st.session_state.personalise_emails:
+        body = personalise_email(body, analysis)
+
+    return deliver_email(candidate_email, subject, body, idempotency_key=f"{template_name}:{job_id}:{role}:{candidate_email}")
+
 
+def deliver_email(candidate_email: str, subject: str, body: str, idempotency_key: str) -> bool:
+    """Queue an email in the durable outbox and deliver it through the pooled SMTP transport."""
+    outbox = get_outbox()
+    message_id = outbox.enqueue(candidate_email, subject, body, idempotency_key=idempotency_key)
+    pool = get_smtp_pool(st.session_state.email_sender, st.session_state.email_passkey, st.session_state.company_name)
+    return outbox.deliver_with_retry(message_id, pool)
 
-def send_rejection_email(email_agent: Agent, role: str, feedback: str) -> None:
+
+def send_selection_email(candidate_email: str, role: str, analysis: dict, job_id: str) -> bool:
+    """Send selection email to candidate."""
+    return send_templated_email('selection', candidate_email, role, analysis, job_id)
+
+
+def send_rejection_email(candidate_email: str, role: str, analysis: dict, job_id: str) -> bool:
     """Send rejection email with feedback."""
-    email_agent.run(
-        f"""Send rejection email for {role} position.
-        
-        Style:
-        1. All lowercase
-        2. Empathetic and human
-        3. Include feedback: {feedback}
-        4. Encourage upskilling
-        5. Suggest learning resources
-        6. End with: best,\\nthe ai recruiting team
-        """
+    return send_templated_email('rejection', candidate_email, role, analysis, job_id)
+
+
+def get_zoom_client() -> ZoomClient:
+    return ZoomClient(
+        st.session_state.zoom_account_id,
+        st.session_state.zoom_client_id,
+        st.session_state.zoom_client_secret
     )
 
 
-def schedule_interview(scheduler: Agent, candidate_email: str, email_agent: Agent, role: str) -> bool:
-    """Schedule interview and send confirmation."""
-    try:
-        jakarta_tz = pytz.timezone('Asia/Jakarta')
-        current_time_jkt = datetime.now(jakarta_tz)
-        tomorrow_jkt = current_time_jkt + timedelta(days=1)
-        interview_time = tomorrow_jkt.replace(hour=11, minute=0, second=0, microsecond=0)
-        formatted_time_iso = interview_time.strftime('%Y-%m-%dT%H:%M:%S')
-
-        meeting_response = scheduler.run(
-            f"""Schedule 60-minute technical interview:
-            - Title: '{role} Technical Interview'
-            - Date: {formatted_time_iso}
-            - Timezone: Asia/Jakarta
-            - Attendee: {candidate_email}
-            - Duration: 60 minutes
-            """
-        )
+def deliver_emails(messages: List[Tuple[str, str, str, str]]) -> List[bool]:
+    """Queue many emails at once and deliver them concurrently over the SMTP pool."""
+    outbox = get_outbox()
+    pool = get_smtp_pool(st.session_state.email_sender, st.session_state.email_passkey, st.session_state.company_name)
+    message_ids = [
+        outbox.enqueue(receiver_email, subject, body, idempotency_key=key)
+        for receiver_email, subject, body, key in messages
+    ]
+    with ThreadPoolExecutor(max_workers=st.session_state.stage_workers['email']) as executor:
+        return list(executor.map(lambda message_id: outbox.deliver_with_retry(message_id, pool), message_ids))
 
-        meeting_link, meeting_id = "Zoom link not available", "N/A"
-        try:
-            raw_response = meeting_response.messages[-1].content.strip()
-            if raw_response.startswith("{"):
-                meeting_info = json.loads(raw_response)
-                meeting_link = meeting_info.get("join_url", meeting_link)
-                meeting_id = meeting_info.get("id", meeting_id)
-            else:
-                if "https://" in raw_response:
-                    meeting_link = raw_response.split("https://")[1].split()[0]
-                    meeting_link = "https://" + meeting_link
-        except Exception as e:
-            logger.warning(f"Could not parse meeting response: {e}")
 
-        pretty_date = interview_time.strftime("%A, %d %B %Y")
-        pretty_time = interview_time.strftime("%I:%M %p")
+@st.cache_resource(show_spinner=False)
+def get_interview_calendar() -> InterviewCalendar:
+    return InterviewCalendar()
 
-        email_agent.run(
-            f"""Send interview confirmation to {candidate_email}:
-            
-            Subject: Interview Confirmation – {role} Position
-            
-            Dear Candidate,
-            
-            Technical interview details for {role}:
-            
-            📅 Date: {pretty_date}
-            🕒 Time: {pretty_time} (Jakarta Time, UTC+7)
-            ⏳ Duration: 60 minutes
-            🔗 Zoom Link: {meeting_link}
-            
-            Notes:
-            - Join 5 minutes early
-            - Timezone converter: https://www.timeanddate.com/worldclock/converter.html
-            - Be confident and prepare well!
-            
-            best,
-            the ai recruiting team
-            """
-        )
-        return True
 
-    except Exception as e:
-        logger.error(f"Error scheduling interview: {str(e)}")
-        return False
+@st.cache_resource(show_spinner=False)
+def get_job_store() -> JobStore:
+    return JobStore()
+
+
+def render_interview_confirmation(booking: Dict, role: str) -> Tuple[str, str]:
+    return render_email(
+        'interview',
+        role=role,
+        company=st.session_state.company_name,
+        date=booking['start'].strftime("%A, %d %B %Y"),
+        time=booking['start'].strftime("%I:%M %p"),
+        duration=INTERVIEW_DURATION_MINUTES,
+        interviewer=booking['interviewer'],
+        join_url=booking['join_url']
+    )
+
+
+def schedule_interviews(candidates: List[Dict], role: str) -> List[Dict]:
+    """
+    Book a batch of interviews: non-overlapping slots across interviewers during
+    business hours (9-17 WIB), Zoom meetings created concurrently, confirmations sent in bulk.
+    """
+    calendar = get_interview_calendar()
+    emails = [candidate['email'] for candidate in candidates]
+    now = datetime.now(pytz.timezone('Asia/Jakarta'))
+    try:
+        bookings = calendar.allocate(emails, role, st.session_state.interviewers, INTERVIEW_DURATION_MINUTES, now)
+    except sqlite3.Error as e:
+        # Satu baris yang bermasalah tidak boleh menggagalkan seluruh batch: ulangi per kandidat
+        logger.warning(f"Batch slot allocation failed, retrying per candidate: {e}")
+        bookings = []
+        for email in emails:
+            try:
+                bookings.extend(calendar.allocate([email], role, st.session_state.interviewers,
+                                                  INTERVIEW_DURATION_MINUTES, now))
+            except sqlite3.Error as candidate_error:
+                bookings.append({
+                    'candidate_email': email, 'interviewer': None, 'start': None,
+                    'join_url': None, 'meeting_id': None,
+                    'error': f"Slot allocation failed: {candidate_error}"
+                })
+
+    # Booking yang sudah punya meeting (run sebelumnya) tidak dibuatkan meeting baru
+    to_create = [booking for booking in bookings if not booking['join_url'] and not booking.get('error')]
+    meetings = get_zoom_client().create_meetings(
+        [
+            {
+                'topic': f"{role} Technical Interview ({booking['interviewer']})",
+                'start_time': booking['start'].strftime('%Y-%m-%dT%H:%M:%S'),
+                'duration': INTERVIEW_DURATION_MINUTES,
+                'timezone': 'Asia/Jakarta'
+            }
+            for booking in to_create
+        ],
+        max_workers=st.session_state.stage_workers['schedule'],
+        limiter=RateLimiter(st.session_state.zoom_per_minute)
+    )
+    for booking, meeting in zip(to_create, meetings):
+        if meeting.get('error'):
+            calendar.cancel(booking['id'])
+            booking['error'] = meeting['error']
+        else:
+            calendar.confirm(booking['id'], meeting['id'], meeting['join_url'])
+            booking.update(status='confirmed', meeting_id=meeting['id'], join_url=meeting['join_url'])
+
+    confirmed = [booking for booking in bookings if booking['join_url']]
+    sent = deliver_emails([
+        (booking['candidate_email'], *render_interview_confirmation(booking, role),
+         f"interview:{role}:{booking['candidate_email']}:{booking['start'].isoformat()}")
+        for booking in confirmed
+    ])
+    for booking, ok in zip(confirmed, sent):
+        booking['confirmation_sent'] = ok
+
+    return [
+        {
+            'start_time': booking['start'].isoformat() if booking['start'] else None,
+            'interviewer': booking['interviewer'],
+            'join_url': booking['join_url'],
+            'meeting_id': booking['meeting_id'],
+            'error': booking.get('error'),
+            'confirmation_sent': booking.get('confirmation_sent', False)
+        }
+        for booking in bookings
+    ]
 
 
 def process_batch_applications(candidates_data: List[Dict], role_name: str, requirements: str) -> List[Dict]:
-    """Process multiple applications at once."""
+    """
+    Process multiple applications concurrently: analysis and email run as separate bounded
+    stages, then interviews for all selected candidates are booked in one deterministic batch.
+
+    Progress is persisted per candidate in the job store, so re-running the same batch
+    (or resuming it after a reload) skips every step that already completed.
+    """
     results = []
-    analyzer = create_resume_analyzer(requirements)
-    
-    if not analyzer:
+    if not create_resume_analyzer(requirements):
         st.error("Failed to create analyzer")
         return results
 
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-    
-    for idx, candidate in enumerate(candidates_data):
-        status_text.text(f"Processing {candidate['email']}...")
-        
-        # Analyze resume
-        is_selected, feedback, analysis_details = analyze_resume(
-            candidate['resume_text'],
-            requirements,
-            analyzer
-        )
-        
-        result = {
+    store = get_job_store()
+    job_id = store.open_job(role_name, requirements, candidates_data)
+    st.query_params['job'] = job_id  # Reload tab tetap bisa menemukan job ini
+    saved = {c['key']: c for c in store.load_candidates(job_id)}
+    for candidate in candidates_data:
+        saved_candidate = saved[candidate_key(candidate['email'], candidate['resume_text'])]
+        candidate.update(key=saved_candidate['key'], state=saved_candidate['state'], saved_result=saved_candidate['result'])
+
+    # Worker thread butuh script context agar bisa membaca st.session_state
+    ctx = get_script_run_ctx()
+
+    def attach_script_ctx() -> None:
+        add_script_run_ctx(threading.current_thread(), ctx)
+
+    # Pre-screen seluruh batch sekaligus; hanya kandidat borderline yang dikirim ke LLM
+    resume_texts = [candidate['resume_text'] for candidate in candidates_data]
+    if st.session_state.prescreen_enabled:
+        reject_below, accept_above = st.session_state.prescreen_thresholds
+        prescreens = prescreen_candidates(resume_texts, requirements, reject_below, accept_above)
+    else:
+        prescreens = [{'decision': 'llm'} for _ in candidates_data]
+    for candidate, prescreen in zip(candidates_data, prescreens):
+        candidate['prescreen'] = prescreen
+    llm_latencies: List[float] = []
+
+    def analyze_stage(candidate: Dict, result: Dict) -> bool:
+        if reached(candidate['state'], 'analyzed'):
+            return True  # Hasil analisis dari run sebelumnya
+        prescreen = candidate['prescreen']
+        if prescreen['decision'] == 'llm':
+            openai_limiter.acquire()
+            started = time.perf_counter()
+            is_selected, feedback, analysis_details = analyze_resume(
+                candidate['resume_text'],
+                requirements,
+                create_resume_analyzer(requirements)
+            )
+            llm_latencies.append(time.perf_counter() - started)
+            if not analysis_details:
+                # Analisis gagal (error API/parsing): tidak disimpan dan tidak dikirimi email penolakan,
+                # sehingga run berikutnya / resume menganalisis ulang kandidat ini
+                raise RuntimeError(feedback)
+        else:
+            is_selected, feedback, analysis_details = templated_analysis(prescreen)
+        result.update(selected=is_selected, feedback=feedback, analysis=analysis_details, status='analyzed')
+        store.update(job_id, candidate['key'], 'analyzed', result)
+        return True
+
+    def email_stage(candidate: Dict, result: Dict) -> bool:
+        if reached(candidate['state'], 'emailed'):
+            return result['selected']
+        analysis = {**result['analysis'], 'feedback': result['feedback']}
+        if result['selected']:
+            sent = send_selection_email(candidate['email'], role_name, analysis, job_id)
+        else:
+            sent = send_rejection_email(candidate['email'], role_name, analysis, job_id)
+        if not sent:
+            result['error'] = "Email not delivered yet, kept in outbox for retry"
+            return False
+        result.update(email_sent=True, status='emailed')
+        store.update(job_id, candidate['key'], 'emailed', result)
+        return result['selected']
+
+    # Satu limiter OpenAI dipakai bersama semua stage yang memanggil LLM
+    workers = st.session_state.stage_workers
+    openai_limiter = RateLimiter(st.session_state.openai_rpm, burst=workers['analysis'])
+    stages = [
+        Stage('analysis', analyze_stage, workers['analysis'], initializer=attach_script_ctx),
+        Stage('email', email_stage, workers['email'],
+              [RateLimiter(st.session_state.smtp_per_minute)]
+              + ([openai_limiter] if st.session_state.personalise_emails else []),
+              attach_script_ctx),
+    ]
+
+    for candidate in candidates_data:
+        results.append(candidate['saved_result'] or {
             'email': candidate['email'],
             'filename': candidate['filename'],
-            'selected': is_selected,
-            'feedback': feedback,
-            'analysis': analysis_details,
+            'selected': False,
+            'feedback': '',
+            'analysis': {},
             'email_sent': False,
-            'interview_scheduled': False
+            'interview_scheduled': False,
+            'status': 'extracted'
+        })
+
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    progress_table = st.empty()
+    rows = [
+        {'CV File': r['filename'], 'Email': r['email'], 'Status': r['status'],
+         'Selected': '', 'Email Sent': '', 'Interview': ''}
+        for r in results
+    ]
+
+    resumed = sum(1 for candidate in candidates_data if reached(candidate['state'], 'analyzed'))
+    if resumed:
+        st.info(f"⏯️ Resuming job {job_id}: {resumed}/{len(candidates_data)} candidates already analyzed, completed steps are skipped")
+
+    done = 0
+    start = time.perf_counter()
+    for idx, snapshot, final in run_pipeline(candidates_data, results, stages):
+        rows[idx] = {
+            'CV File': snapshot['filename'],
+            'Email': snapshot['email'],
+            'Status': 'error' if snapshot.get('error') else snapshot['status'],
+            'Selected': '✅' if snapshot['selected'] else '❌',
+            'Email Sent': '✅' if snapshot['email_sent'] else '',
+            'Interview': '✅' if snapshot['interview_scheduled'] else ''
         }
-        
-        # Send appropriate email
-        try:
-            email_agent = create_email_agent(candidate['email'])
-            
-            if is_selected:
-                send_selection_email(email_agent, role_name)
-                result['email_sent'] = True
-                
-                # Schedule interview
-                scheduler = create_scheduler_agent()
-                success = schedule_interview(scheduler, candidate['email'], email_agent, role_name)
-                result['interview_scheduled'] = success
+        if final:
+            done += 1
+            progress_bar.progress(done / len(candidates_data))
+        status_text.text(f"Processed {done}/{len(candidates_data)} candidates ({time.perf_counter() - start:.0f}s)")
+        progress_table.dataframe(pd.DataFrame(rows), use_container_width=True)
+
+    # Jadwal interview dialokasikan sekaligus (urutan input) agar slot tidak bentrok
+    selected = [i for i, r in enumerate(results) if r['selected'] and r['email_sent'] and r['status'] != 'scheduled']
+    if selected:
+        status_text.text(f"📅 Scheduling {len(selected)} interviews...")
+        bookings = schedule_interviews([candidates_data[i] for i in selected], role_name)
+        for i, booking in zip(selected, bookings):
+            scheduled = not booking['error']
+            results[i].update(interview_scheduled=scheduled, interview=booking)
+            if scheduled:
+                results[i]['status'] = 'scheduled'
+                results[i].pop('error', None)
             else:
-                send_rejection_email(email_agent, role_name, feedback)
-                result['email_sent'] = True
-                
-        except Exception as e:
-            logger.error(f"Error processing {candidate['email']}: {str(e)}")
-            result['error'] = str(e)
-        
-        results.append(result)
-        progress_bar.progress((idx + 1) / len(candidates_data))
-    
-    status_text.text("✅ Processing complete!")
+                results[i]['error'] = booking['error']
+            store.update(job_id, candidates_data[i]['key'], results[i]['status'], results[i])
+            rows[i].update(
+                Status=results[i]['status'] if scheduled else 'error',
+                Interview=f"✅ {booking['start_time'][:16].replace('T', ' ')}" if scheduled else '❌'
+            )
+        progress_table.dataframe(pd.DataFrame(rows), use_container_width=True)
+
+    finished = all(r['status'] == 'scheduled' or (r['status'] == 'emailed' and not r['selected']) for r in results)
+    store.set_status(job_id, 'complete' if finished else 'incomplete')
+    status_text.text(f"✅ Processing complete! {len(candidates_data)} candidates in {time.perf_counter() - start:.0f}s")
+    if st.session_state.prescreen_enabled:
+        st.session_state.prescreen_report = savings_report(prescreens, resume_texts, requirements, llm_latencies)
     return results
 
 
@@ -396,6 +492,45 @@ def main() -> None:
         if email_sender: st.session_state.email_sender = email_sender
         if email_passkey: st.session_state.email_passkey = email_passkey
         if company_name: st.session_state.company_name = company_name
+        st.session_state.personalise_emails = st.checkbox(
+            "Personalise emails with GPT-4o", value=st.session_state.personalise_emails,
+            help="Selection/rejection emails are rendered from templates; this adds an LLM pass per email"
+        )
+
+        st.subheader("Interview Settings")
+        interviewers_input = st.text_area(
+            "Interviewers (one per line)", value="\n".join(st.session_state.interviewers),
+            help="Interviews are spread across these interviewers without overlapping, 9 AM - 5 PM Jakarta Time"
+        )
+        st.session_state.interviewers = [i.strip() for i in interviewers_input.splitlines() if i.strip()] or ['Interviewer 1']
+
+        st.subheader("Throughput Settings")
+        st.session_state.openai_rpm = st.number_input(
+            "OpenAI Requests / Minute", min_value=1, max_value=10000,
+            value=st.session_state.openai_rpm,
+            help="Match your OpenAI tier rate limit; batch throughput scales with this"
+        )
+        st.session_state.smtp_per_minute = st.number_input(
+            "Emails / Minute", min_value=1, max_value=1000, value=st.session_state.smtp_per_minute
+        )
+        st.session_state.zoom_per_minute = st.number_input(
+            "Zoom Meetings / Minute", min_value=1, max_value=1000, value=st.session_state.zoom_per_minute
+        )
+        workers = st.session_state.stage_workers
+        workers['analysis'] = st.slider("Parallel Resume Analyses", 1, 32, workers['analysis'])
+        workers['email'] = st.slider("Parallel Email Sends", 1, 16, workers['email'])
+        workers['schedule'] = st.slider("Parallel Interview Bookings", 1, 8, workers['schedule'])
+
+        st.subheader("Pre-screening")
+        st.session_state.prescreen_enabled = st.checkbox(
+            "Skip LLM for clear matches/rejects", value=st.session_state.prescreen_enabled,
+            help="Resumes are scored locally against the listed skills; only borderline ones go to GPT-4o"
+        )
+        st.session_state.prescreen_thresholds = st.slider(
+            "Reject below / accept above (skill match)", 0.0, 1.0,
+            value=st.session_state.prescreen_thresholds, step=0.05,
+            disabled=not st.session_state.prescreen_enabled
+        )
 
     # Check required configs
     required_configs = {
@@ -413,6 +548,30 @@ def main() -> None:
         st.warning(f"⚠️ Please configure: {', '.join(missing_configs)}")
         return
 
+    # Job dari run sebelumnya (mis. tab di-reload di tengah batch): tampilkan hasil atau lanjutkan
+    job = get_job_store().get_job(st.query_params['job']) if 'job' in st.query_params else None
+    if job and not st.session_state.processing_complete:
+        st.session_state.custom_role_name = st.session_state.custom_role_name or job['role']
+        st.session_state.custom_requirements = st.session_state.custom_requirements or job['requirements']
+        if job['status'] == 'complete':
+            st.session_state.batch_results = get_job_store().results(job['id'])
+            st.session_state.processing_complete = True
+        else:
+            states = job['states']
+            st.warning(
+                f"⏸️ Unfinished batch for **{job['role']}**: "
+                f"{job['total'] - states['extracted']}/{job['total']} analyzed, "
+                f"{states['emailed'] + states['scheduled']} emailed, {states['scheduled']} interviews scheduled"
+            )
+            if st.button("⏯️ Resume Batch", type="primary"):
+                with st.spinner("🔄 Resuming applications..."):
+                    results = process_batch_applications(
+                        get_job_store().load_candidates(job['id']), job['role'], job['requirements']
+                    )
+                    st.session_state.batch_results = results
+                    st.session_state.processing_complete = True
+                    st.rerun()
+
     # Main Interface
     st.markdown("---")
     
@@ -505,8 +664,8 @@ Nice to have:
                     with st.spinner("🔄 Processing applications..."):
                         # Prepare candidates data
                         candidates_data = []
-                        for file, email in zip(uploaded_files, emails):
-                            resume_text = extract_text_from_pdf(file)
+                        resume_texts = extract_texts_from_pdfs(uploaded_files)
+                        for file, email, resume_text in zip(uploaded_files, emails, resume_texts):
                             if resume_text:
                                 candidates_data.append({
                                     'email': email,
@@ -539,6 +698,16 @@ Nice to have:
         col1.metric("Total Processed", len(results))
         col2.metric("✅ Selected", selected_count)
         col3.metric("❌ Rejected", rejected_count)
+
+        report = st.session_state.prescreen_report
+        if report:
+            st.subheader("⚡ Pre-screening Savings")
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("LLM Analyses", f"{report['llm_calls']}/{report['total']}")
+            col2.metric("Auto Accepted / Rejected", f"{report['auto_accepted']} / {report['auto_rejected']}")
+            col3.metric("Tokens Saved (est.)", f"{report['tokens_saved']:,}")
+            col4.metric("LLM Time Saved (est.)", f"{report['llm_seconds_saved']}s",
+                        help=f"Based on an average of {report['avg_llm_latency_s']}s per LLM analysis in this batch")
         
         # Detailed results
         st.subheader("📋 Detailed Results")
@@ -552,6 +721,10 @@ Nice to have:
                         st.write("**Feedback:**", result['feedback'])
                         st.write("**Email Sent:**", "✅ Yes" if result['email_sent'] else "❌ No")
                         st.write("**Interview Scheduled:**", "✅ Yes" if result['interview_scheduled'] else "❌ No")
+                        if result.get('interview') and result['interview_scheduled']:
+                            st.write("**Interview Time:**", result['interview']['start_time'])
+                            st.write("**Interviewer:**", result['interview']['interviewer'])
+                            st.write("**Zoom Link:**", result['interview']['join_url'])
                         if result.get('analysis'):
                             st.json(result['analysis'])
         
@@ -577,10 +750,23 @@ Nice to have:
                 mime="text/csv"
             )
 
+    # Outbox status and retry of undelivered emails
+    outbox_stats = get_outbox().stats()
+    st.sidebar.caption(
+        f"📤 Outbox: {outbox_stats['sent']} sent, {outbox_stats['pending']} pending, {outbox_stats['failed']} failed"
+    )
+    if (outbox_stats['pending'] or outbox_stats['failed']) and st.sidebar.button("📤 Retry Undelivered Emails"):
+        pool = get_smtp_pool(st.session_state.email_sender, st.session_state.email_passkey, st.session_state.company_name)
+        get_outbox().retry_failed()
+        get_outbox().drain(pool)
+        st.rerun()
+
     # Reset button
     if st.sidebar.button("🔄 Start New Batch"):
         st.session_state.batch_results = []
         st.session_state.processing_complete = False
+        st.session_state.prescreen_report = {}
+        st.query_params.clear()
         st.rerun()
 
 
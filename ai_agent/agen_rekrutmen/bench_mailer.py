@@ -0,0 +1,98 @@
+"""
+Offline throughput benchmark for the recruiting mail subsystem.
+
+Starts a local aiosmtpd server and compares one SMTP connection per email
+(what EmailTools does) with the pooled transport + SQLite outbox. The server
+delays EHLO by --handshake-ms to stand in for the TLS + AUTH round trips of
+a real provider like Gmail.
+
+    python bench_mailer.py --emails 200 --workers 4 --handshake-ms 300
+"""
+import os
+import time
+import asyncio
+import argparse
+import smtplib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+
+from aiosmtpd.controller import Controller
+
+from mailer import Outbox, SMTPPool, render_email
+
+HOST, PORT = "127.0.0.1", 8025
+
+
+class CountingHandler:
+    def __init__(self, handshake_delay: float):
+        self.received = 0
+        self.handshake_delay = handshake_delay
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        await asyncio.sleep(self.handshake_delay)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 Message accepted for delivery"
+
+
+def send_with_new_connection(receiver_email: str, subject: str, body: str) -> None:
+    msg = EmailMessage()
+    msg["Subject"] = subject
+    msg["From"] = "Bench <bench@example.com>"
+    msg["To"] = receiver_email
+    msg.set_content(body)
+    with smtplib.SMTP(HOST, PORT) as smtp:
+        smtp.send_message(msg)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--emails", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--handshake-ms", type=float, default=300)
+    args = parser.parse_args()
+
+    handler = CountingHandler(args.handshake_ms / 1000)
+    controller = Controller(handler, hostname=HOST, port=PORT)
+    controller.start()
+    try:
+        messages = []
+        for i in range(args.emails):
+            template = "selection" if i % 3 == 0 else "rejection"
+            subject, body = render_email(
+                template, role="Backend Engineer", company="Bench Corp",
+                feedback="solid python, limited cloud experience",
+                matching_skills=["Python", "Django"], missing_skills=["Kubernetes"]
+            )
+            messages.append((f"candidate{i}@example.com", subject, body))
+
+        start = time.perf_counter()
+        for message in messages:
+            send_with_new_connection(*message)
+        serial = time.perf_counter() - start
+
+        pool = SMTPPool("bench@example.com", "", "Bench", host=HOST, port=PORT, use_ssl=False, size=args.workers)
+        with tempfile.TemporaryDirectory() as tmp:
+            outbox = Outbox(os.path.join(tmp, "outbox.sqlite3"))
+            start = time.perf_counter()
+            ids = [outbox.enqueue(*message, idempotency_key=message[0]) for message in messages]
+            with ThreadPoolExecutor(max_workers=args.workers) as executor:
+                list(executor.map(lambda message_id: outbox.deliver(message_id, pool), ids))
+            pooled = time.perf_counter() - start
+            stats = outbox.stats()
+        pool.close()
+
+        print(f"emails: {args.emails}, workers: {args.workers}, handshake: {args.handshake_ms:.0f}ms, "
+              f"received by server: {handler.received}")
+        print(f"new connection per email : {serial:6.2f}s  ({args.emails / serial:7.1f} emails/s)")
+        print(f"pooled + sqlite outbox   : {pooled:6.2f}s  ({args.emails / pooled:7.1f} emails/s)  {stats}")
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Offline benchmark for interview scheduling against a mock Zoom server.
+
+Compares the old behaviour (new tool per candidate -> OAuth round trip plus a
+fresh connection per meeting, one at a time) with the shared token cache,
+pooled session and concurrent create_meetings.
+
+    python bench_zoom.py --meetings 50 --workers 4 --latency-ms 150
+"""
+import os
+import json
+import time
+import argparse
+import tempfile
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytz
+import requests
+
+from interview_calendar import InterviewCalendar
+from zoom_client import ZoomClient
+
+HOST, PORT = "127.0.0.1", 8026
+
+
+class MockZoomHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, seperti API Zoom
+    latency = 0.15
+    stats = {"token": 0, "meeting": 0}
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        time.sleep(self.latency)
+
+        if self.path == "/oauth/token":
+            with self.lock:
+                self.stats["token"] += 1
+            self._reply(200, {"access_token": "mock-token", "expires_in": 3600})
+        elif self.path == "/v2/users/me/meetings":
+            if self.headers.get("Authorization") != "Bearer mock-token":
+                self._reply(401, {"message": "Invalid access token"})
+                return
+            with self.lock:
+                self.stats["meeting"] += 1
+                meeting_id = self.stats["meeting"]
+            meeting = json.loads(body)
+            self._reply(201, {
+                "id": meeting_id,
+                "topic": meeting["topic"],
+                "start_time": meeting["start_time"],
+                "duration": meeting["duration"],
+                "join_url": f"https://zoom.example/j/{meeting_id}"
+            })
+        else:
+            self._reply(404, {"message": "Not found"})
+
+
+def old_style_create(meeting: dict) -> dict:
+    """What a fresh CustomZoomTool per candidate does: new token, new connection."""
+    token = requests.post(
+        f"http://{HOST}:{PORT}/oauth/token",
+        data={"grant_type": "account_credentials", "account_id": "acc"},
+        auth=("id", "secret")
+    ).json()["access_token"]
+    response = requests.post(
+        f"http://{HOST}:{PORT}/v2/users/me/meetings",
+        headers={"Authorization": f"Bearer {token}"},
+        json=meeting
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--meetings", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--interviewers", type=int, default=3)
+    args = parser.parse_args()
+
+    MockZoomHandler.latency = args.latency_ms / 1000
+    server = ThreadingHTTPServer((HOST, PORT), MockZoomHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            calendar = InterviewCalendar(os.path.join(tmp, "interviews.sqlite3"))
+            start = time.perf_counter()
+            bookings = calendar.allocate(
+                [f"candidate{i}@example.com" for i in range(args.meetings)],
+                "Backend Engineer",
+                [f"Interviewer {i + 1}" for i in range(args.interviewers)],
+                60,
+                datetime.now(pytz.timezone("Asia/Jakarta"))
+            )
+            allocation = time.perf_counter() - start
+        meetings = [
+            {"topic": "Backend Engineer Technical Interview", "start_time": booking["start"].strftime("%Y-%m-%dT%H:%M:%S"),
+             "duration": 60, "timezone": "Asia/Jakarta"}
+            for booking in bookings
+        ]
+
+        start = time.perf_counter()
+        for meeting in meetings:
+            old_style_create(meeting)
+        old = time.perf_counter() - start
+        old_tokens = MockZoomHandler.stats["token"]
+
+        client = ZoomClient("acc", "id", "secret", api_base=f"http://{HOST}:{PORT}/v2", token_url=f"http://{HOST}:{PORT}/oauth/token")
+        start = time.perf_counter()
+        results = client.create_meetings(meetings, max_workers=args.workers)
+        new = time.perf_counter() - start
+        new_tokens = MockZoomHandler.stats["token"] - old_tokens
+        errors = sum(1 for r in results if "error" in r)
+
+        print(f"meetings: {args.meetings}, workers: {args.workers}, server latency: {args.latency_ms:.0f}ms")
+        print(f"slot allocation          : {allocation * 1000:7.2f}ms")
+        print(f"token per meeting, serial: {old:7.2f}s  token requests: {old_tokens}")
+        print(f"shared token + pool      : {new:7.2f}s  token requests: {new_tokens}  errors: {errors}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
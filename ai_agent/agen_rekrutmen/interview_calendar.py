@@ -0,0 +1,264 @@
+import os
+import time
+import heapq
+import random
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pytz
+
+CALENDAR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "interviews.sqlite3")
+
+
+class _Node:
+    __slots__ = ("start", "end", "priority", "max_end", "left", "right")
+
+    def __init__(self, start: float, end: float, priority: float):
+        self.start = start
+        self.end = end
+        self.priority = priority
+        self.max_end = end
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+
+
+class IntervalTree:
+    """Augmented treap of half-open [start, end) intervals with O(log n) insert and overlap search."""
+
+    def __init__(self, seed: int = 0):
+        self._root: Optional[_Node] = None
+        self._rng = random.Random(seed)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def _update(node: _Node) -> None:
+        node.max_end = max(
+            node.end,
+            node.left.max_end if node.left else node.end,
+            node.right.max_end if node.right else node.end
+        )
+
+    def _rotate_right(self, node: _Node) -> _Node:
+        left = node.left
+        node.left, left.right = left.right, node
+        self._update(node)
+        self._update(left)
+        return left
+
+    def _rotate_left(self, node: _Node) -> _Node:
+        right = node.right
+        node.right, right.left = right.left, node
+        self._update(node)
+        self._update(right)
+        return right
+
+    def _insert(self, node: Optional[_Node], new: _Node) -> _Node:
+        if node is None:
+            return new
+        if new.start < node.start:
+            node.left = self._insert(node.left, new)
+            if node.left.priority > node.priority:
+                node = self._rotate_right(node)
+        else:
+            node.right = self._insert(node.right, new)
+            if node.right.priority > node.priority:
+                node = self._rotate_left(node)
+        self._update(node)
+        return node
+
+    def insert(self, start: float, end: float) -> None:
+        self._root = self._insert(self._root, _Node(start, end, self._rng.random()))
+        self._size += 1
+
+    def find_overlap(self, start: float, end: float) -> Optional[Tuple[float, float]]:
+        """Return any stored interval overlapping [start, end), or None."""
+        node = self._root
+        while node is not None:
+            if node.start < end and start < node.end:
+                return node.start, node.end
+            if node.left is not None and node.left.max_end > start:
+                node = node.left
+            else:
+                node = node.right
+        return None
+
+
+class InterviewCalendar:
+    """
+    Allocates non-overlapping interview slots across interviewers inside business
+    hours and persists the bookings in SQLite.
+
+    Candidates are assigned in input order to the interviewer whose next free time
+    is earliest (min-heap), and each interviewer's busy intervals live in an
+    IntervalTree, so a batch of n candidates is allocated in O(n log n).
+    """
+
+    def __init__(
+        self,
+        path: str = CALENDAR_PATH,
+        timezone: str = "Asia/Jakarta",
+        day_start_hour: int = 9,
+        day_end_hour: int = 17,
+        granularity_minutes: int = 30
+    ):
+        self.path = path
+        self.tz = pytz.timezone(timezone)
+        self.day_start_hour = day_start_hour
+        self.day_end_hour = day_end_hour
+        self.granularity = granularity_minutes * 60
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._db() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS bookings (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    candidate_email TEXT NOT NULL,
+                    role TEXT NOT NULL,
+                    interviewer TEXT NOT NULL,
+                    start_ts REAL NOT NULL,
+                    end_ts REAL NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'tentative',
+                    meeting_id TEXT,
+                    join_url TEXT,
+                    created_at REAL NOT NULL,
+                    UNIQUE (candidate_email, role)
+                )
+            """)
+
+    @contextmanager
+    def _db(self) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(self.path, timeout=30)
+        db.row_factory = sqlite3.Row
+        try:
+            yield db
+            db.commit()
+        finally:
+            db.close()
+
+    def _to_booking(self, row: sqlite3.Row) -> Dict:
+        return {
+            'id': row['id'],
+            'candidate_email': row['candidate_email'],
+            'role': row['role'],
+            'interviewer': row['interviewer'],
+            'start': datetime.fromtimestamp(row['start_ts'], self.tz),
+            'end': datetime.fromtimestamp(row['end_ts'], self.tz),
+            'status': row['status'],
+            'meeting_id': row['meeting_id'],
+            'join_url': row['join_url'],
+        }
+
+    def _align(self, ts: float, duration: float) -> float:
+        """Move ts forward onto the slot grid and inside business hours on a weekday."""
+        ts = -(-ts // self.granularity) * self.granularity
+        while True:
+            moment = datetime.fromtimestamp(ts, self.tz)
+            day_start = moment.replace(hour=self.day_start_hour, minute=0, second=0, microsecond=0)
+            day_end = moment.replace(hour=self.day_end_hour, minute=0, second=0, microsecond=0)
+            if moment.weekday() >= 5 or ts + duration > day_end.timestamp():
+                next_day = self.tz.normalize(day_start + timedelta(days=1))
+                ts = next_day.timestamp()
+                continue
+            return max(ts, day_start.timestamp())
+
+    def _next_free(self, tree: IntervalTree, ts: float, duration: float) -> float:
+        while True:
+            ts = self._align(ts, duration)
+            overlap = tree.find_overlap(ts, ts + duration)
+            if overlap is None:
+                return ts
+            ts = overlap[1]
+
+    def allocate(
+        self,
+        candidate_emails: List[str],
+        role: str,
+        interviewers: List[str],
+        duration_minutes: int,
+        now: datetime
+    ) -> List[Dict]:
+        """
+        Reserve a slot for every candidate, starting the next working day.
+
+        Candidates that already hold an upcoming booking for this role keep it; a past
+        booking for the same role is replaced. New slots are stored as 'tentative'
+        until confirm() records the meeting.
+        """
+        interviewers = interviewers or ["Interviewer 1"]
+        duration = duration_minutes * 60
+        trees = {name: IntervalTree() for name in interviewers}
+
+        with self._db() as db:
+            rows = db.execute("SELECT * FROM bookings WHERE end_ts > ?", (now.timestamp(),)).fetchall()
+        existing = {}
+        for row in rows:
+            if row['interviewer'] in trees:
+                trees[row['interviewer']].insert(row['start_ts'], row['end_ts'])
+            if row['role'] == role:
+                existing[row['candidate_email']] = self._to_booking(row)
+
+        tomorrow = now.astimezone(self.tz) + timedelta(days=1)
+        first_ts = tomorrow.replace(hour=self.day_start_hour, minute=0, second=0, microsecond=0).timestamp()
+        heap = [(first_ts, idx, name) for idx, name in enumerate(interviewers)]
+        heapq.heapify(heap)
+
+        bookings = []
+        with self._db() as db:
+            for email in candidate_emails:
+                if email in existing:
+                    bookings.append(existing[email])
+                    continue
+                cursor, idx, name = heapq.heappop(heap)
+                start = self._next_free(trees[name], cursor, duration)
+                end = start + duration
+                trees[name].insert(start, end)
+                heapq.heappush(heap, (end, idx, name))
+
+                # Booking lama yang sudah lewat masih memegang UNIQUE (candidate_email, role)
+                db.execute(
+                    "DELETE FROM bookings WHERE candidate_email = ? AND role = ? AND end_ts <= ?",
+                    (email, role, now.timestamp())
+                )
+                booking_id = db.execute(
+                    "INSERT INTO bookings (candidate_email, role, interviewer, start_ts, end_ts, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (email, role, name, start, end, time.time())
+                ).lastrowid
+                booking = {
+                    'id': booking_id,
+                    'candidate_email': email,
+                    'role': role,
+                    'interviewer': name,
+                    'start': datetime.fromtimestamp(start, self.tz),
+                    'end': datetime.fromtimestamp(end, self.tz),
+                    'status': 'tentative',
+                    'meeting_id': None,
+                    'join_url': None,
+                }
+                existing[email] = booking
+                bookings.append(booking)
+        return bookings
+
+    def confirm(self, booking_id: int, meeting_id, join_url: str) -> None:
+        with self._db() as db:
+            db.execute(
+                "UPDATE bookings SET status = 'confirmed', meeting_id = ?, join_url = ? WHERE id = ?",
+                (str(meeting_id), join_url, booking_id)
+            )
+
+    def cancel(self, booking_id: int) -> None:
+        """Free a tentative slot, e.g. when the Zoom meeting could not be created."""
+        with self._db() as db:
+            db.execute("DELETE FROM bookings WHERE id = ?", (booking_id,))
+
+    def upcoming(self, now: datetime) -> List[Dict]:
+        with self._db() as db:
+            rows = db.execute(
+                "SELECT * FROM bookings WHERE end_ts > ? ORDER BY start_ts", (now.timestamp(),)
+            ).fetchall()
+        return [self._to_booking(row) for row in rows]
@@ -0,0 +1,139 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+JOBS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "jobs.sqlite3")
+
+# Urutan state per kandidat; kandidat hanya bergerak maju
+STATES = ('extracted', 'analyzed', 'emailed', 'scheduled')
+STATE_ORDER = {state: i for i, state in enumerate(STATES)}
+
+
+def candidate_key(email: str, resume_text: str) -> str:
+    """Idempotency key of one application: same email + same resume -> same key."""
+    resume_hash = hashlib.sha256(resume_text.encode("utf-8")).hexdigest()
+    return hashlib.sha256(f"{email.lower()}:{resume_hash}".encode("utf-8")).hexdigest()[:16]
+
+
+def reached(state: str, target: str) -> bool:
+    return STATE_ORDER.get(state, -1) >= STATE_ORDER[target]
+
+
+class JobStore:
+    """Persistent batch jobs with per-candidate state transitions (extracted -> analyzed -> emailed -> scheduled)."""
+
+    def __init__(self, path: str = JOBS_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._db() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    role TEXT NOT NULL,
+                    requirements TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'running',
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS job_candidates (
+                    job_id TEXT NOT NULL REFERENCES jobs(id),
+                    key TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    email TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    resume_text TEXT NOT NULL,
+                    state TEXT NOT NULL DEFAULT 'extracted',
+                    result TEXT,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (job_id, key)
+                )
+            """)
+
+    @contextmanager
+    def _db(self) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(self.path, timeout=30)
+        db.row_factory = sqlite3.Row
+        try:
+            yield db
+            db.commit()
+        finally:
+            db.close()
+
+    def open_job(self, role: str, requirements: str, candidates: List[Dict]) -> str:
+        """
+        Create the job, or return the existing one for the same role, requirements
+        and set of applications, so re-submitting an interrupted batch resumes it.
+        """
+        keys = sorted(candidate_key(c['email'], c['resume_text']) for c in candidates)
+        job_id = hashlib.sha256("\n".join([role, requirements, *keys]).encode("utf-8")).hexdigest()[:16]
+        now = time.time()
+        with self._db() as db:
+            db.execute(
+                "INSERT OR IGNORE INTO jobs (id, role, requirements, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, role, requirements, now, now)
+            )
+            db.executemany(
+                "INSERT OR IGNORE INTO job_candidates (job_id, key, position, email, filename, resume_text, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (job_id, candidate_key(c['email'], c['resume_text']), position,
+                     c['email'], c['filename'], c['resume_text'], now)
+                    for position, c in enumerate(candidates)
+                ]
+            )
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        with self._db() as db:
+            job = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None:
+                return None
+            counts = dict(db.execute(
+                "SELECT state, COUNT(*) FROM job_candidates WHERE job_id = ? GROUP BY state", (job_id,)
+            ).fetchall())
+        return {**dict(job), 'states': {state: counts.get(state, 0) for state in STATES}, 'total': sum(counts.values())}
+
+    def load_candidates(self, job_id: str) -> List[Dict]:
+        with self._db() as db:
+            rows = db.execute(
+                "SELECT * FROM job_candidates WHERE job_id = ? ORDER BY position", (job_id,)
+            ).fetchall()
+        return [
+            {
+                'key': row['key'],
+                'email': row['email'],
+                'filename': row['filename'],
+                'resume_text': row['resume_text'],
+                'state': row['state'],
+                'result': json.loads(row['result']) if row['result'] else None,
+            }
+            for row in rows
+        ]
+
+    def update(self, job_id: str, key: str, state: str, result: Dict) -> None:
+        """Record a candidate's result; the state never moves backwards."""
+        with self._db() as db:
+            current = db.execute(
+                "SELECT state FROM job_candidates WHERE job_id = ? AND key = ?", (job_id, key)
+            ).fetchone()
+            if current is not None and reached(current['state'], state):
+                state = current['state']
+            db.execute(
+                "UPDATE job_candidates SET state = ?, result = ?, updated_at = ? WHERE job_id = ? AND key = ?",
+                (state, json.dumps(result, default=str), time.time(), job_id, key)
+            )
+            db.execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (time.time(), job_id))
+
+    def set_status(self, job_id: str, status: str) -> None:
+        with self._db() as db:
+            db.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?", (status, time.time(), job_id))
+
+    def results(self, job_id: str) -> List[Dict]:
+        return [c['result'] for c in self.load_candidates(job_id) if c['result']]
@@ -0,0 +1,295 @@
+import os
+import time
+import queue
+import random
+import sqlite3
+import smtplib
+import logging
+import threading
+from contextlib import contextmanager
+from email.message import EmailMessage
+from typing import Dict, Iterator, Optional, Tuple
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+OUTBOX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "outbox.sqlite3")
+
+_templates = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    undefined=StrictUndefined,
+    trim_blocks=True,
+    lstrip_blocks=True
+)
+
+
+def render_email(template_name: str, **context) -> Tuple[str, str]:
+    """Render templates/<name>.txt.j2 into (subject, body). The first line is 'Subject: ...'."""
+    rendered = _templates.get_template(f"{template_name}.txt.j2").render(**context)
+    header, _, body = rendered.partition("\n\n")
+    return header.removeprefix("Subject:").strip(), body.strip() + "\n"
+
+
+class SMTPPool:
+    """Pool of persistent, already-authenticated SMTP connections shared by all sender threads."""
+
+    def __init__(
+        self,
+        sender_email: str,
+        sender_passkey: str,
+        sender_name: str,
+        host: str = "smtp.gmail.com",
+        port: int = 465,
+        use_ssl: bool = True,
+        size: int = 4,
+        timeout: float = 30.0
+    ):
+        self.sender_email = sender_email
+        self.sender_passkey = sender_passkey
+        self.sender_name = sender_name
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[smtplib.SMTP]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self) -> smtplib.SMTP:
+        if self.use_ssl:
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.sender_passkey:
+            server.login(self.sender_email, self.sender_passkey)
+        return server
+
+    @contextmanager
+    def connection(self) -> Iterator[smtplib.SMTP]:
+        self._slots.acquire()
+        server = None
+        try:
+            try:
+                server = self._idle.get_nowait()
+            except queue.Empty:
+                server = self._connect()
+            yield server
+        except (smtplib.SMTPServerDisconnected, OSError):
+            # Koneksi rusak tidak dikembalikan ke pool
+            self._discard(server)
+            server = None
+            raise
+        finally:
+            if server is not None:
+                self._idle.put(server)
+            self._slots.release()
+
+    def send(self, receiver_email: str, subject: str, body: str) -> None:
+        msg = EmailMessage()
+        msg["Subject"] = subject
+        msg["From"] = f"{self.sender_name} <{self.sender_email}>"
+        msg["To"] = receiver_email
+        msg.set_content(body)
+
+        # Server (mis. Gmail) menutup koneksi idle; coba sekali lagi dengan koneksi baru
+        for attempt in range(2):
+            try:
+                with self.connection() as server:
+                    server.send_message(msg)
+                return
+            except smtplib.SMTPServerDisconnected:
+                if attempt:
+                    raise
+
+    @staticmethod
+    def _discard(server: Optional[smtplib.SMTP]) -> None:
+        if server is None:
+            return
+        try:
+            server.close()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        while True:
+            try:
+                server = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                server.quit()
+            except Exception:
+                self._discard(server)
+
+
+class Outbox:
+    """
+    Durable SQLite queue of outgoing emails with jittered exponential backoff.
+
+    A message is claimed ('pending' -> 'sending') in a single UPDATE before it is
+    handed to SMTP, so concurrent deliver()/drain() calls from different sessions
+    never send it twice. A claim older than claim_timeout (the sender died mid-send)
+    is released back to 'pending' by drain() and retry_failed().
+    """
+
+    def __init__(self, path: str = OUTBOX_PATH, max_attempts: int = 5, base_delay: float = 2.0, max_delay: float = 300.0,
+                 claim_timeout: float = 300.0):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.claim_timeout = claim_timeout
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._db() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    idempotency_key TEXT UNIQUE,
+                    receiver_email TEXT NOT NULL,
+                    subject TEXT NOT NULL,
+                    body TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    created_at REAL NOT NULL,
+                    sent_at REAL,
+                    claimed_at REAL
+                )
+            """)
+            columns = {row[1] for row in db.execute("PRAGMA table_info(outbox)")}
+            if "claimed_at" not in columns:
+                db.execute("ALTER TABLE outbox ADD COLUMN claimed_at REAL")
+
+    @contextmanager
+    def _db(self) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(self.path, timeout=30)
+        db.execute("PRAGMA synchronous=NORMAL")
+        try:
+            yield db
+            db.commit()
+        finally:
+            db.close()
+
+    def enqueue(self, receiver_email: str, subject: str, body: str, idempotency_key: Optional[str] = None) -> int:
+        """
+        Store a message; enqueueing the same idempotency key again returns the existing message.
+        A message that had given up ('failed') is re-armed with the new content and a fresh
+        attempt budget, so a retry after fixing the SMTP settings actually sends it.
+        """
+        with self._db() as db:
+            cursor = db.execute(
+                "INSERT OR IGNORE INTO outbox (idempotency_key, receiver_email, subject, body, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (idempotency_key, receiver_email, subject, body, time.time())
+            )
+            if cursor.rowcount:
+                return cursor.lastrowid
+            message_id = db.execute("SELECT id FROM outbox WHERE idempotency_key = ?", (idempotency_key,)).fetchone()[0]
+            db.execute(
+                "UPDATE outbox SET status = 'pending', attempts = 0, next_attempt_at = 0, "
+                "receiver_email = ?, subject = ?, body = ? WHERE id = ? AND status = 'failed'",
+                (receiver_email, subject, body, message_id)
+            )
+            return message_id
+
+    def _release_stale_claims(self, db: sqlite3.Connection) -> None:
+        db.execute(
+            "UPDATE outbox SET status = 'pending', claimed_at = NULL WHERE status = 'sending' AND claimed_at <= ?",
+            (time.time() - self.claim_timeout,)
+        )
+
+    def retry_failed(self) -> int:
+        """Re-arm every message that exhausted its attempts; the next drain() sends them. Returns the count."""
+        with self._db() as db:
+            self._release_stale_claims(db)
+            return db.execute(
+                "UPDATE outbox SET status = 'pending', attempts = 0, next_attempt_at = 0 WHERE status = 'failed'"
+            ).rowcount
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.5)
+
+    def deliver(self, message_id: int, pool: SMTPPool) -> bool:
+        """
+        Try to send one message now. Returns True once it has been sent (now or earlier);
+        False if it is backing off, has failed, or another caller is sending it right now.
+        """
+        now = time.time()
+        with self._db() as db:
+            claimed = db.execute(
+                "UPDATE outbox SET status = 'sending', claimed_at = ? "
+                "WHERE id = ? AND status = 'pending' AND next_attempt_at <= ?",
+                (now, message_id, now)
+            ).rowcount == 1
+            row = db.execute(
+                "SELECT receiver_email, subject, body, status, attempts FROM outbox WHERE id = ?", (message_id,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"Unknown outbox message {message_id}")
+        receiver_email, subject, body, status, attempts = row
+        if not claimed:
+            return status == "sent"
+
+        try:
+            pool.send(receiver_email, subject, body)
+        except Exception as e:
+            attempts += 1
+            failed = attempts >= self.max_attempts
+            logger.warning(f"Sending email to {receiver_email} failed (attempt {attempts}): {e}")
+            with self._db() as db:
+                db.execute(
+                    "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ?, claimed_at = NULL "
+                    "WHERE id = ?",
+                    ("failed" if failed else "pending", attempts, time.time() + self._backoff(attempts), str(e), message_id)
+                )
+            return False
+
+        with self._db() as db:
+            db.execute(
+                "UPDATE outbox SET status = 'sent', attempts = ?, sent_at = ?, last_error = NULL, claimed_at = NULL "
+                "WHERE id = ?",
+                (attempts + 1, time.time(), message_id)
+            )
+        return True
+
+    def deliver_with_retry(self, message_id: int, pool: SMTPPool, timeout: float = 60.0, poll: float = 0.5) -> bool:
+        """
+        Deliver, sleeping through the backoff between attempts until sent, failed or out of
+        time. While another caller holds the claim, poll until that send settles.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.deliver(message_id, pool):
+                return True
+            with self._db() as db:
+                status, next_attempt_at = db.execute(
+                    "SELECT status, next_attempt_at FROM outbox WHERE id = ?", (message_id,)
+                ).fetchone()
+            wait = poll if status == "sending" else max(0.0, next_attempt_at - time.time())
+            if status == "sent":
+                return True
+            if status == "failed" or time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def drain(self, pool: SMTPPool) -> Dict[str, int]:
+        """Send every pending message whose backoff has elapsed, e.g. leftovers of an interrupted batch."""
+        with self._db() as db:
+            self._release_stale_claims(db)
+            due = [r[0] for r in db.execute(
+                "SELECT id FROM outbox WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY id", (time.time(),)
+            )]
+        for message_id in due:
+            self.deliver(message_id, pool)
+        return self.stats()
+
+    def stats(self) -> Dict[str, int]:
+        with self._db() as db:
+            counts = dict(db.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+        # Pesan yang sedang dikirim dihitung sebagai pending sampai hasilnya diketahui
+        counts["pending"] = counts.get("pending", 0) + counts.get("sending", 0)
+        return {status: counts.get(status, 0) for status in ("pending", "sent", "failed")}
@@ -0,0 +1,143 @@
+import os
+import io
+import hashlib
+import logging
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+import PyPDF2
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "pdf_text")
+
+# Cache di memori hidup selama proses Streamlit berjalan, jadi rerun tidak mengekstrak ulang;
+# dibatasi (LRU) karena server berjalan lama, sisanya tetap ada di cache disk
+MEMORY_CACHE_ENTRIES = 256
+_memory_cache: "OrderedDict[str, str]" = OrderedDict()
+_lock = threading.Lock()
+
+# Satu pool proses untuk seluruh modul. Start method "spawn": fork dari server Streamlit
+# yang multi-thread bisa membuat child deadlock pada lock milik thread lain.
+EXTRACT_WORKERS = os.cpu_count() or 1
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def extract_text_from_bytes(data: bytes) -> str:
+    """Extract text from raw PDF bytes. Top-level so it can run in a worker process."""
+    try:
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(data))
+        return "".join(page.extract_text() or "" for page in pdf_reader.pages)
+    except Exception as e:
+        logger.error(f"Error extracting PDF text: {str(e)}")
+        return ""
+
+
+def _disk_path(key: str) -> str:
+    return os.path.join(CACHE_DIR, f"{key}.txt")
+
+
+def _remember(key: str, text: str) -> None:
+    with _lock:
+        _memory_cache[key] = text
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > MEMORY_CACHE_ENTRIES:
+            _memory_cache.popitem(last=False)
+
+
+def _lookup(key: str) -> Optional[str]:
+    with _lock:
+        if key in _memory_cache:
+            _memory_cache.move_to_end(key)
+            return _memory_cache[key]
+    try:
+        with open(_disk_path(key), encoding="utf-8") as f:
+            text = f.read()
+    except OSError:
+        return None
+    _remember(key, text)
+    return text
+
+
+def _store(key: str, text: str) -> None:
+    _remember(key, text)
+    # PDF yang gagal diekstrak tidak disimpan ke disk agar bisa dicoba lagi
+    if not text:
+        return
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = _disk_path(key) + f".{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, _disk_path(key))
+    except OSError as e:
+        logger.warning(f"Could not write PDF text cache: {e}")
+
+
+def cached_extract_text(data: bytes) -> str:
+    """Extract text from one PDF, served from the memory/disk cache when seen before."""
+    key = content_hash(data)
+    text = _lookup(key)
+    if text is None:
+        text = extract_text_from_bytes(data)
+        _store(key, text)
+    return text
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _reset_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def cached_extract_texts(files: List[bytes]) -> List[str]:
+    """
+    Extract text from many PDFs, keeping input order.
+
+    Cache hits cost only a hash; misses are extracted in parallel on the module's
+    shared process pool, which is started once and reused across batches.
+    """
+    keys = [content_hash(data) for data in files]
+    texts: List[Optional[str]] = [_lookup(key) for key in keys]
+
+    # Deduplikasi: file identik yang diunggah dua kali cukup diekstrak sekali
+    missing: Dict[str, bytes] = {}
+    for key, data, text in zip(keys, files, texts):
+        if text is None and key not in missing:
+            missing[key] = data
+
+    extracted: Dict[str, str] = {}
+    if len(missing) == 1 or (missing and EXTRACT_WORKERS == 1):
+        extracted = {key: extract_text_from_bytes(data) for key, data in missing.items()}
+    elif missing:
+        try:
+            extracted = dict(zip(missing, _get_pool().map(extract_text_from_bytes, missing.values())))
+        except BrokenProcessPool as e:
+            # Worker mati (mis. kehabisan memori): buat pool baru lain kali, ekstrak di proses ini
+            logger.warning(f"PDF extraction pool broke, extracting in-process: {e}")
+            _reset_pool()
+            extracted = {key: extract_text_from_bytes(data) for key, data in missing.items()}
+    for key, text in extracted.items():
+        _store(key, text)
+
+    # Hasil batch ini dipakai langsung, tidak bergantung pada cache memori yang dibatasi
+    return [text if text is not None else extracted.get(key, "") for key, text in zip(keys, texts)]
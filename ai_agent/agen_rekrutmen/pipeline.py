@@ -0,0 +1,116 @@
+import queue
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Stage function: (candidate, result) -> True jika kandidat lanjut ke stage berikutnya
+StageFn = Callable[[Dict, Dict], bool]
+
+
+class RateLimiter:
+    """Thread-safe token bucket allowing `rate_per_minute` calls, with bursts up to `burst`."""
+
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        self.interval = 60.0 / rate_per_minute if rate_per_minute > 0 else 0.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) / self.interval)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) * self.interval
+            time.sleep(wait)
+
+
+class Stage:
+    """One bounded pipeline stage with its own worker pool and rate limiters."""
+
+    def __init__(
+        self,
+        name: str,
+        fn: StageFn,
+        workers: int,
+        limiters: Optional[List[RateLimiter]] = None,
+        initializer: Optional[Callable[[], None]] = None
+    ):
+        self.name = name
+        self.fn = fn
+        self.limiters = limiters or []
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(1, workers),
+            thread_name_prefix=f"recruit-{name}",
+            initializer=initializer
+        )
+
+    def run(self, candidate: Dict, result: Dict) -> bool:
+        for limiter in self.limiters:
+            limiter.acquire()
+        return self.fn(candidate, result)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_pipeline(candidates: List[Dict], results: List[Dict], stages: List[Stage]) -> Iterator[Tuple[int, Dict, bool]]:
+    """
+    Push every candidate through `stages` concurrently.
+
+    Each candidate moves to the next stage as soon as its previous stage finishes,
+    so analysis, email and scheduling of different candidates overlap. Yields
+    (index, snapshot of result, is_final) on the calling thread after every stage,
+    which keeps all Streamlit UI updates on the script thread.
+    """
+    events: "queue.Queue[Tuple[int, Dict, bool]]" = queue.Queue()
+
+    def submit(stage_idx: int, idx: int) -> None:
+        stage = stages[stage_idx]
+        future = stage.executor.submit(stage.run, candidates[idx], results[idx])
+        future.add_done_callback(lambda f: on_done(stage_idx, idx, f))
+
+    def on_done(stage_idx: int, idx: int, future) -> None:
+        if future.cancelled():
+            return
+        try:
+            proceed = future.result()
+        except Exception as e:
+            logger.error(f"Stage '{stages[stage_idx].name}' failed for candidate {idx}: {str(e)}")
+            results[idx]['error'] = str(e)
+            proceed = False
+
+        final = not proceed or stage_idx + 1 == len(stages)
+        # Snapshot diambil sebelum stage berikutnya mulai mengubah result
+        events.put((idx, dict(results[idx]), final))
+        if not final:
+            try:
+                submit(stage_idx + 1, idx)
+            except RuntimeError:
+                # Pipeline sudah dihentikan (mis. generator ditutup)
+                pass
+
+    try:
+        for idx in range(len(candidates)):
+            submit(0, idx)
+
+        remaining = len(candidates)
+        while remaining:
+            idx, snapshot, final = events.get()
+            if final:
+                remaining -= 1
+            yield idx, snapshot, final
+    finally:
+        for stage in stages:
+            stage.shutdown()
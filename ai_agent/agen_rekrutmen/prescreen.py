@@ -0,0 +1,212 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+BULLET_LINE = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s*(.+)$")
+OPTIONAL_SECTION = re.compile(r"nice to have|optional|preferred|bonus|plus point", re.IGNORECASE)
+YEARS_PATTERN = re.compile(r"(\d{1,2})\s*\+?\s*(?:years?|yrs?|tahun)", re.IGNORECASE)
+PARENTHESES = re.compile(r"\(([^)]*)\)")
+
+STOPWORDS = {
+    "and", "or", "the", "of", "with", "in", "for", "to", "a", "an", "on", "using",
+    "experience", "knowledge", "skills", "strong", "good", "solid", "understanding",
+    "dan", "atau", "dengan", "pengalaman",
+}
+
+# Bobot skill di bagian "Nice to have" dibanding skill wajib
+OPTIONAL_WEIGHT = 0.5
+# Teks resume yang dikirim ke LLM dipotong agar token prompt terbatas
+MAX_LLM_RESUME_CHARS = 12000
+# Estimasi kasar untuk laporan penghematan (token ~ 4 karakter, overhead prompt + respons)
+CHARS_PER_TOKEN = 4
+PROMPT_OVERHEAD_TOKENS = 600
+
+
+def _term_regex(term: str) -> Optional[str]:
+    """Regex for one skill term; long phrases are reduced to their first two significant words."""
+    tokens = [t for t in re.split(r"\s+", term.strip().lower()) if t]
+    if len(tokens) > 2:
+        tokens = [t for t in tokens if t not in STOPWORDS][:2]
+    if not tokens:
+        return None
+    parts = []
+    for token in tokens:
+        part = re.escape(token)
+        # Toleransi bentuk jamak sederhana: "apis" cocok dengan "api"
+        if token.endswith("s") and len(token) > 3 and token.isalpha():
+            part = re.escape(token[:-1]) + "s?"
+        parts.append(part)
+    return r"(?<![a-z0-9])" + r"[\s\-_.]*".join(parts) + r"(?![a-z0-9])"
+
+
+def _split_skill_line(line: str) -> List[List[str]]:
+    """Split a bullet into skills; each skill is a list of interchangeable terms (e.g. PyTorch/TensorFlow)."""
+    alternatives_in_parens = [alt for group in PARENTHESES.findall(line) for alt in re.split(r"[/,]", group)]
+    line = PARENTHESES.sub("", line)
+    skills = []
+    for item in re.split(r",|;", line):
+        terms = [t.strip() for t in item.split("/") if t.strip()]
+        if terms:
+            skills.append(terms)
+    # "Cloud services (AWS/GCP/Azure)": isi kurung adalah alternatif dari skill terakhir
+    if alternatives_in_parens and skills:
+        skills[-1].extend(a.strip() for a in alternatives_in_parens if a.strip())
+    return skills
+
+
+class SkillIndex:
+    """Vocabulary/regex index of the skills listed in a requirements text."""
+
+    def __init__(self, requirements: str):
+        self.skills: List[str] = []
+        self.patterns: List[re.Pattern] = []
+        weights: List[float] = []
+        self.min_years: Optional[int] = None
+
+        lines = requirements.splitlines()
+        has_bullets = any(BULLET_LINE.match(line) for line in lines)
+        weight = 1.0
+        for line in lines:
+            if OPTIONAL_SECTION.search(line) and not BULLET_LINE.match(line):
+                weight = OPTIONAL_WEIGHT
+                continue
+            match = BULLET_LINE.match(line)
+            content = match.group(1) if match else (line if not has_bullets else "")
+            if not content.strip() or content.rstrip().endswith(":"):
+                continue
+
+            years = YEARS_PATTERN.search(content)
+            if years:
+                if weight == 1.0:
+                    self.min_years = max(self.min_years or 0, int(years.group(1)))
+                continue
+
+            for terms in _split_skill_line(content):
+                alternatives = [r for r in (_term_regex(t) for t in terms) if r]
+                if not alternatives:
+                    continue
+                self.skills.append("/".join(terms))
+                self.patterns.append(re.compile("|".join(alternatives), re.IGNORECASE))
+                weights.append(weight)
+
+        self.weights = np.array(weights, dtype=float)
+
+    def __len__(self) -> int:
+        return len(self.skills)
+
+    def match_matrix(self, texts: List[str]) -> np.ndarray:
+        """Boolean matrix (candidates x skills) of which skills appear in each resume."""
+        matrix = np.zeros((len(texts), len(self.skills)), dtype=bool)
+        for j, pattern in enumerate(self.patterns):
+            matrix[:, j] = [bool(pattern.search(text)) for text in texts]
+        return matrix
+
+    def scores(self, matrix: np.ndarray) -> np.ndarray:
+        """Weighted fraction of matched skills per candidate, computed for the whole batch at once."""
+        if not len(self):
+            return np.zeros(matrix.shape[0])
+        return matrix.astype(float) @ self.weights / self.weights.sum()
+
+
+def detect_years_of_experience(text: str) -> Optional[int]:
+    years = [int(y) for y in YEARS_PATTERN.findall(text)]
+    return max(years) if years else None
+
+
+def experience_level(years: Optional[int]) -> str:
+    if years is None:
+        return "unknown"
+    if years < 2:
+        return "junior"
+    return "mid" if years < 5 else "senior"
+
+
+def prescreen_candidates(
+    resume_texts: List[str],
+    requirements: str,
+    reject_below: float,
+    accept_above: float
+) -> List[Dict]:
+    """
+    Score every resume against the requirements and decide its route.
+
+    decision is 'reject' or 'accept' for clear cases (templated result, no LLM)
+    and 'llm' for borderline candidates.
+    """
+    index = SkillIndex(requirements)
+    matrix = index.match_matrix(resume_texts)
+    scores = index.scores(matrix)
+
+    results = []
+    for i, text in enumerate(resume_texts):
+        years = detect_years_of_experience(text)
+        score = float(scores[i])
+        if not len(index):
+            decision = "llm"  # Requirement tidak terstruktur: serahkan ke LLM
+        elif score < reject_below:
+            decision = "reject"
+        elif score >= accept_above and (index.min_years is None or (years or 0) >= index.min_years):
+            decision = "accept"
+        else:
+            decision = "llm"
+        results.append({
+            "score": round(score, 3),
+            "decision": decision,
+            "matching_skills": [s for s, hit in zip(index.skills, matrix[i]) if hit],
+            "missing_skills": [s for s, hit in zip(index.skills, matrix[i]) if not hit],
+            "years_experience": years,
+        })
+    return results
+
+
+def templated_analysis(prescreen: Dict) -> Tuple[bool, str, dict]:
+    """Build the analyze_resume-style result for a candidate decided by the pre-screen."""
+    selected = prescreen["decision"] == "accept"
+    matching = prescreen["matching_skills"]
+    missing = prescreen["missing_skills"]
+    if selected:
+        feedback = (
+            f"Strong match ({prescreen['score']:.0%} of the required skills): "
+            f"{', '.join(matching)}."
+        )
+    else:
+        feedback = (
+            f"The resume covers only {prescreen['score']:.0%} of the required skills. "
+            f"Missing: {', '.join(missing) or '-'}."
+        )
+    result = {
+        "selected": selected,
+        "feedback": feedback,
+        "matching_skills": matching,
+        "missing_skills": missing,
+        "experience_level": experience_level(prescreen["years_experience"]),
+        "prescreen_score": prescreen["score"],
+        "decided_by": "prescreen",
+    }
+    return selected, feedback, result
+
+
+def estimate_llm_tokens(resume_text: str, requirements: str) -> int:
+    chars = min(len(resume_text), MAX_LLM_RESUME_CHARS) + len(requirements)
+    return chars // CHARS_PER_TOKEN + PROMPT_OVERHEAD_TOKENS
+
+
+def savings_report(
+    prescreens: List[Dict],
+    resume_texts: List[str],
+    requirements: str,
+    llm_latencies: List[float]
+) -> Dict:
+    """Summarise how many LLM calls, tokens and seconds the pre-screen saved for a batch."""
+    skipped = [i for i, p in enumerate(prescreens) if p["decision"] != "llm"]
+    avg_latency = float(np.mean(llm_latencies)) if llm_latencies else 0.0
+    return {
+        "total": len(prescreens),
+        "llm_calls": len(prescreens) - len(skipped),
+        "auto_accepted": sum(p["decision"] == "accept" for p in prescreens),
+        "auto_rejected": sum(p["decision"] == "reject" for p in prescreens),
+        "tokens_saved": sum(estimate_llm_tokens(resume_texts[i], requirements) for i in skipped),
+        "avg_llm_latency_s": round(avg_latency, 2),
+        "llm_seconds_saved": round(avg_latency * len(skipped), 1),
+    }
@@ -0,0 +1,116 @@
+import re
+import json
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class ResumeAnalysis(BaseModel):
+    """Schema the analyzer is constrained to via OpenAI structured outputs."""
+
+    selected: bool = Field(..., description="Whether the candidate should move on to an interview")
+    feedback: str = Field(..., description="Detailed feedback explaining the decision")
+    matching_skills: List[str] = Field(..., description="Required skills the candidate has")
+    missing_skills: List[str] = Field(..., description="Required skills the candidate lacks")
+    experience_level: Literal["junior", "mid", "senior"]
+
+
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+def _loads_lenient(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return json.loads(_TRAILING_COMMA.sub(r"\1", text))
+
+
+class JSONObjectStream:
+    """
+    Incremental scanner that returns the first complete top-level JSON object in a
+    text stream, skipping prose or markdown fences around it. feed() can be called
+    with streamed chunks or with the whole response at once.
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self) -> None:
+        self._buffer: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> Optional[Dict]:
+        for char in chunk:
+            if not self._depth:
+                if char == "{":
+                    self._buffer, self._depth = ["{"], 1
+                continue
+            self._buffer.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if not self._depth:
+                    candidate = "".join(self._buffer)
+                    self._reset()
+                    try:
+                        value = _loads_lenient(candidate)
+                    except json.JSONDecodeError:
+                        continue  # Kurung kurawal di dalam prosa, lanjut cari objek berikutnya
+                    if isinstance(value, dict):
+                        return value
+        return None
+
+
+def _coerce(data: Dict) -> Dict:
+    data = dict(data)
+    if isinstance(data.get("selected"), str):
+        data["selected"] = data["selected"].strip().lower() in ("true", "yes", "selected")
+    if isinstance(data.get("experience_level"), str):
+        data["experience_level"] = data["experience_level"].strip().lower()
+    for key in ("matching_skills", "missing_skills"):
+        data.setdefault(key, [])
+    return ResumeAnalysis.model_validate(data).model_dump()
+
+
+def parse_analysis(content: Any) -> Dict:
+    """
+    Turn an analyzer response into a validated analysis dict.
+
+    Accepts the parsed ResumeAnalysis from structured outputs, a dict, or raw text
+    with JSON somewhere inside it. Raises ValueError when nothing valid is found.
+    """
+    if isinstance(content, ResumeAnalysis):
+        return content.model_dump()
+    if isinstance(content, dict):
+        return _coerce(content)
+    if isinstance(content, str):
+        data = JSONObjectStream().feed(content)
+        if data is None:
+            raise ValueError("No JSON object found in response")
+        return _coerce(data)
+    raise ValueError(f"Unexpected response content: {type(content).__name__}")
+
+
+def repair_prompt(raw: Any, error: str) -> str:
+    """Prompt for the single repair attempt after a response failed to parse."""
+    return f"""Your previous answer could not be parsed: {error}
+
+    Previous answer:
+    {str(raw)[:4000]}
+
+    Return the same assessment as a single JSON object with exactly these keys:
+    selected (boolean), feedback (string), matching_skills (list of strings),
+    missing_skills (list of strings), experience_level ("junior", "mid" or "senior").
+    """
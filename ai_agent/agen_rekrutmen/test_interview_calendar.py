@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta
+
+import pytz
+
+from interview_calendar import InterviewCalendar
+
+JAKARTA = pytz.timezone("Asia/Jakarta")
+
+
+def test_rebook_after_expired_booking(tmp_path):
+    calendar = InterviewCalendar(path=str(tmp_path / "interviews.sqlite3"))
+    first_run = JAKARTA.localize(datetime(2025, 3, 3, 10, 0))
+    first = calendar.allocate(["a@example.com"], "Backend", ["Interviewer 1"], 60, first_run)[0]
+
+    # Slot pertama sudah lewat; kandidat melamar lagi untuk role yang sama
+    later = first["end"] + timedelta(days=30)
+    second = calendar.allocate(["a@example.com", "b@example.com"], "Backend", ["Interviewer 1"], 60, later)
+
+    assert second[0]["start"] > later
+    assert second[0]["id"] != first["id"]
+    assert [b["candidate_email"] for b in calendar.upcoming(later)] == ["a@example.com", "b@example.com"]
+
+
+def test_upcoming_booking_is_kept(tmp_path):
+    calendar = InterviewCalendar(path=str(tmp_path / "interviews.sqlite3"))
+    now = JAKARTA.localize(datetime(2025, 3, 3, 10, 0))
+    first = calendar.allocate(["a@example.com"], "Backend", ["Interviewer 1"], 60, now)[0]
+    again = calendar.allocate(["a@example.com"], "Backend", ["Interviewer 1"], 60, now + timedelta(hours=1))[0]
+    assert again["id"] == first["id"]
@@ -0,0 +1,84 @@
+import threading
+import time
+
+from mailer import Outbox
+
+
+class FakePool:
+    def __init__(self, fail: bool, delay: float = 0.0):
+        self.fail = fail
+        self.delay = delay
+        self.sent = []
+
+    def send(self, receiver_email, subject, body):
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("535 authentication failed")
+        self.sent.append(receiver_email)
+
+
+def exhaust(outbox: Outbox, message_id: int) -> None:
+    for _ in range(outbox.max_attempts):
+        assert not outbox.deliver(message_id, FakePool(fail=True))
+    assert outbox.stats()["failed"] == 1
+
+
+def test_reenqueue_rearms_failed_message(tmp_path):
+    outbox = Outbox(path=str(tmp_path / "outbox.sqlite3"), max_attempts=3, base_delay=0)
+    message_id = outbox.enqueue("a@example.com", "Hi", "Body", idempotency_key="selection:job1:a@example.com")
+    exhaust(outbox, message_id)
+
+    pool = FakePool(fail=False)
+    assert outbox.enqueue("a@example.com", "Hi", "Body", idempotency_key="selection:job1:a@example.com") == message_id
+    assert outbox.deliver(message_id, pool)
+    assert pool.sent == ["a@example.com"]
+    assert outbox.stats() == {"pending": 0, "sent": 1, "failed": 0}
+
+
+def test_retry_failed_then_drain(tmp_path):
+    outbox = Outbox(path=str(tmp_path / "outbox.sqlite3"), max_attempts=3, base_delay=0)
+    exhaust(outbox, outbox.enqueue("a@example.com", "Hi", "Body", idempotency_key="k"))
+
+    assert outbox.retry_failed() == 1
+    assert outbox.drain(FakePool(fail=False)) == {"pending": 0, "sent": 1, "failed": 0}
+
+
+def test_sent_message_is_not_resent(tmp_path):
+    outbox = Outbox(path=str(tmp_path / "outbox.sqlite3"))
+    pool = FakePool(fail=False)
+    message_id = outbox.enqueue("a@example.com", "Hi", "Body", idempotency_key="k")
+    assert outbox.deliver(message_id, pool)
+    assert outbox.deliver(outbox.enqueue("a@example.com", "Hi", "Body", idempotency_key="k"), pool)
+    assert pool.sent == ["a@example.com"]
+
+
+def test_concurrent_deliveries_send_once(tmp_path):
+    outbox = Outbox(path=str(tmp_path / "outbox.sqlite3"))
+    pool = FakePool(fail=False, delay=0.2)
+    message_id = outbox.enqueue("a@example.com", "Hi", "Body", idempotency_key="k")
+    results = []
+    barrier = threading.Barrier(2)
+
+    def deliver():
+        barrier.wait()
+        results.append(outbox.deliver_with_retry(message_id, pool, poll=0.05))
+
+    threads = [threading.Thread(target=deliver) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert pool.sent == ["a@example.com"]
+    assert results == [True, True]
+
+
+def test_drain_releases_stale_claim(tmp_path):
+    outbox = Outbox(path=str(tmp_path / "outbox.sqlite3"), claim_timeout=0)
+    message_id = outbox.enqueue("a@example.com", "Hi", "Body", idempotency_key="k")
+    with outbox._db() as db:
+        db.execute("UPDATE outbox SET status = 'sending', claimed_at = ? WHERE id = ?", (time.time() - 1, message_id))
+
+    pool = FakePool(fail=False)
+    assert outbox.drain(pool) == {"pending": 0, "sent": 1, "failed": 0}
+    assert pool.sent == ["a@example.com"]
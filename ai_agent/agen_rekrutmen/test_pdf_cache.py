@@ -0,0 +1,39 @@
+import io
+
+import PyPDF2
+
+import pdf_cache
+
+
+def blank_pdf(width: int) -> bytes:
+    writer = PyPDF2.PdfWriter()
+    writer.add_blank_page(width=width, height=100)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def test_batch_reuses_one_spawn_pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(pdf_cache, "EXTRACT_WORKERS", 2)
+    pdf_cache._reset_pool()
+    try:
+        files = [blank_pdf(100 + i) for i in range(3)]
+        assert pdf_cache.cached_extract_texts(files + files[:1]) == ["", "", "", ""]
+        pool = pdf_cache._pool
+        assert pool is not None and pool._mp_context.get_start_method() == "spawn"
+
+        pdf_cache.cached_extract_texts([blank_pdf(200 + i) for i in range(2)])
+        assert pdf_cache._pool is pool
+    finally:
+        pdf_cache._reset_pool()
+
+
+def test_memory_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(pdf_cache, "MEMORY_CACHE_ENTRIES", 3)
+    monkeypatch.setattr(pdf_cache, "_memory_cache", pdf_cache.OrderedDict())
+    for i in range(5):
+        pdf_cache._remember(f"key{i}", "text")
+    pdf_cache._lookup("key2")
+    pdf_cache._remember("key5", "text")
+    assert list(pdf_cache._memory_cache) == ["key4", "key2", "key5"]
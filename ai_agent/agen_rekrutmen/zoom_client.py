@@ -0,0 +1,200 @@
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from phi.tools.zoom import ZoomTool
+
+logger = logging.getLogger(__name__)
+
+ZOOM_TOKEN_URL = "https://zoom.us/oauth/token"
+ZOOM_API_BASE = "https://api.zoom.us/v2"
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """Process-wide keep-alive session shared by every Zoom call."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            # 429 berarti request belum diproses, jadi aman diulang juga untuk POST
+            retry = Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=(429,),
+                allowed_methods=frozenset({"GET", "POST", "DELETE"}),
+                respect_retry_after_header=True
+            )
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=retry)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+class TokenCache:
+    """Server-to-Server OAuth tokens cached per account for the whole process, refreshed under a lock."""
+
+    def __init__(self):
+        self._tokens: Dict[Tuple[str, str, str], Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token_url: str, account_id: str, client_id: str, client_secret: str) -> str:
+        key = (token_url, account_id, client_id)
+        cached = self._tokens.get(key)
+        if cached and time.time() < cached[1]:
+            return cached[0]
+
+        with self._lock:
+            # Thread lain mungkin sudah me-refresh selama kita menunggu lock
+            cached = self._tokens.get(key)
+            if cached and time.time() < cached[1]:
+                return cached[0]
+
+            response = get_http_session().post(
+                token_url,
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+                data={"grant_type": "account_credentials", "account_id": account_id},
+                auth=(client_id, client_secret),
+                timeout=30
+            )
+            response.raise_for_status()
+            token_info = response.json()
+            token = token_info["access_token"]
+            self._tokens[key] = (token, time.time() + token_info["expires_in"] - 60)
+            return token
+
+    def invalidate(self, token_url: str, account_id: str, client_id: str) -> None:
+        with self._lock:
+            self._tokens.pop((token_url, account_id, client_id), None)
+
+
+token_cache = TokenCache()
+
+
+class ZoomClient:
+    """Thin Zoom REST client on top of the shared token cache and HTTP session."""
+
+    def __init__(
+        self,
+        account_id: str,
+        client_id: str,
+        client_secret: str,
+        api_base: str = ZOOM_API_BASE,
+        token_url: str = ZOOM_TOKEN_URL
+    ):
+        self.account_id = account_id
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.api_base = api_base.rstrip("/")
+        self.token_url = token_url
+
+    def get_access_token(self) -> str:
+        try:
+            return token_cache.get(self.token_url, self.account_id, self.client_id, self.client_secret)
+        except (requests.RequestException, KeyError, ValueError) as e:
+            logger.error(f"Error fetching access token: {e}")
+            return ""
+
+    def create_meeting(self, topic: str, start_time: str, duration: int, timezone: str = "Asia/Jakarta") -> dict:
+        """Create a scheduled meeting. Raises requests.RequestException on failure."""
+        payload = {
+            "topic": topic,
+            "type": 2,  # Scheduled meeting
+            "start_time": start_time,
+            "duration": duration,
+            "timezone": timezone,
+            "settings": {
+                "join_before_host": True,
+                "waiting_room": False
+            }
+        }
+        for attempt in range(2):
+            response = get_http_session().post(
+                f"{self.api_base}/users/me/meetings",
+                headers={"Authorization": f"Bearer {self.get_access_token()}"},
+                json=payload,
+                timeout=30
+            )
+            # Token dicabut/kedaluwarsa lebih awal: buang dari cache lalu coba sekali lagi
+            if response.status_code == 401 and not attempt:
+                token_cache.invalidate(self.token_url, self.account_id, self.client_id)
+                continue
+            response.raise_for_status()
+            return response.json()
+
+    def create_meetings(self, meetings: List[Dict], max_workers: int = 4, limiter=None) -> List[Dict]:
+        """
+        Create many meetings concurrently over the pooled session.
+
+        Each item holds create_meeting kwargs; the result list keeps the same order
+        and contains {'error': ...} for meetings that could not be created. An optional
+        limiter (anything with acquire()) throttles the requests.
+        """
+        def create(meeting: Dict) -> Dict:
+            if limiter is not None:
+                limiter.acquire()
+            try:
+                return self.create_meeting(**meeting)
+            except requests.RequestException as e:
+                logger.error(f"Error creating Zoom meeting '{meeting.get('topic')}': {e}")
+                return {"error": str(e)}
+
+        self.get_access_token()  # Satu fetch token sebelum fan-out
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            return list(executor.map(create, meetings))
+
+
+class CustomZoomTool(ZoomTool):
+    """phidata ZoomTool backed by the shared token cache and HTTP session."""
+
+    def __init__(self, *, account_id: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, name: str = "zoom_tool"):
+        super().__init__(account_id=account_id, client_id=client_id, client_secret=client_secret, name=name)
+        self.client = ZoomClient(account_id or "", client_id or "", client_secret or "")
+
+    def get_access_token(self) -> str:
+        token = self.client.get_access_token()
+        self._set_parent_token(token)
+        return token
+
+    def schedule_meeting(self, topic: str, start_time: str, duration: int, timezone: str = "UTC") -> str:
+        """
+        Schedule a new Zoom meeting.
+
+        Args:
+            topic (str): The topic or title of the meeting.
+            start_time (str): The start time of the meeting in ISO 8601 format.
+            duration (int): The duration of the meeting in minutes.
+            timezone (str): The timezone for the meeting (e.g., "America/New_York", "Asia/Tokyo").
+
+        Returns:
+            A JSON-formatted string containing the response from Zoom API with the scheduled meeting details,
+            or an error message if the scheduling fails.
+        """
+        try:
+            meeting_info = self.client.create_meeting(topic, start_time, duration, timezone)
+        except requests.RequestException as e:
+            logger.error(f"Error scheduling meeting: {e}")
+            return json.dumps({"error": str(e)})
+        return json.dumps({
+            "message": "Meeting scheduled successfully!",
+            "meeting_id": meeting_info["id"],
+            "topic": meeting_info["topic"],
+            "start_time": meeting_info["start_time"],
+            "duration": meeting_info["duration"],
+            "join_url": meeting_info["join_url"],
+        }, indent=2)
+
+    def _set_parent_token(self, token: str) -> None:
+        """Helper method to set the token in the parent ZoomTool class"""
+        if token:
+            self._ZoomTool__access_token = token
+